@@ -0,0 +1,70 @@
+"""
+Background refreshes of the dashboard's report tables into the last_good
+store. They live here rather than in app.py, which Streamlit re-executes on
+every rerun: the in-flight bookkeeping is per process, so a report being
+refreshed for one session is not refreshed again for another.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from api_response_processor import fetch_engine, last_good, rate_limiter, response_cache
+from config import constants
+
+# Refreshes never call Streamlit, they only fill the last_good store.
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report-refresh")
+_lock = threading.Lock()
+_refreshing: dict[tuple[str, str], Future] = {}   # (property_id, report) -> refresh in flight
+_refreshed_at: dict[tuple[str, str], float] = {}  # (property_id, report) -> start of the last refresh
+
+
+def refresh(property_id, reports) -> set[str]:
+    """
+    Fetches reports at background priority and stores the complete ones in the
+    last_good store. Open periods skip the response cache, whose entries can be
+    up to their TTL old: the tables are stamped with the time of this refresh.
+    Returns the reports that could not be refreshed.
+    """
+    incomplete = set()
+    try:
+        with response_cache.refresh_open_periods(), rate_limiter.priority(rate_limiter.BACKGROUND):
+            fetched = fetch_engine.fetch_report_tables(property_id, reports, incomplete=incomplete)
+    except Exception as e:
+        print('Error in background refresh', reports, ':', e)
+        return set(reports)
+    store = last_good.get_store()
+    for report, tables in fetched.items():
+        if report not in incomplete:
+            store.put(property_id, report, tables)
+    return incomplete
+
+
+def _forget(keys) -> None:
+    with _lock:
+        for key in keys:
+            _refreshing.pop(key, None)
+
+
+def revalidate(property_id, reports) -> None:
+    """
+    Starts one background refresh of the reports that are not being refreshed
+    already. A report whose last refresh started less than TAB_DATA_TTL_SECONDS
+    ago is skipped, so a failing refresh is not retried on every rerun.
+    """
+    now = time.time()
+    with _lock:
+        keys = [key for key in ((str(property_id), report) for report in reports)
+                if key not in _refreshing
+                and now - _refreshed_at.get(key, 0.0) >= constants.TAB_DATA_TTL_SECONDS]
+        if not keys:
+            return
+        future = _pool.submit(refresh, property_id, tuple(report for _, report in keys))
+        for key in keys:
+            _refreshing[key] = future
+            _refreshed_at[key] = now
+    future.add_done_callback(lambda _: _forget(keys))
+
+
+def refreshing(property_id, reports) -> bool:
+    with _lock:
+        return any((str(property_id), report) in _refreshing for report in reports)
@@ -0,0 +1,192 @@
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+from api_response_processor import fixtures, helpers, rate_limiter, response_cache, single_flight, tracing
+from config import constants
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Failure reasons besides an HTTP status code (see last_failure)
+TIMEOUT = "timeout"
+CONNECTION_ERROR = "connection_error"
+FIXTURE_MISSING = "fixture_missing"
+
+_last_failure: ContextVar[Optional[Any]] = ContextVar("report_failure", default=None)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class RetryableResponseError(Exception):
+    """Raised for a 429/5xx so tenacity retries it; carries the last response."""
+
+    def __init__(self, response: requests.Response):
+        super().__init__(f"retryable status {response.status_code}")
+        self.response = response
+
+
+def get_session() -> requests.Session:
+    """Process-wide session: one keep-alive connection pool shared by every fetcher."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=constants.HTTP_POOL_CONNECTIONS,
+                                      pool_maxsize=constants.HTTP_POOL_MAXSIZE,
+                                      max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept-Encoding": "gzip, deflate",
+                                        "Connection": "keep-alive"})
+                _session = session
+    return _session
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _wait_for_retry(retry_state) -> float:
+    """Honour Retry-After when the server sent one, otherwise jittered exponential backoff."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, RetryableResponseError):
+        retry_after = _parse_retry_after(exc.response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, constants.HTTP_BACKOFF_MAX_SECONDS)
+    backoff = wait_random_exponential(multiplier=constants.HTTP_BACKOFF_BASE_SECONDS,
+                                      max=constants.HTTP_BACKOFF_MAX_SECONDS)
+    return backoff(retry_state)
+
+
+def _post(body: dict, headers: dict, attrs: dict, request: rate_limiter.RequestPriority) -> requests.Response:
+    limiter = rate_limiter.get_limiter()
+    waited = limiter.acquire(request=request)
+    attrs["rate_wait_ms"] = round(attrs.get("rate_wait_ms", 0) + waited * 1000, 1)
+    response = get_session().post(constants.REPORT_ENDPOINT,
+                                  json=body,
+                                  headers=headers,
+                                  timeout=constants.HTTP_TIMEOUT_SECONDS)
+    if response.status_code == 429:
+        limiter.throttled(_parse_retry_after(response.headers.get("Retry-After")))
+    else:
+        limiter.accepted()
+    if response.status_code in RETRY_STATUS_CODES:
+        raise RetryableResponseError(response)
+    return response
+
+
+def last_failure() -> Optional[Any]:
+    """
+    Why the last post_report call of this thread/context returned None: the
+    HTTP status code, TIMEOUT, CONNECTION_ERROR or FIXTURE_MISSING. None after
+    a successful call.
+    """
+    return _last_failure.get()
+
+
+def _fetch(body: dict, report_label: str, key: str, attrs: dict,
+           request: rate_limiter.RequestPriority) -> tuple[Optional[dict[str, Any]], Optional[Any]]:
+    """
+    The upstream call behind post_report; runs once per group of coalesced
+    callers. Returns (payload, failure reason), so the callers that shared the
+    call learn why it failed too.
+    """
+    if fixtures.mode() == fixtures.REPLAY:
+        payload = fixtures.replay(body)
+        attrs["replayed"] = True
+        if payload is None:
+            return None, FIXTURE_MISSING
+        attrs["rows"] = tracing.report_rows(payload)
+        response_cache.get_cache().set(key, payload, response_cache.ttl_for(body["method"]["params"]))
+        return payload, None
+
+    headers = helpers.get_headers()
+    retrying = Retrying(
+        retry=retry_if_exception_type((RetryableResponseError,
+                                       requests.exceptions.ConnectionError,
+                                       requests.exceptions.Timeout)),
+        wait=_wait_for_retry,
+        stop=stop_after_attempt(constants.HTTP_MAX_ATTEMPTS),
+        reraise=True,
+    )
+    started = time.perf_counter()
+    try:
+        response = retrying(_post, body, headers, attrs, request)
+    except RetryableResponseError as e:
+        response = e.response
+    except requests.exceptions.RequestException as e:
+        print('Error:', e)
+        attrs["error"] = str(e)
+        # ConnectTimeout is both; it says nothing about the request's size
+        return None, CONNECTION_ERROR if isinstance(e, requests.exceptions.ConnectionError) else TIMEOUT
+    finally:
+        attrs["attempts"] = retrying.statistics.get("attempt_number", 1)
+
+    attrs["status"] = response.status_code
+    attrs["bytes"] = len(response.content)
+    if response.status_code == 200:
+        payload = response.json()
+        attrs["rows"] = tracing.report_rows(payload)
+        response_cache.get_cache().set(key, payload, response_cache.ttl_for(body["method"]["params"]))
+        if fixtures.mode() == fixtures.RECORD:
+            fixtures.record(body, payload, time.perf_counter() - started, secrets=[headers.get("X-Api-Key")])
+        return payload, None
+    print(f'Error in calling {report_label} endpoint:', response.status_code)
+    print(response.text)
+    return None, response.status_code
+
+
+def post_report(body: dict, report_label: str) -> Optional[dict[str, Any]]:
+    """
+    POSTs a getReportData body to constants.REPORT_ENDPOINT through the shared
+    session and rate limiter, retrying 429/5xx responses and connection errors.
+
+    Responses are served from / stored in the response cache, keyed on the
+    normalized method.params. Identical requests already in flight (from any
+    session or thread) are not sent again: the caller waits for that call and
+    shares its result; when the caller is more urgent than the one sending the
+    request, the request's rate limiter priority is raised to the caller's.
+    Returns the decoded JSON on 200, otherwise prints the error and returns
+    None (the contract the get_* fetchers have always had); last_failure()
+    then tells why.
+    """
+    report_name = body["method"]["params"].get("reportName", report_label)
+    with tracing.span(report_name, "http") as attrs:
+        key = response_cache.cache_key(body)
+        cached = response_cache.get_cache().get(key)
+        attrs["cache"] = "hit" if cached is not None else "miss"
+        if cached is not None:
+            attrs["rows"] = tracing.report_rows(cached)
+            _last_failure.set(None)
+            return cached
+
+        request = rate_limiter.RequestPriority()
+        (payload, failure), shared = single_flight.get_group().do(
+            key, lambda: _fetch(body, report_label, key, attrs, request), label=report_name, state=request,
+            join=lambda leader: rate_limiter.get_limiter().raise_priority(leader, request.level))
+        _last_failure.set(failure)
+        if shared:
+            attrs["coalesced"] = True
+            attrs["rows"] = tracing.report_rows(payload)
+        return payload
@@ -0,0 +1,130 @@
+"""
+Daily-grain box score counts. Each day's lead_activity, lead_conversions and
+property_pulse counts are fetched once (one box_score request per day),
+closed days are kept in the snapshot store, and totals over any date range
+come from prefix sums instead of new requests.
+"""
+from datetime import date, timedelta
+from typing import Any, Optional
+
+import numpy as np
+
+from api_response_processor import data_classes, extractors, helpers, tracing
+
+SNAPSHOT_REPORT = "box_score_daily"
+
+# (reportData section, column) of every daily count, in storage order. Only flow
+# counts add up over days; availability (occupancy) is a point-in-time value.
+# unique_visits_tours is unique per day, so a multi-day total can count a
+# prospect who toured on two days twice.
+DAILY_COLUMNS = (
+    ("lead_activity", "new_leads"),
+    ("lead_activity", "unique_visits_tours"),
+    ("lead_conversions", "completed"),
+    ("lead_conversions", "approved"),
+    ("property_pulse", "skips"),
+    ("property_pulse", "evictions_completed"),
+    ("property_pulse", "move_ins"),
+    ("property_pulse", "move_outs"),
+)
+DAILY_COUNTS = tuple(column for _, column in DAILY_COLUMNS)
+_DAILY = extractors.Extractor("box_score_daily", {
+    column: extractors.Field(column, (section, "pulse") if section == "property_pulse" else (section,))
+    for section, column in DAILY_COLUMNS
+})
+
+
+def day_range(first_day: date, last_day: date) -> list[date]:
+    return [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+
+def week_windows(today: date, weeks: int) -> list[tuple[date, date]]:
+    """
+    (start, end) of the last `weeks` Saturday-to-Friday weeks, oldest first; the
+    newest is the current week, Saturday to today (the box score week convention).
+    """
+    current_start = today - timedelta((today.weekday() - 5) % 7)  # Saturday on or before today
+    windows = [(current_start, today)]
+    for i in range(1, weeks):
+        start = current_start - timedelta(weeks=i)
+        windows.append((start, start + timedelta(days=6)))
+    return windows[::-1]
+
+
+def extract_daily_counts(api_response: dict[str, Any]) -> list[float]:
+    """DAILY_COUNTS of a single-day box_score response (first row of each section), NaN when missing."""
+    return list(_DAILY(api_response).values())
+
+
+class DailyBoxScores:
+    """
+    Daily counts (DAILY_COUNTS columns) of one property from first_day on, held
+    as prefix sums: the total over any range of days is the difference of two
+    rows. Days without data count as 0.
+    """
+
+    def __init__(self, first_day: date, counts: np.ndarray):
+        self.first_day = first_day
+        self.days = len(counts)
+        self._cumulative = np.zeros((self.days + 1, len(DAILY_COUNTS)))
+        np.cumsum(np.nan_to_num(counts), axis=0, out=self._cumulative[1:])
+
+    def totals(self, windows: list[tuple[date, date]]) -> np.ndarray:
+        """One row of DAILY_COUNTS totals per inclusive (start, end) window; days outside the data add 0."""
+        offsets = np.array([((start - self.first_day).days, (end - self.first_day).days + 1)
+                            for start, end in windows], dtype=np.int64).reshape(-1, 2)
+        offsets = np.clip(offsets, 0, self.days)
+        return self._cumulative[offsets[:, 1]] - self._cumulative[offsets[:, 0]]
+
+    def total(self, start: date, end: date) -> dict[str, float]:
+        return dict(zip(DAILY_COUNTS, self.totals([(start, end)])[0].tolist()))
+
+
+def load_day_snapshots(store, property_id, days: list[date], today: date) -> dict[date, list]:
+    """Closed days (before today) already in the snapshot store, as {day: counts}."""
+    closed = [day.isoformat() for day in days if day < today]
+    if store is None or not closed:
+        return {}
+    return {date.fromisoformat(day): counts
+            for day, counts in store.get_many(property_id, SNAPSHOT_REPORT, closed).items()}
+
+
+@tracing.traced("parse")
+def summarize_daily_box_scores(property_id,
+                               days: list[date],
+                               responses: dict[date, Optional[dict]],
+                               snapshots: Optional[dict[date, list]] = None,
+                               store=None,
+                               today: Optional[date] = None) -> DailyBoxScores:
+    """
+    DailyBoxScores over the consecutive `days`, from snapshots where present and
+    the single-day box_score responses otherwise. Freshly parsed closed days
+    are written to store; a day whose request failed is neither stored nor counted.
+    """
+    snapshots = snapshots or {}
+    today = today or helpers.get_today()
+    counts = np.full((len(days), len(DAILY_COUNTS)), np.nan)
+    for i, day in enumerate(days):
+        if day in snapshots:
+            counts[i] = snapshots[day]
+            continue
+        response = responses.get(day)
+        if not response:
+            continue
+        counts[i] = extract_daily_counts(response)
+        if store is not None and day < today:
+            store.put(property_id, SNAPSHOT_REPORT, day.isoformat(), counts[i].tolist())
+    return DailyBoxScores(days[0] if days else today, counts)
+
+
+def weekly_lead_counts(daily: DailyBoxScores, windows: list[tuple[date, date]]) -> data_classes.WeeklyLeadCounts:
+    totals = daily.totals(windows)
+    column = {name: totals[:, i].tolist() for i, name in enumerate(DAILY_COUNTS)}
+    return data_classes.WeeklyLeadCounts(
+        start_dates=[start.isoformat() for start, _ in windows],
+        end_dates=[end.isoformat() for _, end in windows],
+        new_leads=column["new_leads"],
+        tour_visits=column["unique_visits_tours"],
+        applications_completed=column["completed"],
+        lease_approved=column["approved"],
+    )
@@ -1,71 +1,99 @@
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Optional
 
-@dataclass
+# Numeric fields are plain floats, NaN when the report did not send a value;
+# percentages are fractions (0.7826 == 78.26 %). Formatting happens in app.py.
+
+@dataclass(slots=True)
 class PropertySummary:
-    total_units: Union[int, str, None]
-    total_rentable_units: Union[int, str, None]
-    excluded_units: Union[int, str, None]
-    occupied_units_percentage: Union[int, str, None]
-    leased_units_percentage: Union[int, str, None]
-    trend_percentage: Union[int, str, None]
-    evictions_and_skips_occurred: Union[int, str, None]
+    total_units: float
+    total_rentable_units: float
+    excluded_units: float
+    occupied_units_percentage: float
+    leased_units_percentage: float
+    trend_percentage: float
+    evictions_and_skips_occurred: float
 
-@dataclass
+@dataclass(slots=True)
 class UnitsSummary:
-    count_of_occupied_units: Union[int, str, None]
-    count_of_on_notice_rented_units: Union[int, str, None]
-    count_of_on_notice_unrented_units: Union[int, str, None]
-    count_of_vacant_units: Union[int, str, None]
-    count_of_vacant_rented_units: Union[int, str, None]
-    count_of_vacant_unrented_units: Union[int, str, None]
-    count_of_total_move_ins: Union[int, str, None]
-    count_of_total_move_out: Union[int, str, None]
+    count_of_occupied_units: float
+    count_of_on_notice_rented_units: float
+    count_of_on_notice_unrented_units: float
+    count_of_vacant_units: float
+    count_of_vacant_rented_units: float
+    count_of_vacant_unrented_units: float
+    count_of_total_move_ins: float
+    count_of_total_move_out: float
 
-@dataclass
+@dataclass(slots=True)
 class ResidentRetentionSummaryForCurrentMonth:
-    expiring_leases: Union[int, None]
-    renewals: Union[int, None]
+    expiring_leases: float
+    renewals: float
 
-@dataclass
+@dataclass(slots=True)
 class RentSummaryForCurrentAndLastTwoMonths:
-    current_month_date: Union[str, None]
-    current_month_total_rent_billed: Union[int, None]
-    current_month_total_rent_collected: Union[int, None]
+    current_month_date: Optional[str]
+    current_month_total_rent_billed: float
+    current_month_total_rent_collected: float
+
+    last_month_date: Optional[str]
+    last_month_total_rent_billed: float
+    last_month_total_rent_collected: float
 
-    last_month_date: Union[str, None]
-    last_month_total_rent_billed: Union[int, None]
-    last_month_total_rent_collected: Union[int, None]
+    month_before_last_date: Optional[str]
+    month_before_last_total_rent_billed: float
+    month_before_last_total_rent_collected: float
 
-    month_before_last_date: Union[str, None]
-    month_before_last_total_rent_billed: Union[int, None]
-    month_before_last_total_rent_collected: Union[int, None]
+@dataclass(slots=True)
+class RentTrend:
+    # one entry per month, oldest first; periods are MM/YYYY
+    periods: list[str]
+    total_rent_billed: list[float]
+    total_rent_collected: list[float]
 
-@dataclass
+@dataclass(slots=True)
 class DelinquencyForThreeMonths:
-    current_month_delinquency: Union[float, None]
-    last_month_delinquency: Union[float, None]
-    month_before_last_delinquency: Union[float, None]
+    current_month_delinquency: float
+    last_month_delinquency: float
+    month_before_last_delinquency: float
 
-@dataclass
+@dataclass(slots=True)
+class DelinquencyBuckets:
+    current: float
+    thirty_days: float
+    sixty_days: float
+    ninety_days: float
+    ninety_plus_days: float
+
+@dataclass(slots=True)
 class LeadsSummaryForThreeWeeks:
-    current_week_start_date: Union[int, str, None]
-    current_week_end_date: Union[int, str, None]
-    current_week_new_leads_count: Union[int, str, None]
-    current_week_tours_count: Union[int, str, None]
-    current_week_applications_completed_count: Union[int, str, None]
-    current_week_lease_approved_count: Union[int, str, None]
+    current_week_start_date: Optional[str]
+    current_week_end_date: Optional[str]
+    current_week_new_leads_count: float
+    current_week_tours_count: float
+    current_week_applications_completed_count: float
+    current_week_lease_approved_count: float
+
+    last_week_start_date: Optional[str]
+    last_week_end_date: Optional[str]
+    last_week_new_leads_count: float
+    last_week_tours_count: float
+    last_week_applications_completed_count: float
+    last_week_lease_approved_count: float
 
-    last_week_start_date: Union[int, str, None]
-    last_week_end_date: Union[int, str, None]
-    last_week_new_leads_count: Union[int, str, None]
-    last_week_tours_count: Union[int, str, None]
-    last_week_applications_completed_count: Union[int, str, None]
-    last_week_lease_approved_count: Union[int, str, None]
+    week_before_last_start_date: Optional[str]
+    week_before_last_end_date: Optional[str]
+    week_before_last_new_leads_count: float
+    week_before_last_tours_count: float
+    week_before_last_applications_completed_count: float
+    week_before_last_lease_approved_count: float
 
-    week_before_last_start_date: Union[int, str, None]
-    week_before_last_end_date: Union[int, str, None]
-    week_before_last_new_leads_count: Union[int, str, None]
-    week_before_last_tours_count: Union[int, str, None]
-    week_before_last_applications_completed_count: Union[int, str, None]
-    week_before_last_lease_approved_count: Union[int, str, None]
\ No newline at end of file
+@dataclass(slots=True)
+class WeeklyLeadCounts:
+    # one entry per week, oldest first; dates are YYYY-MM-DD
+    start_dates: list[str]
+    end_dates: list[str]
+    new_leads: list[float]
+    tour_visits: list[float]  # daily unique_visits_tours summed: a prospect touring on two days counts twice
+    applications_completed: list[float]
+    lease_approved: list[float]
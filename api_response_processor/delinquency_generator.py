@@ -1,52 +1,84 @@
 import copy
 from typing import Any
 
-import requests
+import numpy as np
+import pandas as pd
 
-from api_response_processor import helpers, data_classes
+from api_response_processor import client, data_classes, tracing
 from config import constants
 
 def get_resident_aged_receivables(property_id):
-    headers = helpers.get_headers()
     body = copy.deepcopy(constants.GET_RESIDENT_AGED_RECEIVABLES)
     body["method"]["params"]["filters"]["property_group_ids"] = [property_id]
+    return client.post_report(body, "resident aged receivables")
+
+BUCKET_FIELDS = ("current", "thirty_days", "sixty_days", "ninety_days", "ninety_plus_days")
+PROPERTY_ID_FIELD = "property_id"
+
+def _numeric_block(block: pd.DataFrame) -> np.ndarray:
+    """float64 matrix; anything non-numeric (None, "", "n/a", inf) becomes 0."""
     try:
-        response = requests.post(constants.REPORT_ENDPOINT,
-                                 json=body,
-                                 headers=headers,
-                                 timeout=60)
-        if response.status_code == 200:
-            return response.json()
-        print('Error in calling resident aged receivables endpoint:', response.status_code)
-        print(response.json())
-        return None
-    except requests.exceptions.RequestException as e:
-        print('Error:', e)
-    return None
+        values = block.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        # only columns that hold non-numeric strings pay for element-wise coercion
+        values = np.empty(block.shape, dtype=np.float64)
+        for i, (_, column) in enumerate(block.items()):
+            try:
+                values[:, i] = column.to_numpy(dtype=np.float64)
+            except (TypeError, ValueError):
+                values[:, i] = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+    values[~np.isfinite(values)] = 0.0
+    return values
 
-def sum_delinquency_buckets(api_response: dict[str, Any]) -> data_classes.DelinquencyForThreeMonths:
+@tracing.traced("parse")
+def aggregate_delinquency_buckets(api_response: dict[str, Any]) -> tuple[data_classes.DelinquencyBuckets,
+                                                                         dict[str, data_classes.DelinquencyBuckets]]:
     """
-    Returns the sums of 'thirty_days', 'sixty_days', and 'ninety_days'
-    across all rows in response.result[0].reportData.
+    Sums every BUCKET_FIELDS column across all rows in response.result[0].reportData
+    in one columnar pass. Non-numeric and missing values count as 0.
+
+    Returns (totals, {property_id: subtotals}); rows without a property_id only
+    count towards the totals.
     """
     result = api_response.get("response", {}).get("result", [])
     report_data = (result[0] if result else {}).get("reportData", []) or []
 
-    def bucket_sum(key: str) -> float:
-        total = 0.0
-        for row in report_data:
-            try:
-                total += float(row.get(key) or 0)
-            except (TypeError, ValueError):
-                # Skip non-numeric entries
-                continue
-        return round(total, 2)
+    # dtype=object loads the rows in one pass and keeps ids as sent (no 1 -> 1.0 upcast)
+    frame = pd.DataFrame(report_data, columns=[*BUCKET_FIELDS, PROPERTY_ID_FIELD], dtype=object)
+    values = _numeric_block(frame[list(BUCKET_FIELDS)])
+    totals = values.sum(axis=0)
+
+    # factorize the raw ids, then fold uniques that only differ by type (1 vs "1")
+    raw_codes, raw_ids = pd.factorize(frame[PROPERTY_ID_FIELD].to_numpy())
+    id_codes, property_ids = pd.factorize(np.array([str(pid) for pid in raw_ids], dtype=object))
+    codes = np.where(raw_codes >= 0, id_codes[raw_codes], -1) if len(raw_ids) else raw_codes
+    has_property = codes >= 0
+    subtotals = np.column_stack([np.bincount(codes[has_property],
+                                             weights=values[has_property, i],
+                                             minlength=len(property_ids))
+                                 for i in range(len(BUCKET_FIELDS))]) \
+        if len(property_ids) else np.zeros((0, len(BUCKET_FIELDS)))
+
+    def to_buckets(sums: np.ndarray) -> data_classes.DelinquencyBuckets:
+        return data_classes.DelinquencyBuckets(*(round(float(v), 2) for v in sums))
+
+    return to_buckets(totals), {pid: to_buckets(sums) for pid, sums in zip(property_ids, subtotals)}
+
+def delinquency_from_buckets(buckets: data_classes.DelinquencyBuckets) -> data_classes.DelinquencyForThreeMonths:
     return data_classes.DelinquencyForThreeMonths(
-        current_month_delinquency = bucket_sum("thirty_days"),
-        last_month_delinquency = bucket_sum("sixty_days"),
-        month_before_last_delinquency = bucket_sum("ninety_days")
+        current_month_delinquency = buckets.thirty_days,
+        last_month_delinquency = buckets.sixty_days,
+        month_before_last_delinquency = buckets.ninety_days
     )
 
+def sum_delinquency_buckets(api_response: dict[str, Any]) -> data_classes.DelinquencyForThreeMonths:
+    """
+    Returns the sums of 'thirty_days', 'sixty_days', and 'ninety_days'
+    across all rows in response.result[0].reportData.
+    """
+    totals, _ = aggregate_delinquency_buckets(api_response)
+    return delinquency_from_buckets(totals)
+
 def get_fake_delinquency_buckets_response():
     """
     Fake API response for sum_delinquency_buckets().
@@ -73,8 +105,18 @@ def get_fake_delinquency_buckets_response():
     }
 
 
-def generate_delinquency_report(property_id) -> data_classes.DelinquencyForThreeMonths:
-    # resident_aged_receivables = get_resident_aged_receivables(property_id)
-    resident_aged_receivables = get_fake_delinquency_buckets_response()
+@tracing.traced("fetch", measure=tracing.measure_response)
+def fetch_resident_aged_receivables(property_id):
+    if constants.USE_FAKE_DATA:
+        return get_fake_delinquency_buckets_response()
+    return get_resident_aged_receivables(property_id)
+
+
+@tracing.traced("parse")
+def summarize_delinquency(property_id, resident_aged_receivables) -> data_classes.DelinquencyForThreeMonths:
     print("Calculated the delinquency summary for " + f"{property_id}")
-    return sum_delinquency_buckets(resident_aged_receivables)
\ No newline at end of file
+    return sum_delinquency_buckets(resident_aged_receivables or {})
+
+
+def generate_delinquency_report(property_id) -> data_classes.DelinquencyForThreeMonths:
+    return summarize_delinquency(property_id, fetch_resident_aged_receivables(property_id))
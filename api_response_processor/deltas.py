@@ -0,0 +1,151 @@
+"""
+Period-over-period deltas of the summary views. The latest period of each
+property is compared against the one before it and against a rolling
+baseline, the mean of up to DELTA_BASELINE_PERIODS earlier periods.
+
+The newest period of a view is the open one (the current week or month so
+far). Point-in-time KPIs (occupancy, unit counts) compare it as is, but flows
+(move-ins, evictions, rent billed/collected) of a partial period would be
+compared against a full one, so their deltas compare the last closed period
+against the one before it (closed_periods).
+
+A tab's views hold three periods (property_summary/units_summary: three
+weeks, rent: three months); the baseline's older periods come from the
+snapshot store, which keeps every closed week and month the dashboard has
+fetched. Nothing here sends a report request: periods missing from the store
+just shorten the baseline. Every property and KPI is computed in one pass of
+grouped shifts and rolling means, so the same call serves one property's
+dashboard and a whole portfolio.
+"""
+import dataclasses
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from api_response_processor import rent_billed_collected_generator, snapshot_store
+from api_response_processor.summary_tables import PERIOD, PROPERTY_ID
+from config import constants
+
+# Columns of the frame returned by deltas().
+KPI = "kpi"
+DELTA_COLUMNS = (PROPERTY_ID, KPI, "value", "previous", "change", "pct_change",
+                 "baseline", "baseline_change", "baseline_pct_change")
+
+
+def _pct_change(change: pd.DataFrame, base: pd.DataFrame) -> pd.DataFrame:
+    """change / |base|; NaN where base is 0 or missing."""
+    base = base.abs()
+    return change / base.where(base != 0)
+
+
+def deltas(view: pd.DataFrame, columns: list[str], newest_first: bool = True,
+           baseline_periods: int = constants.DELTA_BASELINE_PERIODS,
+           history: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    One row per (property_id, kpi) of view: the latest value, the previous
+    period's value and the baseline, with the change and percent change against
+    each (pct_change is a fraction; it is NaN when there is nothing to compare
+    against, or that value is 0). view is a summary_tables.to_pandas() view,
+    its periods ordered newest first per property (oldest first for the trend
+    views, newest_first=False). history holds periods older than the view's,
+    newest first (see stored_history).
+    """
+    parts = [view if newest_first else view.iloc[::-1]]
+    if history is not None and len(history):
+        parts.append(history)
+    # Arrow nulls -> NaN, so the arithmetic below stays on numpy
+    values = pd.concat([part[columns].astype("float64") for part in parts], ignore_index=True)
+    property_ids = pd.concat([part[PROPERTY_ID].astype(str) for part in parts], ignore_index=True)
+
+    # newest first: the rows after a property's latest one are its earlier periods
+    earlier = values.groupby(property_ids, sort=False).shift(-1)
+    baseline = (earlier.iloc[::-1]
+                .groupby(property_ids.iloc[::-1], sort=False)
+                .rolling(baseline_periods, min_periods=1).mean()
+                .reset_index(level=0, drop=True)
+                .sort_index())
+    latest = ~property_ids.duplicated()
+
+    value, previous, baseline = values[latest], earlier[latest], baseline[latest]
+    result = pd.DataFrame({
+        PROPERTY_ID: np.repeat(property_ids[latest].to_numpy(), len(columns)),
+        KPI: np.tile(np.asarray(columns, dtype=object), int(latest.sum())),
+    })
+    for name, table in (("value", value), ("previous", previous),
+                        ("change", value - previous), ("pct_change", _pct_change(value - previous, previous)),
+                        ("baseline", baseline), ("baseline_change", value - baseline),
+                        ("baseline_pct_change", _pct_change(value - baseline, baseline))):
+        result[name] = table.to_numpy().ravel()  # row-major: each property's KPIs in columns order
+    return result
+
+
+def closed_periods(view: pd.DataFrame) -> pd.DataFrame:
+    """A newest-first view without each property's newest period, the open one."""
+    return view[view[PROPERTY_ID].astype(str).duplicated()]
+
+
+def for_property(result: pd.DataFrame) -> dict[str, pd.Series]:
+    """{kpi: row} of a single-property deltas() frame, for the KPI cards."""
+    return {row[KPI]: row for _, row in result.iterrows()}
+
+
+# =========================
+# STORED HISTORY
+# =========================
+def earlier_weeks(week_dates: dict, count: int) -> list[str]:
+    """Keys of the `count` weeks before the box score views' three, newest first."""
+    start = date.fromisoformat(week_dates["saturday_before_last_to_last_friday"])
+    return [f"{start - timedelta(weeks=i)}-{start - timedelta(weeks=i) + timedelta(days=6)}"
+            for i in range(1, count + 1)]
+
+
+def earlier_months(count: int) -> list[str]:
+    """MM/YYYY of the `count` months before the rent view's three, newest first."""
+    return rent_billed_collected_generator.get_trailing_months_mm_yyyy(count + 3)[:count][::-1]
+
+
+def stored_history(view: pd.DataFrame, report: str, periods: list[str],
+                   store: Optional[snapshot_store.SnapshotStore] = None) -> pd.DataFrame:
+    """
+    The snapshots of `periods` for the properties of view, shaped like view's
+    rows and in the order of periods; periods not in the store are left out.
+    Empty when no snapshot store is configured.
+    """
+    store = store if store is not None else snapshot_store.get_snapshot_store()
+    rows = []
+    if store is not None and periods:
+        for property_id in view[PROPERTY_ID].unique():
+            stored = store.get_many(property_id, report, periods)
+            for period in periods:
+                if period in stored:
+                    value = stored[period]
+                    fields = dataclasses.asdict(value) if dataclasses.is_dataclass(value) else value
+                    rows.append({**fields, PROPERTY_ID: property_id, PERIOD: period})
+    return pd.DataFrame(rows, columns=list(view.columns))
+
+
+def week_deltas(view: pd.DataFrame, report: str, columns: list[str], week_dates: dict,
+                store: Optional[snapshot_store.SnapshotStore] = None, closed_only: bool = False) -> pd.DataFrame:
+    """
+    deltas() of the property_summary or units_summary view (report: the
+    table's name, which is also its snapshot report), the baseline reaching
+    into stored weeks. closed_only compares the last closed week instead of
+    the current one, for flow columns.
+    """
+    history = stored_history(view, report,
+                             earlier_weeks(week_dates, constants.DELTA_BASELINE_PERIODS), store)
+    return deltas(closed_periods(view) if closed_only else view, columns, history=history)
+
+
+def month_deltas(view: pd.DataFrame, columns: list[str],
+                 store: Optional[snapshot_store.SnapshotStore] = None) -> pd.DataFrame:
+    """
+    deltas() of the rent view (billed, collected) for the last closed month,
+    the current one being month to date; the baseline reaches into stored
+    months.
+    """
+    history = stored_history(view, rent_billed_collected_generator.SNAPSHOT_REPORT,
+                             earlier_months(constants.DELTA_BASELINE_PERIODS), store)
+    return deltas(closed_periods(view), columns, history=history)
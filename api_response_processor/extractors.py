@@ -0,0 +1,140 @@
+"""
+Declarative getReportData parsing. A report spec maps output names to Fields
+(which reportData section, which column, how to coerce it); Extractor compiles
+the spec once into a straight-line function that finds each section's first
+row a single time and reads every column from it, so one walk of a response
+yields every value the summaries need.
+
+    RETENTION = Extractor("resident_retention", {
+        "expiring_leases": Field("expiring_leases"),
+        "renewals": Field("renewals"),
+    })
+    RETENTION(response)                   # {"expiring_leases": 12.0, "renewals": 9.0}
+    RETENTION.many(responses)             # one dict per response
+    RETENTION.by_property(response, ids)  # {property_id: dict} from a portfolio response
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from api_response_processor import helpers
+
+PROPERTY_ID_FIELD = "property_id"
+# the row of a missing section; never mutated
+_EMPTY: dict = {}
+
+
+@dataclass(frozen=True, slots=True)
+class Field:
+    column: str
+    # reportData sections tried in order (box_score sends property_pulse or pulse);
+    # empty: reportData is a list of rows (or, as a dict, its first non-empty section)
+    sections: tuple[str, ...] = ()
+    coerce: Callable[[Any], Any] = helpers.to_float
+    # replaces a missing, None or "" value before coerce; None keeps it as sent
+    default: Any = None
+
+
+def report_data(response: Optional[dict]) -> Any:
+    """response.result[0].reportData: a list of rows, a dict of row lists, or []."""
+    result = (response or {}).get("response", {}).get("result", [])
+    first = result[0] if isinstance(result, list) and result else {}
+    return first.get("reportData") or []
+
+
+def _first_dict(rows: Any) -> dict:
+    return rows[0] if isinstance(rows, list) and rows and isinstance(rows[0], dict) else _EMPTY
+
+
+def _first_section_row(data: dict) -> dict:
+    for rows in data.values():
+        if isinstance(rows, list) and rows:
+            return _first_dict(rows)
+    return _EMPTY
+
+
+def _row_expression(sections: tuple[str, ...]) -> str:
+    """Source for the first row of the first non-empty section, given `data` is a dict."""
+    if not sections:
+        return "_first_section_row(data)"
+    return "_first_dict(" + " or ".join(f"data.get({s!r})" for s in sections) + ")"
+
+
+def _compile(name: str, spec: dict[str, Field]) -> Callable[[Any], dict[str, Any]]:
+    """
+    Generates `def extract(data)` for spec: the first row of each distinct
+    section tuple is looked up once, then a dict literal holds one coerced
+    row.get per field. data is reportData (a dict of sections or a list of rows).
+    """
+    sections = list(dict.fromkeys(f.sections for f in spec.values()))
+    namespace: dict[str, Any] = {"_first_dict": _first_dict, "_first_section_row": _first_section_row,
+                                 "_EMPTY": _EMPTY}
+    lines = ["def extract(data):",
+             "    if isinstance(data, dict):"]
+    lines += [f"        row{i} = {_row_expression(s)}" for i, s in enumerate(sections)]
+    lines.append("    else:")
+    # a list of rows only answers the fields that name no section
+    lines += [f"        row{i} = {'_first_dict(data)' if not s else '_EMPTY'}" for i, s in enumerate(sections)]
+    lines.append("    return {")
+    for i, (output, f) in enumerate(spec.items()):
+        namespace[f"coerce{i}"] = f.coerce
+        value = f"row{sections.index(f.sections)}.get({f.column!r})"
+        if f.default is not None:
+            namespace[f"default{i}"] = f.default
+            # only a missing value is replaced: 0, 0.0 and False are kept
+            value = f"(value{i} if (value{i} := {value}) is not None and value{i} != '' else default{i})"
+        lines.append(f"        {output!r}: coerce{i}({value}),")
+    lines.append("    }")
+    exec(compile("\n".join(lines), f"<extractor {name}>", "exec"), namespace)
+    return namespace["extract"]
+
+
+def _first_rows_by_property(rows: Any, keys: dict[str, Hashable], single: Optional[str]) -> dict[str, dict]:
+    """{str(property_id): first row of that property}; rows without an id only count for a single property."""
+    first: dict[str, dict] = {}
+    for row in rows if isinstance(rows, list) else ():
+        if not isinstance(row, dict):
+            continue
+        pid = row.get(PROPERTY_ID_FIELD)
+        key = single if pid is None else str(pid)
+        if key in keys and key not in first:
+            first[key] = row
+    return first
+
+
+class Extractor:
+    """A report spec compiled into a function; calling it parses one response."""
+
+    def __init__(self, name: str, spec: dict[str, Field]):
+        self.name = name
+        self.spec = dict(spec)
+        self._extract = _compile(name, self.spec)
+        self._sections = {section for f in self.spec.values() for section in f.sections}
+        self._any_section = any(not f.sections for f in self.spec.values())
+
+    def __call__(self, response: Optional[dict]) -> dict[str, Any]:
+        return self._extract(report_data(response))
+
+    def many(self, responses: Iterable[Optional[dict]]) -> list[dict[str, Any]]:
+        extract = self._extract
+        return [extract(report_data(response)) for response in responses]
+
+    def by_property(self, response: Optional[dict], property_ids: list) -> dict[Hashable, dict[str, Any]]:
+        """
+        Values per property from one multi-property response, matching rows on
+        their property_id (first row per property and section) in a single pass
+        over the sections the spec reads. Properties without rows get the
+        values of an empty response.
+        """
+        keys = {str(pid): pid for pid in property_ids}
+        single = next(iter(keys)) if len(keys) == 1 else None
+        data = report_data(response)
+        if isinstance(data, dict):
+            by_section = {section: _first_rows_by_property(rows, keys, single)
+                          for section, rows in data.items() if self._any_section or section in self._sections}
+            per_property = {key: {section: [first[key]] for section, first in by_section.items() if key in first}
+                            for key in keys}
+        else:
+            first = _first_rows_by_property(data, keys, single)
+            per_property = {key: [first[key]] if key in first else [] for key in keys}
+        extract = self._extract
+        return {pid: extract(per_property[key]) for key, pid in keys.items()}
@@ -0,0 +1,202 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Hashable, Optional
+
+from api_response_processor import (daily_box_scores,
+                                    helpers,
+                                    property_unit_lead_summary_generator,
+                                    rent_billed_collected_generator,
+                                    delinquency_generator,
+                                    resident_retention_generator,
+                                    snapshot_store,
+                                    summary_tables)
+from config import constants
+
+FetchTask = tuple[Callable[..., Any], tuple]
+
+
+def fetch_all(tasks: dict[Hashable, FetchTask],
+              max_workers: Optional[int] = None) -> dict[Hashable, Any]:
+    """
+    Runs every (fn, args) task on a thread pool and returns {key: result} in the
+    order the tasks were given. At most max_workers tasks run at the same time
+    (defaults to constants.FETCH_MAX_WORKERS). A task that raises yields None,
+    the same as a failed get_* call. Each task runs in a copy of the caller's
+    context, so its spans land in the caller's trace.
+    """
+    if not tasks:
+        return {}
+    workers = max(1, min(max_workers or constants.FETCH_MAX_WORKERS, len(tasks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-fetch") as pool:
+        futures = {key: pool.submit(contextvars.copy_context().run, fn, *args)
+                   for key, (fn, args) in tasks.items()}
+
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            print('Error in fetch task', key, ':', e)
+            results[key] = None
+    return results
+
+
+# The reports behind the dashboard, as named in fetch_report_models results.
+REPORTS = ("box_score", "comparative_delinquency", "resident_aged_receivables", "resident_retention",
+           "rent_trend", "leads_weekly")
+# The reports whose models make up fetch_property_models.
+SUMMARY_REPORTS = REPORTS[:4]
+
+
+def _task_report(key: Hashable) -> str:
+    """The REPORTS entry a fetch_report_models task key belongs to."""
+    name = key[0] if isinstance(key, tuple) else key
+    return "leads_weekly" if name == "box_score_day" else name
+
+
+def fetch_report_models(property_id,
+                        reports=SUMMARY_REPORTS,
+                        max_workers: Optional[int] = None,
+                        incomplete: Optional[set] = None) -> dict[str, Any]:
+    """
+    Sends the requests of the given reports (a subset of REPORTS) for one
+    property at the same time, skipping closed periods held in the snapshot
+    store, then parses them. A failed request leaves NaN in its model; when an
+    `incomplete` set is given, the names of those reports are added to it.
+    Returns {report: model}, where the models are:
+
+      box_score:                  (property_summary_dict, unit_summary_dict, leads_summary)
+      comparative_delinquency:    rent_summary
+      resident_aged_receivables:  delinquency_summary
+      resident_retention:         resident_retention_summary
+      rent_trend:                 RentTrend over the last constants.RENT_TREND_MONTHS months
+      leads_weekly:               WeeklyLeadCounts of the last constants.LEADS_TREND_WEEKS weeks
+    """
+    reports = [report for report in REPORTS if report in reports]
+    week_dates = helpers.get_week_boundaries_fridays()
+    week_ranges = property_unit_lead_summary_generator.get_week_ranges(week_dates)
+    three_months_mm_yyyy = rent_billed_collected_generator.get_three_months_mm_yyyy()
+    months = rent_billed_collected_generator.MONTHS
+    trend_months = rent_billed_collected_generator.get_trailing_months_mm_yyyy(constants.RENT_TREND_MONTHS)
+    today = helpers.get_today()
+    lead_weeks = daily_box_scores.week_windows(today, constants.LEADS_TREND_WEEKS)
+    lead_days = daily_box_scores.day_range(lead_weeks[0][0], today)
+
+    # closed weeks/months already in the snapshot store are not fetched again
+    store = snapshot_store.get_snapshot_store()
+    week_snapshots = property_unit_lead_summary_generator.load_week_snapshots(store, property_id, week_dates) \
+        if "box_score" in reports else {}
+    month_snapshots = rent_billed_collected_generator.load_month_snapshots(store, property_id, three_months_mm_yyyy) \
+        if "comparative_delinquency" in reports else {}
+    day_snapshots = daily_box_scores.load_day_snapshots(store, property_id, lead_days, today) \
+        if "leads_weekly" in reports else {}
+
+    tasks: dict[Hashable, FetchTask] = {}
+    if "box_score" in reports:
+        for i, (start, end) in enumerate(week_ranges):
+            if start + "-" + end not in week_snapshots:
+                tasks[("box_score", i)] = (property_unit_lead_summary_generator.fetch_box_score,
+                                           (property_id, start, end))
+    if "comparative_delinquency" in reports:
+        for month in months:
+            if three_months_mm_yyyy[month] not in month_snapshots:
+                tasks[("comparative_delinquency", month)] = (
+                    rent_billed_collected_generator.fetch_comparative_delinquency,
+                    (property_id, three_months_mm_yyyy[month]))
+    if "resident_aged_receivables" in reports:
+        tasks["resident_aged_receivables"] = (delinquency_generator.fetch_resident_aged_receivables, (property_id,))
+    if "resident_retention" in reports:
+        tasks["resident_retention"] = (resident_retention_generator.fetch_resident_retention, (property_id,))
+    if "rent_trend" in reports:
+        # one trailing-periods request covers every month of the trend
+        tasks["rent_trend"] = (rent_billed_collected_generator.fetch_comparative_delinquency_trend,
+                               (property_id, len(trend_months), trend_months[-1]))
+    if "leads_weekly" in reports:
+        # single-day box scores; days already in the snapshot store are not requested
+        for day in lead_days:
+            if day not in day_snapshots:
+                tasks[("box_score_day", day)] = (property_unit_lead_summary_generator.fetch_box_score,
+                                                 (property_id, day.isoformat(), day.isoformat()))
+
+    responses = fetch_all(tasks, max_workers)
+    if incomplete is not None:
+        incomplete.update(_task_report(key) for key, response in responses.items() if response is None)
+
+    models: dict[str, Any] = {}
+    if "box_score" in reports:
+        models["box_score"] = property_unit_lead_summary_generator.summarize_box_scores(
+            property_id, week_dates, [responses.get(("box_score", i)) for i in range(len(week_ranges))],
+            week_snapshots, store)
+    if "comparative_delinquency" in reports:
+        models["comparative_delinquency"] = rent_billed_collected_generator.summarize_rent_billed_collected(
+            property_id, three_months_mm_yyyy, [responses.get(("comparative_delinquency", month)) for month in months],
+            month_snapshots, store)
+    if "resident_aged_receivables" in reports:
+        models["resident_aged_receivables"] = delinquency_generator.summarize_delinquency(
+            property_id, responses["resident_aged_receivables"])
+    if "resident_retention" in reports:
+        models["resident_retention"] = resident_retention_generator.summarize_resident_retention(
+            property_id, responses["resident_retention"])
+    if "rent_trend" in reports:
+        models["rent_trend"] = rent_billed_collected_generator.summarize_rent_trend(
+            property_id, trend_months, responses["rent_trend"])
+    if "leads_weekly" in reports:
+        daily = daily_box_scores.summarize_daily_box_scores(
+            property_id, lead_days, {day: responses.get(("box_score_day", day)) for day in lead_days},
+            day_snapshots, store, today)
+        models["leads_weekly"] = daily_box_scores.weekly_lead_counts(daily, lead_weeks)
+    return models
+
+
+def fetch_daily_box_scores(property_id,
+                           first_day: date,
+                           last_day: Optional[date] = None,
+                           max_workers: Optional[int] = None) -> daily_box_scores.DailyBoxScores:
+    """
+    Daily box score counts from first_day to last_day (default today), fetching
+    only the days missing from the snapshot store. Any window inside the range
+    is then totalled by DailyBoxScores.total / totals without more requests.
+    """
+    today = helpers.get_today()
+    days = daily_box_scores.day_range(first_day, min(last_day or today, today))
+    store = snapshot_store.get_snapshot_store()
+    snapshots = daily_box_scores.load_day_snapshots(store, property_id, days, today)
+    responses = fetch_all({day: (property_unit_lead_summary_generator.fetch_box_score,
+                                 (property_id, day.isoformat(), day.isoformat()))
+                           for day in days if day not in snapshots}, max_workers)
+    return daily_box_scores.summarize_daily_box_scores(property_id, days, responses, snapshots, store, today)
+
+
+def fetch_property_models(property_id, max_workers: Optional[int] = None, incomplete: Optional[set] = None):
+    """
+    All four reports for one property (up to eight requests, sent together),
+    as the same models as calling the four generators in turn:
+
+    (property_summary_dict, unit_summary_dict, resident_retention_summary,
+     rent_summary, delinquency_summary, leads_summary)
+
+    Failed reports are added to `incomplete` as in fetch_report_models.
+    """
+    models = fetch_report_models(property_id, SUMMARY_REPORTS, max_workers, incomplete)
+    property_summary_dict, unit_summary_dict, leads_summary = models["box_score"]
+    return (property_summary_dict,
+            unit_summary_dict,
+            models["resident_retention"],
+            models["comparative_delinquency"],
+            models["resident_aged_receivables"],
+            leads_summary)
+
+
+def fetch_property_tables(property_id, max_workers: Optional[int] = None) -> summary_tables.SummaryTables:
+    """fetch_property_models as the columnar summary tables the dashboard renders."""
+    return summary_tables.from_models({property_id: fetch_property_models(property_id, max_workers)})
+
+
+def fetch_report_tables(property_id,
+                        reports=SUMMARY_REPORTS,
+                        max_workers: Optional[int] = None,
+                        incomplete: Optional[set] = None) -> dict[str, dict]:
+    """fetch_report_models as {report: {table_name: pyarrow.Table}} (see summary_tables.REPORT_TABLES)."""
+    models = fetch_report_models(property_id, reports, max_workers, incomplete)
+    return {report: summary_tables.report_tables(report, {property_id: model}) for report, model in models.items()}
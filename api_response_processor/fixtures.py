@@ -0,0 +1,150 @@
+"""
+Record/replay of real getReportData responses as gzipped JSON fixtures, one
+file per report + normalized filters (response_cache.cache_key):
+
+    <REPORT_FIXTURES_DIR>/<reportName>-<sha256(key)[:16]>.json.gz
+
+REPORT_FIXTURES=record saves every successful upstream response as it is
+fetched; REPORT_FIXTURES=replay answers client.post_report from the files
+instead of calling Entrata, sleeping the recorded latency scaled by
+REPORT_FIXTURES_LATENCY_SCALE. Both need USE_FAKE_DATA=0. Fixtures never hold
+request headers or the body's auth block, and the API key is redacted if a
+response echoes it.
+
+The filters hold dates derived from today, so the day of the recording is kept
+in <REPORT_FIXTURES_DIR>/recorded_on and a replay pins helpers.get_today() to
+it (or to REPORT_FIXTURES_TODAY).
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from typing import Any, Iterable, Iterator, Optional
+
+from api_response_processor import helpers, response_cache
+from config import constants
+
+RECORD = "record"
+REPLAY = "replay"
+REDACTED = "<redacted>"
+# Dropped wherever they appear in a recorded document (compared lower-cased).
+_CREDENTIAL_KEYS = frozenset({"auth", "x-api-key", "api_key", "apikey", "password"})
+RECORDED_ON = "recorded_on"
+_recorded_on: dict[str, date] = {}  # directory -> day of its recording, once read
+
+
+def mode() -> str:
+    return constants.REPORT_FIXTURES
+
+
+def fixture_name(report: Optional[str], key: str) -> str:
+    return f"{report or 'report'}-{hashlib.sha256(key.encode()).hexdigest()[:16]}"
+
+
+def fixture_path(body: dict, directory: Optional[str] = None) -> str:
+    name = fixture_name(body["method"]["params"].get("reportName"), response_cache.cache_key(body))
+    return os.path.join(directory or constants.REPORT_FIXTURES_DIR, name + ".json.gz")
+
+
+def _without_credentials(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _without_credentials(v) for k, v in value.items() if k.lower() not in _CREDENTIAL_KEYS}
+    if isinstance(value, list):
+        return [_without_credentials(v) for v in value]
+    return value
+
+
+def recorded_on(directory: Optional[str] = None) -> Optional[date]:
+    """The day the fixtures in directory were recorded (report timezone), None if unknown."""
+    directory = directory or constants.REPORT_FIXTURES_DIR
+    if directory not in _recorded_on:
+        try:
+            with open(os.path.join(directory, RECORDED_ON), encoding="utf-8") as f:
+                _recorded_on[directory] = date.fromisoformat(f.read().strip())
+        except (OSError, ValueError):
+            return None
+    return _recorded_on[directory]
+
+
+def replay_today() -> Optional[date]:
+    """The day a replay treats as today: REPORT_FIXTURES_TODAY, else the day of the recording."""
+    if constants.REPORT_FIXTURES_TODAY:
+        return date.fromisoformat(constants.REPORT_FIXTURES_TODAY)
+    return recorded_on()
+
+
+def _write_recorded_on(directory: str, day: date) -> None:
+    if _recorded_on.get(directory) == day:
+        return
+    with open(os.path.join(directory, RECORDED_ON), "w", encoding="utf-8") as f:
+        f.write(day.isoformat())
+    _recorded_on[directory] = day
+
+
+def record(body: dict,
+           payload: dict,
+           elapsed_seconds: float,
+           secrets: Iterable[Optional[str]] = (),
+           directory: Optional[str] = None) -> Optional[str]:
+    """Writes the fixture of one response; returns its path (None if it could not be written)."""
+    directory = directory or constants.REPORT_FIXTURES_DIR
+    path = fixture_path(body, directory)
+    document = json.dumps(_without_credentials({
+        "key": response_cache.cache_key(body),
+        "report": body["method"]["params"].get("reportName"),
+        "params": body["method"]["params"],
+        "recorded_at": time.time(),
+        "elapsed_ms": round(elapsed_seconds * 1000.0, 1),
+        "payload": payload,
+    }))
+    for secret in secrets:
+        if secret:
+            document = document.replace(secret, REDACTED)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+            f.write(document)
+        os.replace(path + ".tmp", path)
+        _write_recorded_on(directory, helpers.get_today())
+    except OSError as e:
+        print('Error writing report fixture:', e)
+        return None
+    return path
+
+
+def load(body: dict, directory: Optional[str] = None) -> Optional[dict]:
+    """The recorded document for body, or None when there is none."""
+    try:
+        with gzip.open(fixture_path(body, directory), "rt", encoding="utf-8") as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return document if document.get("key") == response_cache.cache_key(body) else None
+
+
+def replay(body: dict,
+           latency_scale: Optional[float] = None,
+           directory: Optional[str] = None) -> Optional[dict]:
+    """The recorded payload for body after its recorded latency (times latency_scale); None if not recorded."""
+    document = load(body, directory)
+    if document is None:
+        print('No report fixture for', response_cache.cache_key(body))
+        return None
+    scale = constants.REPORT_FIXTURES_LATENCY_SCALE if latency_scale is None else latency_scale
+    if scale > 0:
+        time.sleep(document.get("elapsed_ms", 0.0) / 1000.0 * scale)
+    return document["payload"]
+
+
+def iter_fixtures(directory: Optional[str] = None) -> Iterator[dict]:
+    """Every recorded document in directory, sorted by file name (for offline profiling)."""
+    directory = directory or constants.REPORT_FIXTURES_DIR
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".json.gz"))
+    except FileNotFoundError:
+        return
+    for name in names:
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+            yield json.load(f)
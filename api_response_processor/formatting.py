@@ -0,0 +1,33 @@
+"""
+Display formatting of the summary values and the period and lead stage labels,
+shared by the dashboard (app.py) and the batch tools (PDF export, weekly
+digest). Values are the models' floats or the Arrow-backed views' scalars.
+"""
+import pandas as pd
+
+MISSING = "—"
+DELINQUENCY_LABELS = {"current": "0-30 Days", "last": "30-60 Days", "last_to_last": "60-90 Days"}
+LEADS_WEEK_LABELS = {"current": "Current", "last": "Last", "week_before_last": "Week Before Last"}
+LEADS_STAGES = {"new_leads": "New Leads", "tours": "Tours",
+                "applications_completed": "Application Completed", "lease_approved": "Lease Approved"}
+# The weekly trend sums daily counts; its tours are not unique per week (see daily_box_scores)
+LEADS_TREND_STAGES = {"new_leads": "New Leads", "tour_visits": "Tour Visits (daily, summed)",
+                      "applications_completed": "Application Completed", "lease_approved": "Lease Approved"}
+
+
+def is_missing(value) -> bool:
+    """NaN / None in the models, <NA> in the Arrow-backed views."""
+    return pd.isna(value)
+
+
+def k(value, currency: bool = False, missing: str = MISSING) -> str:
+    if is_missing(value): return missing
+    if currency: return f"${value/1000:,.2f} K"
+    if float(value).is_integer(): return f"{int(value):,}"
+    return f"{value:,.2f}"
+
+
+def pct(value, missing: str = MISSING) -> str:
+    """value is a fraction: 0.7826 -> '78.26 %'."""
+    if is_missing(value): return missing
+    return f"{value * 100:,.2f} %"
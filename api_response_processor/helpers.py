@@ -1,20 +1,54 @@
 from datetime import date, timedelta, datetime
 from zoneinfo import ZoneInfo
-import streamlit as st
 import copy
+import math
+import os
 from config import constants
 
+# Entrata reports (and the Friday/Saturday week boundaries) are bucketed in Chicago time.
+REPORT_TIMEZONE = ZoneInfo("America/Chicago")
+
+def get_api_key() -> str:
+    """ENTRATA_API_KEY from the environment, else the Streamlit secret (headless jobs never import streamlit)."""
+    api_key = os.getenv("ENTRATA_API_KEY")
+    if api_key:
+        return api_key
+    import streamlit as st
+    return st.secrets["API_KEY"]
+
 #new ones
 def get_headers():
-    api_key = st.secrets["API_KEY"]
+    api_key = get_api_key()
     headers = copy.deepcopy(constants.HEADERS)
     headers["X-Api-Key"] = api_key
     return headers
 
+def to_float(value) -> float:
+    """Normalizes a report value to float; None, "" and anything non-numeric become NaN."""
+    if value is None or value == "":
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
 def _last_weekday_on_or_before(d: date, weekday: int) -> date:
     """Most recent 'weekday' on or before d."""
     return d - timedelta((d.weekday() - weekday) % 7)
 
+def get_today() -> date:
+    """
+    Today's date in the America/Chicago timezone the reports are bucketed in.
+    A fixture replay keeps the day the fixtures were recorded, so the requests
+    it builds match the recorded ones (see fixtures.replay_today).
+    """
+    if constants.REPORT_FIXTURES == "replay":
+        from api_response_processor import fixtures  # fixtures imports helpers
+        replay_today = fixtures.replay_today()
+        if replay_today is not None:
+            return replay_today
+    return datetime.now(REPORT_TIMEZONE).date()
+
 def get_week_boundaries_fridays() -> dict:
     """
     Returns:
@@ -38,7 +72,7 @@ def get_week_boundaries_fridays() -> dict:
     """
     FRIDAY = 4  # Monday=0 ... Sunday=6
     SATURDAY = 5
-    today = datetime.now(ZoneInfo("America/Chicago")).date()
+    today = get_today()
 
     last_saturday = _last_weekday_on_or_before(today, SATURDAY)
     last_friday = _last_weekday_on_or_before(last_saturday, FRIDAY)
@@ -0,0 +1,110 @@
+"""
+The last complete summary tables of every (property, report), with the time
+they were fetched. The dashboard renders from here right away, stale or not,
+while a background refresh replaces them (stale-while-revalidate).
+
+Entries live in memory for the whole process (every Streamlit session shares
+them); with constants.LAST_GOOD_DIR they are also written as Arrow IPC files,
+one per table, so a restarted server still has something to show:
+
+    <LAST_GOOD_DIR>/<property_id>/<report>/<table_name>.arrow
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import pyarrow as pa
+
+from config import constants
+
+_FETCHED_AT = b"fetched_at"
+
+
+@dataclass(slots=True)
+class Entry:
+    fetched_at: float  # epoch seconds
+    tables: dict[str, pa.Table]
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+
+class LastGoodStore:
+    def __init__(self, directory: Optional[str] = constants.LAST_GOOD_DIR):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], Entry] = {}
+
+    def _report_dir(self, property_id, report: str) -> str:
+        return os.path.join(self._directory, str(property_id), report)
+
+    def _read(self, property_id, report: str) -> Optional[Entry]:
+        report_dir = self._report_dir(property_id, report)
+        try:
+            names = sorted(name for name in os.listdir(report_dir) if name.endswith(".arrow"))
+        except FileNotFoundError:
+            return None
+        tables, fetched_at = {}, []
+        try:
+            for name in names:
+                with pa.memory_map(os.path.join(report_dir, name)) as source:
+                    table = pa.ipc.open_file(source).read_all()
+                tables[name[:-len(".arrow")]] = table
+                fetched_at.append(float((table.schema.metadata or {})[_FETCHED_AT]))
+        except (OSError, KeyError, ValueError, pa.ArrowInvalid) as e:
+            print('Error reading last good tables', report_dir, ':', e)
+            return None
+        # a put interrupted half way leaves tables of different fetches; the oldest one counts
+        return Entry(min(fetched_at), tables) if tables else None
+
+    def _write(self, property_id, report: str, entry: Entry) -> None:
+        report_dir = self._report_dir(property_id, report)
+        try:
+            os.makedirs(report_dir, exist_ok=True)
+            for name, table in entry.tables.items():
+                table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                       _FETCHED_AT: repr(entry.fetched_at).encode()})
+                path = os.path.join(report_dir, name + ".arrow")
+                with pa.OSFile(path + ".tmp", "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                os.replace(path + ".tmp", path)
+        except OSError as e:
+            print('Error writing last good tables', report_dir, ':', e)
+
+    def get(self, property_id, report: str) -> Optional[Entry]:
+        key = (str(property_id), report)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self._directory:
+            entry = self._read(property_id, report)
+            if entry is not None:
+                with self._lock:
+                    entry = self._entries.setdefault(key, entry)
+        return entry
+
+    def put(self, property_id, report: str, tables: dict[str, pa.Table],
+            fetched_at: Optional[float] = None) -> Entry:
+        entry = Entry(fetched_at or time.time(), dict(tables))
+        with self._lock:
+            current = self._entries.get((str(property_id), report))
+            if current is not None and current.fetched_at > entry.fetched_at:
+                return current  # a later fetch already landed
+            self._entries[(str(property_id), report)] = entry
+        if self._directory:
+            self._write(property_id, report, entry)
+        return entry
+
+
+_store: Optional[LastGoodStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> LastGoodStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LastGoodStore()
+    return _store
@@ -0,0 +1,265 @@
+import copy
+from typing import Any, Callable, Hashable, Optional
+
+from api_response_processor import (client,
+                                    data_classes,
+                                    fetch_engine,
+                                    helpers,
+                                    property_unit_lead_summary_generator,
+                                    rent_billed_collected_generator,
+                                    delinquency_generator,
+                                    resident_retention_generator,
+                                    snapshot_store,
+                                    summary_tables,
+                                    tracing)
+from config import constants
+
+PROPERTY_ID_FIELD = "property_id"
+
+BatchFetch = Callable[[list], Optional[dict[str, Any]]]
+# client.last_failure() reasons that smaller batches can get past (too large, timed out);
+# anything else (auth, bad request, outage) fails every half the same way
+SPLIT_ON_FAILURES = frozenset({client.TIMEOUT, 413, 504})
+
+
+def chunk_property_ids(property_ids: list, size: Optional[int] = None) -> list[list]:
+    size = max(1, size or constants.PORTFOLIO_BATCH_SIZE)
+    return [property_ids[i:i + size] for i in range(0, len(property_ids), size)]
+
+
+def _portfolio_body(template: dict, property_ids: list, summarize_by: Optional[str] = "property") -> dict:
+    body = copy.deepcopy(template)
+    filters = body["method"]["params"]["filters"]
+    filters["property_group_ids"] = list(property_ids)
+    if summarize_by:
+        filters["summarize_by"] = summarize_by
+    return body
+
+
+def _group_rows(rows: list, property_ids: list) -> dict[str, list]:
+    grouped = {str(p): [] for p in property_ids}
+    single = str(property_ids[0]) if len(property_ids) == 1 else None
+    for row in rows or []:
+        if not isinstance(row, dict):
+            continue
+        pid = row.get(PROPERTY_ID_FIELD)
+        key = single if pid is None else str(pid)
+        if key in grouped:
+            grouped[key].append(row)
+    return grouped
+
+
+@tracing.traced("parse")
+def split_by_property(api_response: Optional[dict], property_ids: list) -> dict[Hashable, dict]:
+    """
+    Splits a multi-property report response into one response per property id,
+    each shaped like the single-property response the build_* functions expect.
+    reportData may be a list of rows or a dict of row lists (box_score sections);
+    rows are matched on their property_id. Rows without one are only kept when a
+    single property was requested.
+    """
+    result = (api_response or {}).get("response", {}).get("result", [])
+    report_data = (result[0] if result else {}).get("reportData", [])
+
+    if isinstance(report_data, dict):
+        per_section = {section: _group_rows(rows, property_ids)
+                       for section, rows in report_data.items() if isinstance(rows, list)}
+        per_property = {str(p): {section: grouped[str(p)] for section, grouped in per_section.items()}
+                        for p in property_ids}
+    else:
+        per_property = _group_rows(report_data, property_ids)
+
+    return {p: {"response": {"result": [{"reportData": per_property[str(p)]}]}}
+            for p in property_ids}
+
+
+@tracing.traced("parse")
+def split_delinquency_by_property(api_response: Optional[dict],
+                                  property_ids: list) -> dict[Hashable, data_classes.DelinquencyForThreeMonths]:
+    """Per-property delinquency straight from the columnar subtotals, without splitting lease rows."""
+    totals, subtotals = delinquency_generator.aggregate_delinquency_buckets(api_response or {})
+    if len(property_ids) == 1 and not subtotals:
+        return {property_ids[0]: delinquency_generator.delinquency_from_buckets(totals)}
+    empty = data_classes.DelinquencyBuckets(0.0, 0.0, 0.0, 0.0, 0.0)
+    return {p: delinquency_generator.delinquency_from_buckets(subtotals.get(str(p), empty))
+            for p in property_ids}
+
+
+@tracing.traced("parse")
+def split_resident_retention_by_property(api_response: Optional[dict], property_ids: list) \
+        -> dict[Hashable, data_classes.ResidentRetentionSummaryForCurrentMonth]:
+    """Per-property retention summaries read from the portfolio rows in one pass, without splitting the response."""
+    values = resident_retention_generator.RESIDENT_RETENTION.by_property(api_response, property_ids)
+    return {pid: data_classes.ResidentRetentionSummaryForCurrentMonth(**values[pid]) for pid in property_ids}
+
+
+def fetch_split(fetch_batch: BatchFetch,
+                property_ids: list,
+                split: Callable[[Optional[dict], list], dict] = split_by_property,
+                failed: Optional[set] = None) -> dict[Hashable, Any]:
+    """
+    Fetches one batch and splits it per property. When the batch request fails
+    for its size (SPLIT_ON_FAILURES) it is halved and retried until single
+    properties; other failures are not retried. Properties whose request still
+    failed are added to `failed` when given.
+    """
+    response = fetch_batch(property_ids)
+    if response is None and len(property_ids) > 1 and client.last_failure() in SPLIT_ON_FAILURES:
+        mid = len(property_ids) // 2
+        return {**fetch_split(fetch_batch, property_ids[:mid], split, failed),
+                **fetch_split(fetch_batch, property_ids[mid:], split, failed)}
+    if response is None and failed is not None:
+        failed.update(property_ids)
+    return split(response, property_ids)
+
+
+def _stamp_fake(fake_response: dict, property_ids: list) -> dict:
+    """Repeats every fake row once per property id so fake data mirrors a portfolio response."""
+    report_data = fake_response["response"]["result"][0]["reportData"]
+
+    def stamp(rows):
+        return [{**row, PROPERTY_ID_FIELD: p} for p in property_ids for row in rows]
+
+    if isinstance(report_data, dict):
+        stamped = {section: stamp(rows) for section, rows in report_data.items()}
+    else:
+        stamped = stamp(report_data)
+    return {"response": {"result": [{"reportData": stamped}]}}
+
+
+def fetch_box_score_batch(property_ids: list, from_date, to_date):
+    if constants.USE_FAKE_DATA:
+        return _stamp_fake(property_unit_lead_summary_generator.get_fake_box_api_response(), property_ids)
+    body = _portfolio_body(constants.GET_BOX_SCORE_DATA, property_ids)
+    body["method"]["params"]["filters"]["period"]["daterange-start"] = from_date
+    body["method"]["params"]["filters"]["period"]["daterange-end"] = to_date
+    return client.post_report(body, "get reports box score")
+
+
+def fetch_comparative_delinquency_batch(property_ids: list, month):
+    if constants.USE_FAKE_DATA:
+        return _stamp_fake(rent_billed_collected_generator.get_fake_comparative_delinquency(), property_ids)
+    body = _portfolio_body(constants.GET_COMPARATIVE_DELINQUENCY_DATA, property_ids)
+    body["method"]["params"]["filters"]["period"]["pm"] = month
+    return client.post_report(body, "comparative delinquency")
+
+
+def fetch_resident_aged_receivables_batch(property_ids: list):
+    if constants.USE_FAKE_DATA:
+        return _stamp_fake(delinquency_generator.get_fake_delinquency_buckets_response(), property_ids)
+    # lease-level rows already carry their property_id, so the report stays unsummarized
+    body = _portfolio_body(constants.GET_RESIDENT_AGED_RECEIVABLES, property_ids, summarize_by=None)
+    return client.post_report(body, "resident aged receivables")
+
+
+def fetch_resident_retention_batch(property_ids: list):
+    if constants.USE_FAKE_DATA:
+        return _stamp_fake(resident_retention_generator.get_fake_expiring_and_renewals_response(), property_ids)
+    body = _portfolio_body(constants.GET_RESIDENT_RETENTION, property_ids)
+    return client.post_report(body, "resident retention")
+
+
+def fetch_portfolio_models(property_ids: list,
+                           batch_size: Optional[int] = None,
+                           max_workers: Optional[int] = None,
+                           incomplete: Optional[set] = None) -> dict[Hashable, tuple]:
+    """
+    Portfolio version of fetch_engine.fetch_property_models: packs up to
+    batch_size property ids into each report request, sends every batch of every
+    report concurrently, then splits the responses back per property. Closed
+    periods held in the snapshot store are read from it instead. A failed
+    request leaves NaN in its models; when an `incomplete` set is given, the
+    ids of the properties it covered are added to it.
+
+    Returns {property_id: (property_summary_dict, unit_summary_dict,
+    resident_retention_summary, rent_summary, delinquency_summary, leads_summary)}.
+    """
+    property_ids = list(dict.fromkeys(property_ids))
+    week_dates = helpers.get_week_boundaries_fridays()
+    week_ranges = property_unit_lead_summary_generator.get_week_ranges(week_dates)
+    three_months_mm_yyyy = rent_billed_collected_generator.get_three_months_mm_yyyy()
+    months = rent_billed_collected_generator.MONTHS
+
+    # closed weeks/months already in the snapshot store are only fetched for properties missing them
+    store = snapshot_store.get_snapshot_store()
+    week_snapshots = {pid: property_unit_lead_summary_generator.load_week_snapshots(store, pid, week_dates)
+                      for pid in property_ids}
+    month_snapshots = {pid: rent_billed_collected_generator.load_month_snapshots(store, pid, three_months_mm_yyyy)
+                       for pid in property_ids}
+
+    failed: set = set()
+    tasks: dict[Hashable, fetch_engine.FetchTask] = {}
+    for i, (start, end) in enumerate(week_ranges):
+        missing = [pid for pid in property_ids if start + "-" + end not in week_snapshots[pid]]
+        for chunk_no, chunk in enumerate(chunk_property_ids(missing, batch_size)):
+            tasks[("box_score", i, chunk_no)] = (
+                fetch_split, (lambda ids, s=start, e=end: fetch_box_score_batch(ids, s, e), chunk,
+                              split_by_property, failed))
+    for month in months:
+        period = three_months_mm_yyyy[month]
+        missing = [pid for pid in property_ids if period not in month_snapshots[pid]]
+        for chunk_no, chunk in enumerate(chunk_property_ids(missing, batch_size)):
+            tasks[("comparative_delinquency", month, chunk_no)] = (
+                fetch_split, (lambda ids, m=period: fetch_comparative_delinquency_batch(ids, m), chunk,
+                              split_by_property, failed))
+    for chunk_no, chunk in enumerate(chunk_property_ids(property_ids, batch_size)):
+        tasks[("resident_aged_receivables", chunk_no)] = (
+            fetch_split, (fetch_resident_aged_receivables_batch, chunk, split_delinquency_by_property, failed))
+        tasks[("resident_retention", chunk_no)] = (
+            fetch_split, (fetch_resident_retention_batch, chunk, split_resident_retention_by_property, failed))
+
+    per_report: dict[Hashable, dict] = {}
+    for key, split in fetch_engine.fetch_all(tasks, max_workers).items():
+        if split is None:  # the task raised
+            failed.update(tasks[key][1][1])
+        per_report.setdefault(key[:-1], {}).update(split or {})
+    if incomplete is not None:
+        incomplete.update(failed)
+
+    models = {}
+    for pid in property_ids:
+        (property_summary_dict,
+         unit_summary_dict,
+         leads_summary) = property_unit_lead_summary_generator.summarize_box_scores(
+            pid, week_dates, [per_report.get(("box_score", i), {}).get(pid) for i in range(len(week_ranges))],
+            week_snapshots[pid], store)
+        rent_summary = rent_billed_collected_generator.summarize_rent_billed_collected(
+            pid, three_months_mm_yyyy,
+            [per_report.get(("comparative_delinquency", month), {}).get(pid) for month in months],
+            month_snapshots[pid], store)
+        delinquency_summary = per_report.get(("resident_aged_receivables",), {}).get(pid) \
+            or delinquency_generator.sum_delinquency_buckets({})
+        resident_retention_summary = per_report.get(("resident_retention",), {}).get(pid) \
+            or resident_retention_generator.get_expiring_and_renewals({})
+        models[pid] = (property_summary_dict,
+                       unit_summary_dict,
+                       resident_retention_summary,
+                       rent_summary,
+                       delinquency_summary,
+                       leads_summary)
+    return models
+
+
+def fetch_models(property_ids: list, batch_size: Optional[int] = None,
+                 incomplete: Optional[set] = None) -> dict[Hashable, tuple]:
+    """
+    fetch_portfolio_models, or with USE_FAKE_DATA the per-property generators
+    (the batch requests have no fake payloads), for batch jobs that must run on
+    either. Properties with a failed request are added to `incomplete`.
+    """
+    if not constants.USE_FAKE_DATA:
+        return fetch_portfolio_models(property_ids, batch_size, incomplete=incomplete)
+    models = {}
+    for pid in dict.fromkeys(property_ids):
+        failed_reports: set = set()
+        models[pid] = fetch_engine.fetch_property_models(pid, incomplete=failed_reports)
+        if failed_reports and incomplete is not None:
+            incomplete.add(pid)
+    return models
+
+
+def fetch_portfolio_tables(property_ids: list,
+                           batch_size: Optional[int] = None,
+                           max_workers: Optional[int] = None) -> summary_tables.SummaryTables:
+    """fetch_portfolio_models as one set of summary tables keyed by property_id."""
+    return summary_tables.from_models(fetch_portfolio_models(property_ids, batch_size, max_workers))
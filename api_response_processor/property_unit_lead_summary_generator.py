@@ -1,29 +1,19 @@
-from typing import Union
+import operator
+from typing import Optional
 
-from api_response_processor import helpers, data_classes
+from api_response_processor import client, helpers, data_classes, extractors, snapshot_store, tracing
 import copy
 from config import constants
-import requests
+
+# Snapshot store report names for one parsed box score week.
+SNAPSHOT_REPORTS = ("property_summary", "units_summary", "lead_metrics")
 
 def get_box_score(property_id, from_date, to_date):
-    headers = helpers.get_headers()
     body = copy.deepcopy(constants.GET_BOX_SCORE_DATA)
     body["method"]["params"]["filters"]["property_group_ids"] = [property_id]
     body["method"]["params"]["filters"]["period"]["daterange-start"] = from_date
     body["method"]["params"]["filters"]["period"]["daterange-end"] = to_date
-    try:
-        response = requests.post(constants.REPORT_ENDPOINT,
-                                 json=body,
-                                 headers=headers,
-                                 timeout=60)
-        if response.status_code == 200:
-            return response.json()
-        print('Error in calling get reports box score endpoint:', response.status_code)
-        print(response.json())
-        return None
-    except requests.exceptions.RequestException as e:
-        print('Error:', e)
-    return None
+    return client.post_report(body, "get reports box score")
 
 def get_fake_box_api_response() -> dict:
     return {
@@ -83,79 +73,88 @@ def get_fake_box_api_response() -> dict:
 
 
 
-def _pct(value):
-    if value is None:
-        return None
-    try:
-        return f"{round(float(value) * 100.0, 2)}%"
-    except (TypeError, ValueError):
-        return None
-
-
+AVAILABILITY = ("availability",)
+PULSE = ("property_pulse", "pulse")
+LEAD_ACTIVITY = ("lead_activity",)
+LEAD_CONVERSIONS = ("lead_conversions",)
+
+# Output names equal the PropertySummary / UnitsSummary fields (in field order) and the lead metric keys.
+PROPERTY_SUMMARY_FIELDS = {
+    # percent_* arrive as fractions and are kept that way; app.pct formats them
+    "total_units": extractors.Field("total_units", AVAILABILITY),
+    "total_rentable_units": extractors.Field("total_rentable_units", AVAILABILITY),
+    "excluded_units": extractors.Field("excluded_units", AVAILABILITY),
+    "occupied_units_percentage": extractors.Field("percent_occupied", AVAILABILITY),
+    "leased_units_percentage": extractors.Field("percent_leased", AVAILABILITY),
+    "trend_percentage": extractors.Field("avg_not_exposed_leased_units", AVAILABILITY),
+}
+UNIT_SUMMARY_FIELDS = {
+    "count_of_occupied_units": extractors.Field("occupied_units", AVAILABILITY),
+    "count_of_on_notice_rented_units": extractors.Field("notice_rented_units", AVAILABILITY),
+    "count_of_on_notice_unrented_units": extractors.Field("notice_unrented_units", AVAILABILITY),
+    "count_of_vacant_units": extractors.Field("vacant_units", AVAILABILITY),
+    "count_of_vacant_rented_units": extractors.Field("vacant_rented_units", AVAILABILITY),
+    "count_of_vacant_unrented_units": extractors.Field("vacant_unrented_units", AVAILABILITY),
+    "count_of_total_move_ins": extractors.Field("move_ins", PULSE),
+    "count_of_total_move_out": extractors.Field("move_outs", PULSE),
+}
+LEAD_METRIC_FIELDS = {
+    "new_leads": extractors.Field("new_leads", LEAD_ACTIVITY),
+    "unique_visits_tours": extractors.Field("unique_visits_tours", LEAD_ACTIVITY),
+    "completed": extractors.Field("completed", LEAD_CONVERSIONS),
+    "approved": extractors.Field("approved", LEAD_CONVERSIONS),
+}
+EVICTION_AND_SKIP_FIELDS = {
+    # a week without skips/evictions may leave them out
+    "skips": extractors.Field("skips", PULSE, default=0),
+    "evictions_completed": extractors.Field("evictions_completed", PULSE, default=0),
+}
+# Everything the box score summaries need, read in one walk; the narrower
+# extractors serve callers that want a single summary.
+BOX_SCORE = extractors.Extractor("box_score", {
+    **PROPERTY_SUMMARY_FIELDS, **EVICTION_AND_SKIP_FIELDS, **UNIT_SUMMARY_FIELDS, **LEAD_METRIC_FIELDS,
+})
+PROPERTY_SUMMARY = extractors.Extractor("box_score.property_summary",
+                                        {**PROPERTY_SUMMARY_FIELDS, **EVICTION_AND_SKIP_FIELDS})
+UNIT_SUMMARY = extractors.Extractor("box_score.units_summary", UNIT_SUMMARY_FIELDS)
+LEAD_METRICS = extractors.Extractor("box_score.lead_metrics", LEAD_METRIC_FIELDS)
+
+
+# positional, in dataclass field order
+_property_summary_values = operator.itemgetter(*PROPERTY_SUMMARY_FIELDS)
+_unit_summary_values = operator.itemgetter(*UNIT_SUMMARY_FIELDS)
+
+def _property_summary(values: dict) -> data_classes.PropertySummary:
+    return data_classes.PropertySummary(*_property_summary_values(values),
+                                        values["skips"] + values["evictions_completed"])
+
+def _unit_summary(values: dict) -> data_classes.UnitsSummary:
+    return data_classes.UnitsSummary(*_unit_summary_values(values))
+
+def _lead_metrics(values: dict) -> dict[str, float]:
+    return {name: values[name] for name in LEAD_METRIC_FIELDS}
+
+@tracing.traced("parse")
+def parse_box_score(api_response: dict) -> tuple[data_classes.PropertySummary, data_classes.UnitsSummary,
+                                                 dict[str, float]]:
+    """(PropertySummary, UnitsSummary, lead metrics) from one walk of a box_score response."""
+    values = BOX_SCORE(api_response)
+    return _property_summary(values), _unit_summary(values), _lead_metrics(values)
+
+@tracing.traced("parse")
 def build_property_summary(api_response: dict) -> data_classes.PropertySummary:
-    result = api_response.get("response", {}).get("result", [])
-    report_data = (result[0] if result else {}).get("reportData", {})
-
-    availability_rows = report_data.get("availability", [])
-    availability = availability_rows[0] if availability_rows else {}
-
-    pulse_rows = report_data.get("property_pulse") or report_data.get("pulse") or []
-    pulse = pulse_rows[0] if pulse_rows else {}
-
-    total_units = availability.get("total_units")
-    total_rentable_units = availability.get("total_rentable_units")
-    excluded_units = availability.get("excluded_units")
-    percent_occupied = availability.get("percent_occupied")
-    percent_leased = availability.get("percent_leased")
-    avg_not_exposed_leased_units = availability.get("avg_not_exposed_leased_units")
-
-    skips = pulse.get("skips", 0) or 0
-    evictions_completed = pulse.get("evictions_completed", 0) or 0
-
-    return data_classes.PropertySummary(
-        total_units=total_units,
-        total_rentable_units=total_rentable_units,
-        excluded_units=excluded_units,
-        occupied_units_percentage=_pct(percent_occupied),
-        leased_units_percentage=_pct(percent_leased),
-        trend_percentage=_pct(avg_not_exposed_leased_units),
-        evictions_and_skips_occurred=skips + evictions_completed
-    )
+    return _property_summary(PROPERTY_SUMMARY(api_response))
 
+@tracing.traced("parse")
 def build_unit_summary(api_response: dict) -> data_classes.UnitsSummary:
-    result = api_response.get("response", {}).get("result", [])
-    report_data = (result[0] if result else {}).get("reportData", {})
-
-    availability = (report_data.get("availability") or [{}])[0]
-    pulse = (report_data.get("property_pulse") or report_data.get("pulse") or [{}])[0]
-
-    return data_classes.UnitsSummary(
-        count_of_occupied_units=availability.get("occupied_units"),
-        count_of_on_notice_rented_units=availability.get("notice_rented_units"),
-        count_of_on_notice_unrented_units=availability.get("notice_unrented_units"),
-        count_of_vacant_units=availability.get("vacant_units"),
-        count_of_vacant_rented_units=availability.get("vacant_rented_units"),
-        count_of_vacant_unrented_units=availability.get("vacant_unrented_units"),
-        count_of_total_move_ins=pulse.get("move_ins"),
-        count_of_total_move_out=pulse.get("move_outs"),
-    )
-
+    return _unit_summary(UNIT_SUMMARY(api_response))
 
-def _extract_lead_metrics(resp: dict) -> dict[str, Union[int, None]]:
+@tracing.traced("parse")
+def _extract_lead_metrics(resp: dict) -> dict[str, float]:
     """Pull new_leads, unique_visits_tours, completed, approved from a single API response."""
-    result = resp.get("response", {}).get("result", [])
-    report = (result[0] if result else {}).get("reportData", {})
-
-    lead_activity = (report.get("lead_activity") or [{}])[0]
-    lead_conversions = (report.get("lead_conversions") or [{}])[0]
-
-    return {
-        "new_leads": lead_activity.get("new_leads"),
-        "unique_visits_tours": lead_activity.get("unique_visits_tours"),
-        "completed": lead_conversions.get("completed"),
-        "approved": lead_conversions.get("approved"),
-    }
+    return LEAD_METRICS(resp)
 
+@tracing.traced("parse")
 def build_leads_summary(api_response_current_wk: dict,
                         api_response_last_wk: dict,
                         api_response_last_before_last_wk: dict,
@@ -164,6 +163,10 @@ def build_leads_summary(api_response_current_wk: dict,
     cur = _extract_lead_metrics(api_response_current_wk)
     prev = _extract_lead_metrics(api_response_last_wk)
     prev2 = _extract_lead_metrics(api_response_last_before_last_wk)
+    return build_leads_summary_from_metrics(cur, prev, prev2, week_date)
+
+def build_leads_summary_from_metrics(cur: dict, prev: dict, prev2: dict,
+                                     week_date: dict) -> data_classes.LeadsSummaryForThreeWeeks:
     return data_classes.LeadsSummaryForThreeWeeks(
         # current week
         current_week_start_date=week_date.get("last_saturday"),
@@ -189,43 +192,71 @@ def build_leads_summary(api_response_current_wk: dict,
     )
 
 
-def generate_property_unit_lead_summary(property_id):
-    week_dates = helpers.get_week_boundaries_fridays()
-    # box_score_report_current_wk = get_box_score(property_id, week_dates["last_saturday"], week_dates["today"])
-    box_score_report_current_wk = get_fake_box_api_response()
-
-    property_summary_current_wk = build_property_summary(box_score_report_current_wk)
-    property_summary_dict = {week_dates["last_saturday"] + "-" + week_dates["today"]: property_summary_current_wk}
-
-    # box_score_report_last_wk = get_box_score(property_id, week_dates["saturday_before_last_friday"], week_dates["last_friday"])
-    box_score_report_last_wk = get_fake_box_api_response()
-
-    property_summary_last_wk = build_property_summary(box_score_report_last_wk)
-    property_summary_dict[week_dates["saturday_before_last_friday"] + "-" + week_dates["last_friday"]] = property_summary_last_wk
-
-    # box_score_report_last_to_last_wk = get_box_score(property_id, week_dates["saturday_before_last_to_last_friday"], week_dates["last_to_last_friday"])
-    box_score_report_last_to_last_wk = get_fake_box_api_response()
-
-    property_summary_last_to_last_wk = build_property_summary(box_score_report_last_to_last_wk)
-    property_summary_dict [week_dates["saturday_before_last_to_last_friday"] + "-" + week_dates["last_to_last_friday"]] = property_summary_last_to_last_wk
-
+@tracing.traced("fetch", measure=tracing.measure_response)
+def fetch_box_score(property_id, from_date, to_date):
+    if constants.USE_FAKE_DATA:
+        return get_fake_box_api_response()
+    return get_box_score(property_id, from_date, to_date)
+
+
+def get_week_ranges(week_dates: dict) -> list[tuple[str, str]]:
+    """(start, end) date pairs for the current, last and week-before-last box scores."""
+    return [
+        (week_dates["last_saturday"], week_dates["today"]),
+        (week_dates["saturday_before_last_friday"], week_dates["last_friday"]),
+        (week_dates["saturday_before_last_to_last_friday"], week_dates["last_to_last_friday"]),
+    ]
+
+
+def load_week_snapshots(store, property_id, week_dates: dict) -> dict[str, tuple]:
+    """
+    Closed weeks (ending before today) already in the snapshot store, as
+    {week_key: (PropertySummary, UnitsSummary, lead_metrics)}.
+    """
+    closed_weeks = [start + "-" + end for start, end in get_week_ranges(week_dates) if end < week_dates["today"]]
+    if store is None or not closed_weeks:
+        return {}
+    stored = [store.get_many(property_id, report, closed_weeks) for report in SNAPSHOT_REPORTS]
+    return {week_key: tuple(by_week[week_key] for by_week in stored)
+            for week_key in closed_weeks if all(week_key in by_week for by_week in stored)}
+
+
+@tracing.traced("parse")
+def summarize_box_scores(property_id, week_dates: dict, box_score_reports: list,
+                         snapshots: Optional[dict[str, tuple]] = None, store=None):
+    """
+    Builds the property, unit and lead summaries from the three weekly box score
+    responses, ordered as returned by get_week_ranges(). Weeks found in snapshots
+    (see load_week_snapshots) need no response; freshly parsed closed weeks are
+    written to store.
+    """
+    snapshots = snapshots or {}
+    property_summary_dict, unit_summary_dict, lead_metrics = {}, {}, []
+    for (start, end), report in zip(get_week_ranges(week_dates), box_score_reports):
+        week_key = start + "-" + end
+        if week_key in snapshots:
+            property_summary, unit_summary, metrics = snapshots[week_key]
+        else:
+            property_summary, unit_summary, metrics = parse_box_score(report or {})
+            if store is not None and report and end < week_dates["today"]:
+                for name, value in zip(SNAPSHOT_REPORTS, (property_summary, unit_summary, metrics)):
+                    store.put(property_id, name, week_key, value)
+        property_summary_dict[week_key] = property_summary
+        unit_summary_dict[week_key] = unit_summary
+        lead_metrics.append(metrics)
     print("Calculated the property summary for " + f"{property_id}")
-
-    unit_summary_current_wk = build_unit_summary(box_score_report_current_wk)
-    unit_summary_dict = {week_dates["last_saturday"] + "-" + week_dates["today"]: unit_summary_current_wk}
-
-    unit_summary_last_wk = build_unit_summary(box_score_report_last_wk)
-    unit_summary_dict[week_dates["saturday_before_last_friday"] + "-" + week_dates["last_friday"]] = unit_summary_last_wk
-
-    unit_summary_last_to_last_wk = build_unit_summary(box_score_report_last_to_last_wk)
-    unit_summary_dict[week_dates["saturday_before_last_to_last_friday"] + "-" + week_dates[
-        "last_to_last_friday"]] = unit_summary_last_to_last_wk
     print("Calculated the unit summary for " + f"{property_id}")
 
-    leads_summary = build_leads_summary(box_score_report_current_wk,
-                                        box_score_report_last_wk,
-                                        box_score_report_last_to_last_wk,
-                                        week_dates)
+    leads_summary = build_leads_summary_from_metrics(*lead_metrics, week_dates)
     print("Calculated the lead summary for " + f"{property_id}")
 
-    return property_summary_dict, unit_summary_dict, leads_summary
\ No newline at end of file
+    return property_summary_dict, unit_summary_dict, leads_summary
+
+
+def generate_property_unit_lead_summary(property_id):
+    week_dates = helpers.get_week_boundaries_fridays()
+    store = snapshot_store.get_snapshot_store()
+    snapshots = load_week_snapshots(store, property_id, week_dates)
+    box_score_reports = [None if start + "-" + end in snapshots else fetch_box_score(property_id, start, end)
+                         for start, end in get_week_ranges(week_dates)]
+    return summarize_box_scores(property_id, week_dates, box_score_reports, snapshots, store)
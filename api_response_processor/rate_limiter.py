@@ -0,0 +1,177 @@
+"""
+Process-wide token bucket in front of constants.REPORT_ENDPOINT. Every
+upstream attempt (retries included) takes a token; the bucket refills at
+RATE_LIMIT_REQUESTS_PER_SECOND up to RATE_LIMIT_BURST.
+
+Waiting callers are served by priority class, then arrival: an interactive
+dashboard load queued behind tab prefetches or the scheduler's warm-up takes
+the next token. The class comes from a context variable, so code that runs
+background work wraps it in `with priority(BACKGROUND):` (fetch_engine
+workers inherit it).
+
+A 429 empties the bucket and pauses background callers for the Retry-After
+(or an exponential backoff while 429s keep coming); interactive callers are
+not paused, they only wait for tokens.
+
+A request that several callers wait on (client.post_report coalesces them)
+acquires with a RequestPriority: an interactive caller joining a background
+request raises it, so it does not wait out the background pause.
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from config import constants
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("rate_limit_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Requests made in this block (and in fetch_engine tasks it starts) use `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class RequestPriority:
+    """
+    The priority of one request shared by the callers waiting on it: the
+    caller sending it acquires with it, a more urgent one joining it calls
+    RateLimiter.raise_priority. Defaults to the current context's priority.
+    """
+    __slots__ = ("level", "_arrival")
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = current_priority() if level is None else level
+        self._arrival: Optional[int] = None  # of its ticket, while one is queued
+
+
+class RateLimiter:
+    """Token bucket with a priority queue of waiters; rate <= 0 disables limiting."""
+
+    def __init__(self,
+                 rate: float = constants.RATE_LIMIT_REQUESTS_PER_SECOND,
+                 burst: int = constants.RATE_LIMIT_BURST,
+                 timer: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._timer = timer
+        self._cond = threading.Condition()
+        self._tokens = float(self.burst)
+        self._updated = timer()
+        self._waiting: list[tuple[int, int]] = []  # heap of (priority, arrival)
+        self._arrivals = itertools.count()
+        self._background_paused_until = 0.0
+        self._throttled_in_a_row = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_for(self, ticket: tuple[int, int], now: float) -> Optional[float]:
+        """0 when ticket may take a token now, else seconds to wait (None: until notified)."""
+        if self._waiting[0] != ticket:
+            return None
+        if ticket[0] >= BACKGROUND and now < self._background_paused_until:
+            return self._background_paused_until - now
+        if self._tokens >= 1:
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def acquire(self, level: Optional[int] = None, request: Optional[RequestPriority] = None) -> float:
+        """
+        Blocks until a token is available for this caller; returns the seconds
+        waited. With a request, its level is used, raised or not.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._cond:
+            if request is not None:
+                level = request.level
+            ticket = (current_priority() if level is None else level, next(self._arrivals))
+            if request is not None:
+                request._arrival = ticket[1]
+            started = self._timer()
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if request is not None:
+                        ticket = (request.level, ticket[1])  # raise_priority may have moved it
+                    now = self._timer()
+                    self._refill(now)
+                    wait = self._wait_for(ticket, now)
+                    if wait == 0:
+                        heapq.heappop(self._waiting)
+                        self._tokens -= 1
+                        return now - started
+                    self._cond.wait(wait)
+            except BaseException:
+                if request is not None:
+                    ticket = (request.level, ticket[1])
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                raise
+            finally:
+                if request is not None:
+                    request._arrival = None
+                # the queue head changed (or may take a token now)
+                self._cond.notify_all()
+
+    def raise_priority(self, request: RequestPriority, level: int) -> None:
+        """Moves request, and its ticket if one is queued, up to level when that is more urgent."""
+        with self._cond:
+            if level >= request.level:
+                return
+            if request._arrival is not None:
+                i = self._waiting.index((request.level, request._arrival))
+                self._waiting[i] = (level, request._arrival)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+            request.level = level
+
+    def throttled(self, retry_after: Optional[float] = None) -> float:
+        """
+        Records a 429: drains the bucket and pauses background callers for
+        retry_after seconds, or HTTP_BACKOFF_BASE_SECONDS doubled per 429 in a
+        row (capped at HTTP_BACKOFF_MAX_SECONDS). Returns the pause.
+        """
+        with self._cond:
+            self._throttled_in_a_row += 1
+            pause = retry_after
+            if pause is None:
+                pause = constants.HTTP_BACKOFF_BASE_SECONDS * 2 ** (self._throttled_in_a_row - 1)
+            pause = min(pause, constants.HTTP_BACKOFF_MAX_SECONDS)
+            now = self._timer()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._background_paused_until = max(self._background_paused_until, now + pause)
+            self._cond.notify_all()
+            return pause
+
+    def accepted(self) -> None:
+        """Records a response that was not a 429, ending the backoff streak."""
+        with self._cond:
+            self._throttled_in_a_row = 0
+
+
+_limiter = RateLimiter()
+
+
+def get_limiter() -> RateLimiter:
+    """The limiter shared by every Streamlit session, prefetch thread and fetch_engine worker."""
+    return _limiter
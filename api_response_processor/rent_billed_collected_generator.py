@@ -1,29 +1,24 @@
+import functools
 from typing import Optional, Any
-from datetime import date
 
-from api_response_processor import helpers, data_classes
+from api_response_processor import client, data_classes, extractors, helpers, snapshot_store, tracing
 import copy
 from config import constants
-import requests
 
 def get_comparative_delinquency(property_id, month):
-    headers = helpers.get_headers()
     body = copy.deepcopy(constants.GET_COMPARATIVE_DELINQUENCY_DATA)
     body["method"]["params"]["filters"]["property_group_ids"] = [property_id]
     body["method"]["params"]["filters"]["period"]["pm"] = month #MM/YYYY
-    try:
-        response = requests.post(constants.REPORT_ENDPOINT,
-                                 json=body,
-                                 headers=headers,
-                                 timeout=60)
-        if response.status_code == 200:
-            return response.json()
-        print('Error in calling comparative delinquency endpoint:', response.status_code)
-        print(response.json())
-        return None
-    except requests.exceptions.RequestException as e:
-        print('Error:', e)
-    return None
+    return client.post_report(body, "comparative delinquency")
+
+def get_comparative_delinquency_trend(property_id, months: int, end_month: str):
+    """One request for the `months` months ending with end_month (MM/YYYY): amount_due_N is N months back."""
+    body = copy.deepcopy(constants.GET_COMPARATIVE_DELINQUENCY_DATA)
+    filters = body["method"]["params"]["filters"]
+    filters["property_group_ids"] = [property_id]
+    filters["period"]["pm"] = end_month
+    filters["compare_against_trailing_periods"] = str(months - 1)
+    return client.post_report(body, "comparative delinquency trend")
 
 def get_fake_comparative_delinquency():
     """
@@ -48,18 +43,37 @@ def get_fake_comparative_delinquency():
     }
 
 
+def get_fake_comparative_delinquency_trend(months: int):
+    """Fake replacement for get_comparative_delinquency_trend (amount_due_0 = the latest month)."""
+    row = {}
+    for n in range(months):
+        row[f"amount_due_{n}"] = 125000 - 750 * n
+        row[f"total_allocations_{n}"] = 118500 - 600 * n - 900 * (n % 3)
+    return {"response": {"result": [{"reportData": [row]}]}}
+
+
 def _mm_yyyy(year: int, month: int) -> str:
     return f"{month:02d}/{year}"
 
+def get_trailing_months_mm_yyyy(months: int) -> list[str]:
+    """MM/YYYY of the `months` months ending with the current one, oldest first."""
+    today = helpers.get_today()
+    current = today.year * 12 + today.month - 1  # months since January of year 0
+    labels = []
+    for index in range(current - months + 1, current + 1):
+        year, month_index = divmod(index, 12)
+        labels.append(_mm_yyyy(year, month_index + 1))
+    return labels
+
 def get_three_months_mm_yyyy() -> dict[str, str]:
     """
     Returns month labels in MM/YYYY for:
       - current
       - last
       - last_to_last
-    If ref_date is not provided, uses today's date.
+    Today is helpers.get_today(), like get_trailing_months_mm_yyyy.
     """
-    d = date.today()
+    d = helpers.get_today()
     y, m = d.year, d.month
 
     # current
@@ -84,47 +98,60 @@ def get_three_months_mm_yyyy() -> dict[str, str]:
         "last_to_last": last_to_last,
     }
 
-def _to_int(v) -> Optional[int]:
-    if v is None:
-        return None
-    try:
-        return int(round(float(v)))
-    except (TypeError, ValueError):
-        return None
+# reportData is a list with one row, or a dict of row lists (the first non-empty one is read)
+RENT_METRICS = extractors.Extractor("comparative_delinquency", {
+    "billed": extractors.Field("amount_due_0"),
+    "collected": extractors.Field("total_allocations_0"),
+})
 
-def _extract_rent_metrics(resp: dict[str, Any]) -> dict[str, Optional[int]]:
+@tracing.traced("parse")
+def _extract_rent_metrics(resp: dict[str, Any]) -> dict[str, float]:
     """
     Payload shape:
     response.result[0].reportData -> list with one row dict.
     Uses amount_due_0 (billed) and total_allocations_0 (collected).
     """
-    result = resp.get("response", {}).get("result", [])
-    first_result = result[0] if isinstance(result, list) and result else {}
-    report_data = first_result.get("reportData", [])
-
-    # Normalize to the first row dict
-    if isinstance(report_data, list):
-        row = report_data[0] if report_data else {}
-    elif isinstance(report_data, dict):
-        row = next((v[0] for v in report_data.values() if isinstance(v, list) and v), {})
-    else:
-        row = {}
-
-    return {
-        "billed": row.get("amount_due_0"),
-        "collected": row.get("total_allocations_0"),
-    }
-
-def generate_rent_billed_collected_summary(property_id) -> data_classes.RentSummaryForCurrentAndLastTwoMonths:
-    three_months_mm_yyyy = get_three_months_mm_yyyy()
-
-    # current_month_summary = _extract_rent_metrics(get_comparative_delinquency(property_id, three_months_mm_yyyy["current"]))
-    # last_month_summary = _extract_rent_metrics(get_comparative_delinquency(property_id, three_months_mm_yyyy["last"]))
-    # last_to_last_month_summary = _extract_rent_metrics(get_comparative_delinquency(property_id, three_months_mm_yyyy["last_to_last"]))
-
-    current_month_summary = _extract_rent_metrics(get_fake_comparative_delinquency())
-    last_month_summary = _extract_rent_metrics(get_fake_comparative_delinquency())
-    last_to_last_month_summary = _extract_rent_metrics(get_fake_comparative_delinquency())
+    return RENT_METRICS(resp)
+
+@tracing.traced("fetch", measure=tracing.measure_response)
+def fetch_comparative_delinquency(property_id, month):
+    if constants.USE_FAKE_DATA:
+        return get_fake_comparative_delinquency()
+    return get_comparative_delinquency(property_id, month)
+
+MONTHS = ("current", "last", "last_to_last")
+# Only the current month is still open; the two earlier months are closed.
+CLOSED_MONTHS = ("last", "last_to_last")
+SNAPSHOT_REPORT = "rent_billed_collected"
+
+def load_month_snapshots(store, property_id, three_months_mm_yyyy: dict[str, str]) -> dict[str, dict]:
+    """Closed months already in the snapshot store, as {MM/YYYY: {"billed", "collected"}}."""
+    if store is None:
+        return {}
+    return store.get_many(property_id, SNAPSHOT_REPORT, [three_months_mm_yyyy[m] for m in CLOSED_MONTHS])
+
+@tracing.traced("parse")
+def summarize_rent_billed_collected(property_id,
+                                    three_months_mm_yyyy: dict[str, str],
+                                    comparative_delinquency_reports: list,
+                                    snapshots: Optional[dict[str, dict]] = None,
+                                    store=None) -> data_classes.RentSummaryForCurrentAndLastTwoMonths:
+    """
+    Builds the rent summary from the current, last and last-to-last month
+    comparative delinquency responses (in that order). Months found in
+    snapshots need no response; freshly parsed closed months are written to store.
+    """
+    snapshots = snapshots or {}
+    metrics = []
+    for month, report in zip(MONTHS, comparative_delinquency_reports):
+        period = three_months_mm_yyyy[month]
+        if period in snapshots:
+            metrics.append(snapshots[period])
+            continue
+        metrics.append(_extract_rent_metrics(report or {}))
+        if store is not None and report and month in CLOSED_MONTHS:
+            store.put(property_id, SNAPSHOT_REPORT, period, metrics[-1])
+    current_month_summary, last_month_summary, last_to_last_month_summary = metrics
 
     print("Calculated the rent billed collected summary for " + f"{property_id}")
     return data_classes.RentSummaryForCurrentAndLastTwoMonths(
@@ -139,4 +166,52 @@ def generate_rent_billed_collected_summary(property_id) -> data_classes.RentSumm
         month_before_last_date = three_months_mm_yyyy["last_to_last"],
         month_before_last_total_rent_billed = last_to_last_month_summary["billed"],
         month_before_last_total_rent_collected = last_to_last_month_summary["collected"],
-    )
\ No newline at end of file
+    )
+
+def generate_rent_billed_collected_summary(property_id) -> data_classes.RentSummaryForCurrentAndLastTwoMonths:
+    three_months_mm_yyyy = get_three_months_mm_yyyy()
+    store = snapshot_store.get_snapshot_store()
+    snapshots = load_month_snapshots(store, property_id, three_months_mm_yyyy)
+    reports = [None if three_months_mm_yyyy[month] in snapshots
+               else fetch_comparative_delinquency(property_id, three_months_mm_yyyy[month])
+               for month in MONTHS]
+    return summarize_rent_billed_collected(property_id, three_months_mm_yyyy, reports, snapshots, store)
+
+
+@functools.lru_cache(maxsize=None)
+def _rent_series_extractor(months: int) -> extractors.Extractor:
+    """amount_due_0 .. amount_due_{months-1}, then total_allocations_0 .. total_allocations_{months-1}."""
+    return extractors.Extractor(f"comparative_delinquency_trend[{months}]", {
+        f"{prefix}_{n}": extractors.Field(f"{prefix}_{n}")
+        for prefix in ("amount_due", "total_allocations") for n in range(months)
+    })
+
+@tracing.traced("parse")
+def _extract_rent_series(resp: dict[str, Any], months: int) -> tuple[list[float], list[float]]:
+    """
+    (billed, collected) for N = 0 .. months-1 from the amount_due_N /
+    total_allocations_N columns. N counts back from the requested month;
+    missing columns are NaN.
+    """
+    values = list(_rent_series_extractor(months)(resp).values())
+    return values[:months], values[months:]
+
+@tracing.traced("fetch", measure=tracing.measure_response)
+def fetch_comparative_delinquency_trend(property_id, months: int, end_month: str):
+    if constants.USE_FAKE_DATA:
+        return get_fake_comparative_delinquency_trend(months)
+    return get_comparative_delinquency_trend(property_id, months, end_month)
+
+@tracing.traced("parse")
+def summarize_rent_trend(property_id, periods: list[str], comparative_delinquency_trend) -> data_classes.RentTrend:
+    """periods: MM/YYYY oldest first, as from get_trailing_months_mm_yyyy."""
+    billed, collected = _extract_rent_series(comparative_delinquency_trend or {}, len(periods))
+    print("Calculated the rent trend for " + f"{property_id}")
+    return data_classes.RentTrend(periods=list(periods),
+                                  total_rent_billed=billed[::-1],
+                                  total_rent_collected=collected[::-1])
+
+def generate_rent_trend(property_id, months: int = constants.RENT_TREND_MONTHS) -> data_classes.RentTrend:
+    periods = get_trailing_months_mm_yyyy(months)
+    return summarize_rent_trend(property_id, periods,
+                                fetch_comparative_delinquency_trend(property_id, months, periods[-1]))
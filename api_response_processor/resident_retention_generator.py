@@ -1,29 +1,21 @@
 import copy
 
-import requests
-
 from config import constants
 
-from api_response_processor import helpers, data_classes
+from api_response_processor import client, data_classes, extractors, tracing
 
 def get_resident_retention(property_id):
-    headers = helpers.get_headers()
     body = copy.deepcopy(constants.GET_RESIDENT_RETENTION)
     body["method"]["params"]["filters"]["property_group_ids"] = [property_id]
-    try:
-        response = requests.post(constants.REPORT_ENDPOINT,
-                                 json=body,
-                                 headers=headers,
-                                 timeout=60)
-        if response.status_code == 200:
-            return response.json()
-        print('Error in calling comparative delinquency endpoint:', response.status_code)
-        print(response.json())
-        return None
-    except requests.exceptions.RequestException as e:
-        print('Error:', e)
-    return None
+    return client.post_report(body, "resident retention")
+
+# Output names equal the ResidentRetentionSummaryForCurrentMonth fields.
+RESIDENT_RETENTION = extractors.Extractor("resident_retention", {
+    "expiring_leases": extractors.Field("expiring_leases"),
+    "renewals": extractors.Field("renewals"),
+})
 
+@tracing.traced("parse")
 def get_expiring_and_renewals(resp: dict) -> data_classes.ResidentRetentionSummaryForCurrentMonth:
     """
     Extracts expiring_leases and renewals from API response.
@@ -32,22 +24,9 @@ def get_expiring_and_renewals(resp: dict) -> data_classes.ResidentRetentionSumma
         resp (dict): API response dictionary
 
     Returns:
-        dict: {
-            "expiring_leases": int or None,
-            "renewals": int or None
-        }
+        ResidentRetentionSummaryForCurrentMonth, NaN for a missing value
     """
-    result = resp.get("response", {}).get("result", [])
-    report_data = (result[0] if result else {}).get("reportData", [])
-    row = report_data[0] if report_data else {}
-
-    expiring_leases = row.get("expiring_leases")
-    renewals = row.get("renewals")
-
-    return data_classes.ResidentRetentionSummaryForCurrentMonth(
-        expiring_leases=expiring_leases,
-        renewals=renewals
-    )
+    return data_classes.ResidentRetentionSummaryForCurrentMonth(**RESIDENT_RETENTION(resp))
 
 def get_fake_expiring_and_renewals_response():
     """
@@ -70,7 +49,16 @@ def get_fake_expiring_and_renewals_response():
 
 
 
-def build_resident_retention(property_id):
-    rr = get_fake_expiring_and_renewals_response()
+@tracing.traced("fetch", measure=tracing.measure_response)
+def fetch_resident_retention(property_id):
+    if constants.USE_FAKE_DATA:
+        return get_fake_expiring_and_renewals_response()
+    return get_resident_retention(property_id)
+
+@tracing.traced("parse")
+def summarize_resident_retention(property_id, rr) -> data_classes.ResidentRetentionSummaryForCurrentMonth:
     print("Calculated the resident retention summary for " + f"{property_id}")
-    return get_expiring_and_renewals(rr)
+    return get_expiring_and_renewals(rr or {})
+
+def build_resident_retention(property_id):
+    return summarize_resident_retention(property_id, fetch_resident_retention(property_id))
@@ -0,0 +1,170 @@
+import contextvars
+import gzip
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Iterator, Optional
+
+from cachetools import TLRUCache
+
+from api_response_processor import helpers
+from config import constants
+
+# Reports whose period is always the open one (current post month / current month).
+_ALWAYS_OPEN_PERIOD_TYPES = {"currentpm", "currentcm", "today"}
+
+_refresh_open: contextvars.ContextVar[bool] = contextvars.ContextVar("refresh_open_periods", default=False)
+
+
+@contextmanager
+def refresh_open_periods() -> Iterator[None]:
+    """
+    Cache reads in this block (and in fetch_engine tasks it starts) miss on
+    entries that can still change (finite TTL), so they are fetched again and
+    overwritten. Callers outside the block keep reading them.
+    """
+    token = _refresh_open.set(True)
+    try:
+        yield
+    finally:
+        _refresh_open.reset(token)
+
+
+def cache_key(body: dict) -> str:
+    """
+    Normalized method.params of a getReportData body: sorted keys, and
+    property_group_ids sorted as strings so [2, 1] and ["1", "2"] share an entry.
+    """
+    params = json.loads(json.dumps(body["method"]["params"]))
+    filters = params.get("filters") or {}
+    if "property_group_ids" in filters:
+        filters["property_group_ids"] = sorted(str(p) for p in filters["property_group_ids"])
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def is_closed_period(params: dict, today: Optional[date] = None) -> bool:
+    """True when the report covers a period that ended before today (numbers are final)."""
+    today = today or helpers.get_today()
+    period = (params.get("filters") or {}).get("period") or {}
+    period_type = period.get("period_type")
+    if period_type in _ALWAYS_OPEN_PERIOD_TYPES:
+        return False
+    if period_type == "daterange":
+        end = period.get("daterange-end")
+        return bool(end) and date.fromisoformat(end) < today
+    if period_type == "pm" and period.get("pm"):
+        month, year = (int(part) for part in period["pm"].split("/"))
+        return (year, month) < (today.year, today.month)
+    return False
+
+
+def ttl_for(params: dict, today: Optional[date] = None) -> float:
+    if is_closed_period(params, today):
+        return math.inf
+    return constants.RESPONSE_CACHE_TTL_SECONDS.get(params.get("reportName"),
+                                                    constants.RESPONSE_CACHE_DEFAULT_TTL_SECONDS)
+
+
+class ResponseCache:
+    """
+    Report responses keyed by cache_key(). The memory layer is an LRU bounded by
+    max_bytes (serialized JSON size) whose entries expire per report TTL; the
+    optional disk layer (cache_dir) keeps gzipped entries across restarts.
+
+    Cached payloads are shared between callers and must be treated as read-only.
+    Inside refresh_open_periods() open-period entries read as misses; the
+    prefetch scheduler uses this to re-warm the current period.
+    """
+
+    def __init__(self,
+                 max_bytes: int = constants.RESPONSE_CACHE_MAX_BYTES,
+                 cache_dir: Optional[str] = constants.RESPONSE_CACHE_DIR,
+                 timer: Callable[[], float] = time.time):
+        self._timer = timer
+        self._memory = TLRUCache(maxsize=max_bytes,
+                                 ttu=lambda _key, entry, _now: entry[2],
+                                 timer=timer,
+                                 getsizeof=lambda entry: entry[1])
+        self._max_bytes = max_bytes
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".json.gz")
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            return None if self._refreshing(entry[2]) else entry[0]
+        if not self._cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires_at = math.inf if stored["expires_at"] is None else stored["expires_at"]
+        if stored.get("key") != key or expires_at <= self._timer() or self._refreshing(expires_at):
+            return None
+        self._remember(key, stored["payload"], stored["size"], expires_at)
+        return stored["payload"]
+
+    @staticmethod
+    def _refreshing(expires_at: float) -> bool:
+        return _refresh_open.get() and not math.isinf(expires_at)
+
+    def set(self, key: str, payload: dict[str, Any], ttl_seconds: float) -> None:
+        if payload is None or ttl_seconds <= 0:
+            return
+        encoded = json.dumps(payload, separators=(",", ":"))
+        expires_at = self._timer() + ttl_seconds
+        self._remember(key, payload, len(encoded), expires_at)
+        if self._cache_dir:
+            self._write_disk(key, encoded, expires_at)
+
+    def _remember(self, key: str, payload: dict, size: int, expires_at: float) -> None:
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._memory[key] = (payload, size, expires_at)
+
+    def _write_disk(self, key: str, encoded_payload: str, expires_at: float) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        record = ('{"key":' + json.dumps(key) +
+                  ',"expires_at":' + ("null" if math.isinf(expires_at) else repr(expires_at)) +
+                  ',"size":' + str(len(encoded_payload)) +
+                  ',"payload":' + encoded_payload + '}')
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                f.write(record)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print('Error writing response cache entry:', e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
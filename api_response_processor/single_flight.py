@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        self.state: Any = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs fn, the
+    ones that arrive while it is in flight wait and receive the same result (or
+    exception). Calls made after it finished run fn again.
+
+    Counters per label: "calls" (fn actually run) and "coalesced" (callers
+    that shared another caller's run).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, _Call] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], label: str = "",
+           state: Any = None, join: Optional[Callable[[Any], None]] = None) -> tuple[Any, bool]:
+        """
+        Returns (result, shared); shared is True when another caller's run was
+        reused. The state of the caller that runs fn is kept with the call; a
+        caller that waits for it first calls join(that state), e.g. to raise the
+        run's rate limiter priority to its own.
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            stats = self._stats.setdefault(label, {"calls": 0, "coalesced": 0})
+            if leader:
+                call = self._in_flight[key] = _Call()
+                call.state = state
+                stats["calls"] += 1
+            else:
+                call.waiters += 1
+                stats["coalesced"] += 1
+        if not leader:
+            if join is not None:
+                join(call.state)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """{label: {"calls", "coalesced"}} plus a "total" entry."""
+        with self._lock:
+            stats = {label: dict(counts) for label, counts in self._stats.items()}
+        stats["total"] = {name: sum(counts[name] for counts in stats.values()) for name in ("calls", "coalesced")}
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_group = SingleFlight()
+
+
+def get_group() -> SingleFlight:
+    """The process-wide group shared by every Streamlit session and worker thread."""
+    return _group
@@ -0,0 +1,195 @@
+"""
+Columnar (pyarrow) form of the dashboard summaries: one table per summary
+with a row per (property_id, period), for one property or a whole portfolio.
+Missing values (NaN in the models) are Arrow nulls. The renderers take
+zero-copy, Arrow-backed pandas views with to_pandas() and filter/melt those.
+"""
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from api_response_processor import data_classes, rent_billed_collected_generator, tracing
+
+PROPERTY_ID = "property_id"
+PERIOD = "period"
+# Row order of the three-period tables: the current period first.
+WEEKS = ("current", "last", "week_before_last")
+MONTHS = rent_billed_collected_generator.MONTHS
+# Per-period field name prefixes of the three-period dataclasses, in the same order.
+_WEEK_FIELDS = ("current_week", "last_week", "week_before_last")
+_MONTH_FIELDS = ("current_month", "last_month", "month_before_last")
+
+
+@dataclass(slots=True)
+class SummaryTables:
+    property_summary: pa.Table  # property_id, period (week key), PropertySummary fields
+    units_summary: pa.Table     # property_id, period (week key), UnitsSummary fields
+    leads: pa.Table             # property_id, period (WEEKS), start_date, end_date, counts
+    rent: pa.Table              # property_id, period (MM/YYYY), billed, collected
+    delinquency: pa.Table       # property_id, period (MONTHS), delinquency
+    retention: pa.Table         # property_id, expiring_leases, renewals
+
+
+def _floats(values: list) -> pa.Array:
+    # from_pandas=True turns NaN into a null
+    return pa.array(values, type=pa.float64(), from_pandas=True)
+
+
+def _strings(values: list) -> pa.Array:
+    return pa.array(values, type=pa.string())
+
+
+def _dated_summary_table(summaries_by_property: dict[Hashable, dict], cls) -> pa.Table:
+    """{property_id: {period: summary}} -> property_id, period and one float column per field."""
+    property_ids, periods, summaries = [], [], []
+    for property_id, by_period in summaries_by_property.items():
+        for period, summary in by_period.items():
+            property_ids.append(str(property_id))
+            periods.append(period)
+            summaries.append(summary)
+    columns = {PROPERTY_ID: _strings(property_ids), PERIOD: _strings(periods)}
+    for field in dataclasses.fields(cls):
+        columns[field.name] = _floats([getattr(s, field.name) for s in summaries])
+    return pa.table(columns)
+
+
+def _three_period_table(summaries: dict[Hashable, object], periods: tuple, columns: dict[str, tuple]) -> pa.Table:
+    """
+    One row per property and period from summaries with a field per period:
+    columns maps an output column to its per-period field name templates,
+    formatted with the period prefix (e.g. "{}_total_rent_billed").
+    """
+    data = {PROPERTY_ID: _strings([str(pid) for pid in summaries for _ in periods])}
+    for name, (template, kind) in columns.items():
+        values = [getattr(summary, template.format(prefix))
+                  for summary in summaries.values() for prefix in periods]
+        data[name] = _floats(values) if kind is float else _strings(values)
+    return pa.table(data)
+
+
+def _with_period_column(table: pa.Table, periods: tuple, property_count: int) -> pa.Table:
+    return table.add_column(1, PERIOD, _strings(list(periods) * property_count))
+
+
+def _box_score_tables(box_scores: dict[Hashable, tuple]) -> dict[str, pa.Table]:
+    """{property_id: (property_summary_dict, unit_summary_dict, leads_summary)}"""
+    leads = {pid: models[2] for pid, models in box_scores.items()}
+    return {
+        "property_summary": _dated_summary_table({pid: models[0] for pid, models in box_scores.items()},
+                                                 data_classes.PropertySummary),
+        "units_summary": _dated_summary_table({pid: models[1] for pid, models in box_scores.items()},
+                                              data_classes.UnitsSummary),
+        "leads": _with_period_column(_three_period_table(leads, _WEEK_FIELDS, {
+            "start_date": ("{}_start_date", str),
+            "end_date": ("{}_end_date", str),
+            "new_leads": ("{}_new_leads_count", float),
+            "tours": ("{}_tours_count", float),
+            "applications_completed": ("{}_applications_completed_count", float),
+            "lease_approved": ("{}_lease_approved_count", float),
+        }), WEEKS, len(leads)),
+    }
+
+
+def _rent_tables(rent: dict[Hashable, data_classes.RentSummaryForCurrentAndLastTwoMonths]) -> dict[str, pa.Table]:
+    return {"rent": _three_period_table(rent, _MONTH_FIELDS, {
+        PERIOD: ("{}_date", str),
+        "billed": ("{}_total_rent_billed", float),
+        "collected": ("{}_total_rent_collected", float),
+    })}
+
+
+def _rent_trend_tables(trends: dict[Hashable, data_classes.RentTrend]) -> dict[str, pa.Table]:
+    """Same columns as the rent table, one row per month of each property's trend (oldest first)."""
+    return {"rent_trend": pa.table({
+        PROPERTY_ID: _strings([str(pid) for pid, trend in trends.items() for _ in trend.periods]),
+        PERIOD: _strings([period for trend in trends.values() for period in trend.periods]),
+        "billed": _floats([value for trend in trends.values() for value in trend.total_rent_billed]),
+        "collected": _floats([value for trend in trends.values() for value in trend.total_rent_collected]),
+    })}
+
+
+def _leads_weekly_tables(weekly: dict[Hashable, data_classes.WeeklyLeadCounts]) -> dict[str, pa.Table]:
+    """One row per week of each property's WeeklyLeadCounts (oldest first); period is the week start."""
+    def column(name):
+        return [value for counts in weekly.values() for value in getattr(counts, name)]
+
+    return {"leads_weekly": pa.table({
+        PROPERTY_ID: _strings([str(pid) for pid, counts in weekly.items() for _ in counts.start_dates]),
+        PERIOD: _strings(column("start_dates")),
+        "start_date": _strings(column("start_dates")),
+        "end_date": _strings(column("end_dates")),
+        **{name: _floats(column(name)) for name in ("new_leads", "tour_visits", "applications_completed", "lease_approved")},
+    })}
+
+
+def _delinquency_tables(delinquency: dict[Hashable, data_classes.DelinquencyForThreeMonths]) -> dict[str, pa.Table]:
+    return {"delinquency": _with_period_column(_three_period_table(delinquency, _MONTH_FIELDS, {
+        "delinquency": ("{}_delinquency", float),
+    }), MONTHS, len(delinquency))}
+
+
+def _retention_tables(retention: dict[Hashable, data_classes.ResidentRetentionSummaryForCurrentMonth]) \
+        -> dict[str, pa.Table]:
+    return {"retention": pa.table({
+        PROPERTY_ID: _strings([str(pid) for pid in retention]),
+        "expiring_leases": _floats([r.expiring_leases for r in retention.values()]),
+        "renewals": _floats([r.renewals for r in retention.values()]),
+    })}
+
+
+_REPORT_BUILDERS = {
+    "box_score": _box_score_tables,
+    "comparative_delinquency": _rent_tables,
+    "resident_aged_receivables": _delinquency_tables,
+    "resident_retention": _retention_tables,
+    "rent_trend": _rent_trend_tables,
+    "leads_weekly": _leads_weekly_tables,
+}
+# The tables each report (fetch_engine.REPORTS) produces; the first four reports' are SummaryTables fields.
+REPORT_TABLES = {
+    "box_score": ("property_summary", "units_summary", "leads"),
+    "comparative_delinquency": ("rent",),
+    "resident_aged_receivables": ("delinquency",),
+    "resident_retention": ("retention",),
+    "rent_trend": ("rent_trend",),
+    "leads_weekly": ("leads_weekly",),
+}
+
+
+@tracing.traced("parse")
+def report_tables(report: str, models_by_property: dict[Hashable, Any]) -> dict[str, pa.Table]:
+    """
+    The REPORT_TABLES[report] tables from {property_id: model}, the model being
+    that report's entry in fetch_engine.fetch_report_models.
+    """
+    return _REPORT_BUILDERS[report](models_by_property)
+
+
+def from_models(models_by_property: dict[Hashable, tuple]) -> SummaryTables:
+    """
+    models_by_property: {property_id: (property_summary_dict, unit_summary_dict,
+    resident_retention_summary, rent_summary, delinquency_summary, leads_summary)},
+    as returned by fetch_engine.fetch_property_models / portfolio.fetch_portfolio_models.
+    """
+    tables = {
+        **report_tables("box_score", {pid: (m[0], m[1], m[5]) for pid, m in models_by_property.items()}),
+        **report_tables("comparative_delinquency", {pid: m[3] for pid, m in models_by_property.items()}),
+        **report_tables("resident_aged_receivables", {pid: m[4] for pid, m in models_by_property.items()}),
+        **report_tables("resident_retention", {pid: m[2] for pid, m in models_by_property.items()}),
+    }
+    return SummaryTables(**tables)
+
+
+def to_pandas(table: pa.Table, property_id: Optional[Hashable] = None) -> pd.DataFrame:
+    """
+    Arrow-backed (pd.ArrowDtype) pandas view of table: the columns wrap the
+    Arrow buffers instead of copying them. With property_id, only that
+    property's rows are kept.
+    """
+    frame = table.to_pandas(types_mapper=pd.ArrowDtype)
+    if property_id is None:
+        return frame
+    return frame[frame[PROPERTY_ID] == str(property_id)].reset_index(drop=True)
@@ -0,0 +1,130 @@
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from config import constants
+
+
+@dataclass
+class Span:
+    name: str
+    stage: str  # fetch | http | parse | render
+    start_ms: float  # relative to the start of the trace
+    duration_ms: float
+    thread: str
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+
+class Trace:
+    """Spans recorded during one dashboard rerun or batch job; safe to add to from worker threads."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_jsonl(self) -> str:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ms)
+        return "".join(json.dumps({"trace_id": self.trace_id, "trace": self.name,
+                                   "trace_started_at": self.started_at, **asdict(span)},
+                                  default=str) + "\n"
+                       for span in spans)
+
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+def start_trace(name: str) -> Trace:
+    """Makes a new trace current for this context (worker threads inherit it via fetch_engine)."""
+    trace = Trace(name)
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, stage: str, **attrs) -> Iterator[dict[str, Any]]:
+    """
+    Times the block as a span of the current trace. Yields the attrs dict so
+    the block can add measurements (bytes, rows, cache). Without a current
+    trace this only costs the context variable lookup.
+    """
+    trace = _current.get()
+    if trace is None:
+        yield attrs
+        return
+    started = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        ended = time.perf_counter()
+        trace.add(Span(name=name,
+                       stage=stage,
+                       start_ms=(started - trace._t0) * 1000.0,
+                       duration_ms=(ended - started) * 1000.0,
+                       thread=threading.current_thread().name,
+                       attrs=attrs))
+
+
+def report_rows(api_response: Optional[dict]) -> int:
+    """Row count of response.result[0].reportData (summed over sections for box_score)."""
+    if not isinstance(api_response, dict):
+        return 0
+    result = api_response.get("response", {}).get("result", [])
+    report_data = (result[0] if result else {}).get("reportData", [])
+    if isinstance(report_data, dict):
+        return sum(len(rows) for rows in report_data.values() if isinstance(rows, list))
+    return len(report_data) if isinstance(report_data, list) else 0
+
+
+def traced(stage: str,
+           name: Optional[str] = None,
+           measure: Optional[Callable[[Any], dict[str, Any]]] = None):
+    """Decorator form of span(); measure(result) can add attrs from the return value."""
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name, stage) as attrs:
+                result = fn(*args, **kwargs)
+                if measure is not None:
+                    attrs.update(measure(result))
+                return result
+        return wrapper
+    return decorate
+
+
+def measure_response(api_response: Optional[dict]) -> dict[str, Any]:
+    return {"rows": report_rows(api_response), "ok": api_response is not None}
+
+
+def export_jsonl(trace: Trace, path: Optional[str] = None) -> None:
+    """Appends the trace's spans as JSON lines to path (default TRACE_JSONL_PATH, if set)."""
+    path = path or constants.TRACE_JSONL_PATH
+    if not path:
+        return
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(trace.to_jsonl())
+    except OSError as e:
+        print('Error writing trace:', e)
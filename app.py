@@ -1,27 +1,24 @@
+import time
+from typing import Optional
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from dataclasses import asdict
-from typing import Any
-
-from api_response_processor.data_classes import (
-PropertySummary, UnitsSummary,
-RentSummaryForCurrentAndLastTwoMonths,
-LeadsSummaryForThreeWeeks,
-DelinquencyForThreeMonths,
-ResidentRetentionSummaryForCurrentMonth
-)
+import pyarrow as pa
 
-from api_response_processor import (property_unit_lead_summary_generator,
-                                    rent_billed_collected_generator,
-                                    delinquency_generator,
-                                    resident_retention_generator)
+from api_response_processor import (background_refresh, deltas, fetch_engine, figure_cache, helpers, last_good,
+                                    single_flight, summary_tables, tracing)
+from api_response_processor.formatting import (DELINQUENCY_LABELS, LEADS_STAGES, LEADS_TREND_STAGES, LEADS_WEEK_LABELS,
+                                               is_missing, k, pct)
+from config import constants
 
 
 # =========================
 # GLOBALS / THEME
 # =========================
 ACCENT = "#0f988f"  # teal
+# KPIs where a rise is bad news: their up arrows are red
+RISE_IS_BAD = {"excluded_units", "evictions_and_skips_occurred", "count_of_vacant_units", "count_of_total_move_out"}
 
 
 # =========================
@@ -47,29 +44,30 @@ def inject_css():
     }}
     .kpi-label {{ font-size: 0.95rem; color: #4b5563; }}
     .kpi-value {{ font-size: 2rem; font-weight: 700; line-height: 1.1; }}
+    .kpi-age {{ font-size: 0.75rem; color: #6b7280; margin-top: .35rem; }}
+    .kpi-age.stale {{ color: #b45309; }}
+    .kpi-delta {{ font-size: 0.85rem; font-weight: 600; margin-top: .35rem; color: #6b7280; }}
+    .kpi-delta.good {{ color: #047857; }}
+    .kpi-delta.bad {{ color: #b91c1c; }}
 
     div[data-testid="stPlotlyChart"] {{
       background: #f6faf9; border: 1px solid rgba(0,0,0,.08);
       border-radius: 14px; padding: 12px 12px 6px; box-shadow: 0 2px 12px rgba(0,0,0,.05);
     }}
 
-    /* Segmented centered tabs */
-    div[data-baseweb="tab-list"] {{
-      width: 100%; max-width: 900px; margin: 0rem auto 0.75rem; padding: 6px;
-      background: #eaf2f1; border-radius: 14px; box-shadow: 0 2px 16px rgba(0,0,0,.06);
-      display: flex; gap: 6px;
+    /* Segmented centered tab picker */
+    div[data-testid="stButtonGroup"] {{
+      display: flex; justify-content: center; margin: 0rem auto 0.75rem;
     }}
-    button[data-baseweb="tab"] {{
-      flex: 1 1 0; justify-content: center; border-radius: 10px; background: transparent;
+    div[data-testid="stButtonGroup"] button {{
       color: #0b2b2b; font-weight: 700; font-size: 1.02rem; padding: .7rem 1.2rem;
-      border: 2px solid transparent; transition: all .15s ease-in-out;
+      transition: all .15s ease-in-out;
     }}
-    button[data-baseweb="tab"]:hover {{ background: rgba(15,152,143,.08); }}
-    button[data-baseweb="tab"][aria-selected="true"] {{
+    div[data-testid="stButtonGroup"] button:hover {{ background: rgba(15,152,143,.08); }}
+    div[data-testid="stButtonGroup"] button[data-testid="stBaseButton-segmented_controlActive"] {{
       background: {ACCENT}; color: #fff; border-color: {ACCENT};
       box-shadow: 0 1px 6px rgba(15,152,143,.35);
     }}
-    button[data-baseweb="tab"] > div:first-child {{ border-bottom: none !important; }}
     </style>
     """, unsafe_allow_html=True)
 
@@ -77,47 +75,67 @@ def inject_css():
 # =========================
 # HELPERS
 # =========================
-def safe_num(v: Any) -> float:
-    """Convert Union[int,str,None] to float (NaN on fail)."""
-    try:
-        if v is None: return float("nan")
-        if isinstance(v, str) and v.strip() == "": return float("nan")
-        return float(v)
-    except Exception:
-        return float("nan")
-
-def k(value, currency=False):
-    if value in (None, "NA", ""): return "—"
-    try:
-        v = float(value)
-        if currency: return f"${v/1000:,.2f} K"
-        if v.is_integer(): return f"{int(v):,}"
-        return f"{v:,.2f}"
-    except Exception:
-        return str(value)
-
-def pct(value):
-    if value in (None, "NA", ""): return "—"
-    try:
-        v = float(str(value).replace("%",""))
-        return f"{v:,.2f} %"
-    except Exception:
-        return str(value)
-
-def kpi_card(label: str, value: str):
-    st.markdown(
-        f"""
-        <div class="kpi-card">
-            <div class="kpi-label">{label}</div>
-            <div class="kpi-value">{value}</div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-def dc_to_df(obj) -> pd.DataFrame:
-    """Dataclass -> one-row DataFrame (flat)."""
-    return pd.DataFrame([asdict(obj)])
+def data_age(as_of: Optional[float], now: Optional[float] = None) -> str:
+    """'data as of 12 min ago' for an epoch fetched_at."""
+    if as_of is None: return ""
+    seconds = max(0.0, (now or time.time()) - as_of)
+    if seconds < 60: age = "just now"
+    elif seconds < 60 * 60: age = f"{int(seconds // 60)} min ago"
+    elif seconds < 24 * 60 * 60: age = f"{int(seconds // 3600)} h ago"
+    else: age = f"{int(seconds // 86400)} d ago"
+    return f"data as of {age}"
+
+def age_badge(as_of: Optional[float]) -> str:
+    """Age line of a KPI card; amber once the data is older than TAB_DATA_TTL_SECONDS."""
+    if as_of is None: return ""
+    stale = " stale" if time.time() - as_of >= constants.TAB_DATA_TTL_SECONDS else ""
+    return f'<div class="kpi-age{stale}">{data_age(as_of)}</div>'
+
+def _change(change: float, pct_change: float, points: bool) -> str:
+    arrow = "▲" if change > 0 else "▼" if change < 0 else "▬"
+    if points: return f"{arrow} {abs(change) * 100:,.2f} pts"
+    if is_missing(pct_change): return f"{arrow} {k(abs(change))}"
+    return f"{arrow} {abs(pct_change) * 100:,.1f} %"
+
+def delta_badge(delta: Optional[pd.Series], against: str) -> str:
+    """
+    '▲ 1.20 pts vs last week' line of a KPI card from a deltas.deltas() row
+    (fractions change in points, everything else in percent), green or red by
+    whether the change is good news; the change against the rolling baseline
+    is its tooltip.
+    """
+    if delta is None or is_missing(delta["change"]): return ""
+    points = delta["kpi"].endswith("_percentage")
+    good_news = (delta["change"] > 0) != (delta["kpi"] in RISE_IS_BAD)
+    tone = "" if delta["change"] == 0 else " good" if good_news else " bad"
+    title = ""
+    if not is_missing(delta["baseline_change"]):
+        vs_baseline = _change(delta["baseline_change"], delta["baseline_pct_change"], points)
+        title = f' title="{vs_baseline} vs the recent average"'
+    vs_previous = _change(delta["change"], delta["pct_change"], points)
+    return f'<div class="kpi-delta{tone}"{title}>{vs_previous} {against}</div>'
+
+def kpi_card_html(label: str, value: str, as_of: Optional[float] = None, delta: str = "") -> str:
+    """
+    The card as one unindented line per non-empty part: markdown ends an HTML
+    block at a blank line and renders indented lines after it as code.
+    """
+    parts = ['<div class="kpi-card">', f'<div class="kpi-label">{label}</div>',
+             f'<div class="kpi-value">{value}</div>', delta, age_badge(as_of), '</div>']
+    return "\n".join(part for part in parts if part)
+
+def kpi_card(label: str, value: str, as_of: Optional[float] = None, delta: str = ""):
+    """delta: a delta_badge() line shown under the value."""
+    st.markdown(kpi_card_html(label, value, as_of, delta), unsafe_allow_html=True)
+
+def raw_column_config(df: pd.DataFrame) -> dict:
+    """Display formats for a raw summary table: fractions as percentages, counts without decimals."""
+    config = {summary_tables.PROPERTY_ID: None, summary_tables.PERIOD: "Date"}
+    for column in df.columns:
+        if column not in config:
+            config[column] = st.column_config.NumberColumn(format="percent" if column.endswith("_percentage")
+                                                           else "localized")
+    return config
 
 def cardify(fig):
     fig.update_layout(
@@ -133,172 +151,309 @@ def cardify(fig):
     )
     return fig
 
+def bar_chart(df: pd.DataFrame, **options):
+    return cardify(px.bar(df, **options))
+
+def line_chart(df: pd.DataFrame, **options):
+    return cardify(px.line(df, **options))
+
+def chart(build, df: pd.DataFrame, **options):
+    """build(df, **options) through the shared figure cache: unchanged charts are not rebuilt."""
+    return figure_cache.get_cache().figure(build, df, **options)
+
+
+# =========================
+# DATA (lazy, per tab, stale-while-revalidate)
+# =========================
+# The reports (fetch_engine.REPORTS) each tab renders; a tab's reports are
+# fetched and parsed the first time it is shown. Complete tables go to the
+# process-wide last_good store that every session reads from. Tables older than
+# TAB_DATA_TTL_SECONDS still render (within STALE_LIMIT_SECONDS) while a
+# background refresh replaces them.
+TABS = {
+    "Overview": ("box_score", "comparative_delinquency", "resident_aged_receivables"),
+    "Operations": ("box_score",),
+    "Resident Retention": ("resident_retention",),
+}
+
+def _fresh(entry, now: float) -> bool:
+    return entry is not None and entry.age(now) < constants.TAB_DATA_TTL_SECONDS
+
+def _usable(entry, report: str, now: float) -> bool:
+    """Fresh, or stale but within the report's limit for rendering while it is refreshed."""
+    return _fresh(entry, now) or (entry is not None
+                                  and constants.STALE_WHILE_REVALIDATE
+                                  and entry.age(now) < constants.STALE_LIMIT_SECONDS.get(report, 0))
+
+def load_tables(property_id, reports) -> tuple[dict[str, pa.Table], dict[str, float]]:
+    """
+    ({table_name: table}, {table_name: fetched_at}) for the given reports.
+    Usable last good tables are returned at once (stale ones get a background
+    refresh); the other reports are fetched before returning.
+    """
+    store = last_good.get_store()
+    now = time.time()
+    entries = {report: store.get(property_id, report) for report in reports}
+    missing = [report for report, entry in entries.items() if not _usable(entry, report, now)]
+    stale = [report for report, entry in entries.items() if report not in missing and not _fresh(entry, now)]
+    with tracing.span("load_tables", "fetch", reports=",".join(reports), fetched=",".join(missing),
+                      stale=",".join(stale)):
+        if stale:
+            background_refresh.revalidate(property_id, stale)
+        if missing:
+            incomplete = set()
+            for report, tables in fetch_engine.fetch_report_tables(property_id, missing,
+                                                                   incomplete=incomplete).items():
+                if report not in incomplete:
+                    entries[report] = store.put(property_id, report, tables)
+                elif entries[report] is None:
+                    # nothing older to fall back on: render what came back, gaps show as "—"
+                    entries[report] = last_good.Entry(now, tables)
+                # else the older last good tables render, badged with their age
+
+        tables, as_of = {}, {}
+        for entry in entries.values():
+            tables.update(entry.tables)
+            as_of.update(dict.fromkeys(entry.tables, entry.fetched_at))
+    return tables, as_of
+
+def prefetch_adjacent_tabs(property_id, tab: str):
+    """Starts refreshing the reports of the tabs either side of `tab` that are missing or not fresh."""
+    names = list(TABS)
+    i = names.index(tab)
+    store = last_good.get_store()
+    now = time.time()
+    reports = tuple(dict.fromkeys(report
+                                  for name in names[max(0, i - 1):i + 2] if name != tab
+                                  for report in TABS[name]
+                                  if not _fresh(store.get(property_id, report), now)))
+    if reports:
+        background_refresh.revalidate(property_id, reports)
+
+@st.fragment(run_every=constants.REFRESH_POLL_SECONDS)
+def swap_in_when_refreshed(property_id, reports):
+    """Reruns the page once the background refresh of the reports on it has landed."""
+    if not background_refresh.refreshing(property_id, reports):
+        st.rerun(scope="app")
+
 
 # =========================
-# DEMO DATA (replace with your real instances)
+# FRAMES (pure; used by the renderers and the benchmarks)
 # =========================
-def create_demo_models():
-    property_id = 100082999 #4060 preferred place
-    (all_property_summary,
-     all_unit_summary,
-     leads_summary_for_three_weeks) = property_unit_lead_summary_generator.generate_property_unit_lead_summary(property_id)
-    # rent summary
-    rent_summary = rent_billed_collected_generator.generate_rent_billed_collected_summary(property_id)
-    delinquency_summary = delinquency_generator.generate_delinquency_report(property_id)
-
-    # resident retention summary
-    resident_retention_summary = resident_retention_generator.build_resident_retention(property_id)
-
-    return (all_property_summary,
-            all_unit_summary,
-            resident_retention_summary,
-            rent_summary,
-            delinquency_summary,
-            leads_summary_for_three_weeks)
+# Inputs are summary_tables.to_pandas() views. The property_id column is carried
+# through, so a multi-property view is reshaped in one call.
+PROPERTY_ID = summary_tables.PROPERTY_ID
+# Columns of the KPI cards, compared week over week: point-in-time values as of today,
+# flows (counts over the week) for the last closed week, the current one being partial
+PS_KPIS = ["total_units", "total_rentable_units", "excluded_units", "occupied_units_percentage",
+           "leased_units_percentage", "trend_percentage"]
+PS_FLOW_KPIS = ["evictions_and_skips_occurred"]
+US_KPIS = ["count_of_occupied_units", "count_of_vacant_units"]
+US_FLOW_KPIS = ["count_of_total_move_ins", "count_of_total_move_out"]
+
+def build_rent_frame(rent: pd.DataFrame) -> pd.DataFrame:
+    """Long (property_id, Period, Type, Amount) frame for the rent billed vs collected chart."""
+    return (rent.rename(columns={"period": "Period", "billed": "Billed", "collected": "Collected"})
+                .melt(id_vars=[PROPERTY_ID, "Period"], value_vars=["Billed","Collected"],
+                      var_name="Type", value_name="Amount"))
+
+def build_delinquency_frame(delinquency: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        PROPERTY_ID: delinquency[PROPERTY_ID],
+        "Period": delinquency["period"].map(DELINQUENCY_LABELS),
+        "Delinquency": delinquency["delinquency"],
+    })
+
+def build_leads_frame(leads: pd.DataFrame) -> pd.DataFrame:
+    """Long (property_id, Week, Range, Stage, Count) frame for the leads chart."""
+    leads_df = leads[[PROPERTY_ID, *LEADS_STAGES]].rename(columns=LEADS_STAGES)
+    leads_df.insert(1, "Week", leads["period"].map(LEADS_WEEK_LABELS))
+    leads_df.insert(2, "Range", leads["start_date"].astype(str) + " → " + leads["end_date"].astype(str))
+    return leads_df.melt(id_vars=[PROPERTY_ID, "Week","Range"], var_name="Stage", value_name="Count")
+
+def build_leads_trend_frame(leads_weekly: pd.DataFrame) -> pd.DataFrame:
+    """Long (property_id, Week Of, Stage, Count) frame for the weekly leads trend chart."""
+    leads_df = leads_weekly[[PROPERTY_ID, "start_date", *LEADS_TREND_STAGES]].rename(
+        columns={"start_date": "Week Of", **LEADS_TREND_STAGES})
+    return leads_df.melt(id_vars=[PROPERTY_ID, "Week Of"], var_name="Stage", value_name="Count")
 
 
 # =========================
 # RENDERERS (tabs)
 # =========================
-def render_overview(ps_by_date: dict[str, PropertySummary],
-                    rs: RentSummaryForCurrentAndLastTwoMonths,
-                    dq: DelinquencyForThreeMonths):
+def render_overview(ps: pd.DataFrame,
+                    rent: pd.DataFrame,
+                    delinquency: pd.DataFrame,
+                    as_of: Optional[dict[str, float]] = None):
     """
-    ps_by_date: Ordered dict {date_string: PropertySummary, ...}
-                First item = latest date.
-    rs: RentSummaryForCurrentAndLastTwoMonths dataclass.
+    ps: property_summary view, one row per week; first row = latest week.
+    rent, delinquency: rent and delinquency views (current month first).
+    as_of: {table_name: fetched_at}, shown as age badges.
     """
-
-    # ---- KPIs from latest ----
-    latest_date, latest_ps = next(iter(ps_by_date.items()))
+    as_of = as_of or {}
+    ps_as_of = as_of.get("property_summary")
+
+    # ---- KPIs from latest (flows: last closed week), with the change from the week before ----
+    latest_ps, closed_ps = ps.iloc[0], ps.iloc[1]
+    week_dates = helpers.get_week_boundaries_fridays()
+    wow = deltas.for_property(deltas.week_deltas(ps, "property_summary", PS_KPIS, week_dates))
+    closed_wow = deltas.for_property(deltas.week_deltas(ps, "property_summary", PS_FLOW_KPIS, week_dates,
+                                                        closed_only=True))
+
+    def card(label, column, fmt=k):
+        if column in closed_wow:
+            kpi_card(label, fmt(closed_ps[column]), ps_as_of, delta_badge(closed_wow[column], "vs the week before"))
+        else:
+            kpi_card(label, fmt(latest_ps[column]), ps_as_of, delta_badge(wow.get(column), "vs last week"))
 
     st.markdown('<div class="kpi-grid"></div>', unsafe_allow_html=True)
     a,b,c,d,e,f,g = st.columns(7, gap="small")
-    with a: kpi_card("Total Units", k(latest_ps.total_units))
-    with b: kpi_card("Rentable Units", k(latest_ps.total_rentable_units))
-    with c: kpi_card("Excluded Units", k(latest_ps.excluded_units))
-    with d: kpi_card("Occupied %", pct(latest_ps.occupied_units_percentage))
-    with e: kpi_card("Leased %", pct(latest_ps.leased_units_percentage))
-    with f: kpi_card("Trend %", pct(latest_ps.trend_percentage))
-    with g: kpi_card("Evictions/Skips", k(latest_ps.evictions_and_skips_occurred))
+    with a: card("Total Units", "total_units")
+    with b: card("Rentable Units", "total_rentable_units")
+    with c: card("Excluded Units", "excluded_units")
+    with d: card("Occupied %", "occupied_units_percentage", pct)
+    with e: card("Leased %", "leased_units_percentage", pct)
+    with f: card("Trend %", "trend_percentage", pct)
+    with g: card("Evictions/Skips (last week)", "evictions_and_skips_occurred")
 
     # ---- Rent billed vs collected (3 months) ----
-    rent_rows = [
-        {
-            "Period": rs.current_month_date,
-            "Billed": safe_num(rs.current_month_total_rent_billed),
-            "Collected": safe_num(rs.current_month_total_rent_collected),
-        },
-        {
-            "Period": rs.last_month_date,
-            "Billed": safe_num(rs.last_month_total_rent_billed),
-            "Collected": safe_num(rs.last_month_total_rent_collected),
-        },
-        {
-            "Period": rs.month_before_last_date,
-            "Billed": safe_num(rs.month_before_last_total_rent_billed),
-            "Collected": safe_num(rs.month_before_last_total_rent_collected),
-        },
-    ]
-    rent_df = pd.DataFrame(rent_rows)
-    rent_long = rent_df.melt(id_vars=["Period"],
-                             value_vars=["Billed","Collected"],
-                             var_name="Type", value_name="Amount")
+    rent_long = build_rent_frame(rent)
 
     left, right = st.columns(2)
     with left:
         st.subheader("Rent billed vs collected")
-        fig = px.bar(rent_long, x="Period", y="Amount", color="Type", barmode="group", text_auto=".0f")
-        st.plotly_chart(cardify(fig), use_container_width=True, key="rent_billed_collected")
+        st.caption(data_age(as_of.get("rent")))
+        mom = deltas.for_property(deltas.month_deltas(rent, ["billed", "collected"]))
+        st.markdown("".join(delta_badge(mom.get(column), f"{column} last month vs the month before")
+                            for column in ("billed", "collected")), unsafe_allow_html=True)
+        fig = chart(bar_chart, rent_long, x="Period", y="Amount", color="Type", barmode="group", text_auto=".0f")
+        st.plotly_chart(fig, use_container_width=True, key="rent_billed_collected")
 
     with right:
         st.subheader("Delinquency")
-        coll = pd.DataFrame({
-            "Period": ["0-30 Days","30-60 Days","60-90 Days"],
-            "Delinquency": [
-                safe_num(dq.current_month_delinquency),
-                safe_num(dq.last_month_delinquency),
-                safe_num(dq.month_before_last_delinquency),
-            ]
-        })
-        fig2 = px.bar(coll, x="Period", y="Delinquency", text_auto=".0f")
-        st.plotly_chart(cardify(fig2), use_container_width=True, key="collection_pct")
+        st.caption(data_age(as_of.get("delinquency")))
+        coll = build_delinquency_frame(delinquency)
+        fig2 = chart(bar_chart, coll, x="Period", y="Delinquency", text_auto=".0f")
+        st.plotly_chart(fig2, use_container_width=True, key="collection_pct")
 
     # ---- Raw property summaries table ----
-    raw_rows = []
-    for date_key, ps in ps_by_date.items():
-        row = {"Date": date_key, **asdict(ps)}
-        raw_rows.append(row)
-    raw_df = pd.DataFrame(raw_rows)
-
     st.write("---")
     st.subheader("Property summary (raw)")
-    st.dataframe(raw_df, use_container_width=True, hide_index=True, key="ps_table")
+    st.dataframe(ps, use_container_width=True, hide_index=True, key="ps_table",
+                 column_config=raw_column_config(ps))
+
 
+def render_rent_trend(rent_trend: pd.DataFrame, as_of: Optional[float] = None):
+    """rent_trend: rent_trend view, one row per month, oldest first."""
+    st.caption(data_age(as_of))
+    trend_long = build_rent_frame(rent_trend)
+    fig = chart(line_chart, trend_long, x="Period", y="Amount", color="Type", markers=True)
+    st.plotly_chart(fig, use_container_width=True, key="rent_trend")
 
-def render_operations(us_by_date: dict[str, UnitsSummary],
-                      leads: LeadsSummaryForThreeWeeks):
+
+def render_operations(us: pd.DataFrame,
+                      leads: pd.DataFrame,
+                      as_of: Optional[dict[str, float]] = None):
     """
-    us_by_date: Ordered dict {date_string: UnitsSummary, ...}
-                First item = latest date.
-    maint: MaintenanceSummaryForThreeWeeks dataclass.
-    leads: LeadsSummaryForThreeWeeks dataclass.
+    us: units_summary view, one row per week; first row = latest week.
+    leads: leads view, one row per week (current week first).
+    as_of: {table_name: fetched_at}, shown as age badges.
     """
-
-    # ---- KPIs from latest UnitsSummary ----
-    latest_date, latest_us = next(iter(us_by_date.items()))
+    as_of = as_of or {}
+    us_as_of = as_of.get("units_summary")
+
+    # ---- KPIs from latest UnitsSummary (flows: last closed week), with the change from the week before ----
+    latest_us, closed_us = us.iloc[0], us.iloc[1]
+    closed_date = closed_us["period"]
+    week_dates = helpers.get_week_boundaries_fridays()
+    wow = deltas.for_property(deltas.week_deltas(us, "units_summary", US_KPIS, week_dates))
+    closed_wow = deltas.for_property(deltas.week_deltas(us, "units_summary", US_FLOW_KPIS, week_dates,
+                                                        closed_only=True))
+
+    def card(label, column):
+        if column in closed_wow:
+            kpi_card(label, k(closed_us[column]), us_as_of, delta_badge(closed_wow[column], "vs the week before"))
+        else:
+            kpi_card(label, k(latest_us[column]), us_as_of, delta_badge(wow.get(column), "vs last week"))
 
     st.markdown('<div class="kpi-grid"></div>', unsafe_allow_html=True)
     a,b,c,d = st.columns(4, gap="large")
-    with a: kpi_card("Occupied Units", k(latest_us.count_of_occupied_units))
-    with b: kpi_card("Vacant Units", k(latest_us.count_of_vacant_units))
-    with c: kpi_card(f"Move-ins ({latest_date})", k(latest_us.count_of_total_move_ins))
-    with d: kpi_card(f"Move-outs ({latest_date})", k(latest_us.count_of_total_move_out))
+    with a: card("Occupied Units", "count_of_occupied_units")
+    with b: card("Vacant Units", "count_of_vacant_units")
+    with c: card(f"Move-ins ({closed_date})", "count_of_total_move_ins")
+    with d: card(f"Move-outs ({closed_date})", "count_of_total_move_out")
 
     # ---- Leads (3 weeks) ----
-    leads_df = pd.DataFrame([
-        {"Week":"Current", "Range": f"{leads.current_week_start_date} → {leads.current_week_end_date}",
-         "New Leads":safe_num(leads.current_week_new_leads_count),
-         "Tours":safe_num(leads.current_week_tours_count),
-         "Application Completed":safe_num(leads.current_week_applications_completed_count),
-         "Lease Approved":safe_num(leads.current_week_lease_approved_count)},
-        {"Week":"Last", "Range": f"{leads.last_week_start_date} → {leads.last_week_end_date}",
-         "New Leads":safe_num(leads.last_week_new_leads_count),
-         "Tours":safe_num(leads.last_week_tours_count),
-         "Application Completed":safe_num(leads.last_week_applications_completed_count),
-         "Lease Approved":safe_num(leads.last_week_lease_approved_count)},
-        {"Week":"Week Before Last", "Range": f"{leads.week_before_last_start_date} → {leads.week_before_last_end_date}",
-         "New Leads":safe_num(leads.week_before_last_new_leads_count),
-         "Tours":safe_num(leads.week_before_last_tours_count),
-         "Application Completed":safe_num(leads.week_before_last_applications_completed_count),
-         "Lease Approved":safe_num(leads.week_before_last_lease_approved_count)},
-    ])
-    leads_long = leads_df.melt(id_vars=["Week","Range"], var_name="Stage", value_name="Count")
+    leads_long = build_leads_frame(leads)
 
     # ---- Charts ----
 
     st.subheader("Leads & Applications (3 weeks)")
-    fig4 = px.bar(leads_long, x="Week", y="Count", color="Stage", barmode="group",
-                  hover_data=["Range"], text_auto=".0f")
-    st.plotly_chart(cardify(fig4), use_container_width=True, key="leads_3w")
+    st.caption(data_age(as_of.get("leads")))
+    fig4 = chart(bar_chart, leads_long, x="Week", y="Count", color="Stage", barmode="group",
+                 hover_data=["Range"], text_auto=".0f")
+    st.plotly_chart(fig4, use_container_width=True, key="leads_3w")
 
     # ---- Raw UnitsSummary table ----
-    raw_rows = []
-    for date_key, us in us_by_date.items():
-        row = {"Date": date_key, **asdict(us)}
-        raw_rows.append(row)
-    raw_df = pd.DataFrame(raw_rows)
-
     st.write("---")
     st.subheader("Units summary (raw)")
-    st.dataframe(raw_df, use_container_width=True, hide_index=True, key="us_table")
+    st.dataframe(us, use_container_width=True, hide_index=True, key="us_table",
+                 column_config=raw_column_config(us))
+
 
+def render_leads_trend(leads_weekly: pd.DataFrame, as_of: Optional[float] = None):
+    """leads_weekly: leads_weekly view, one row per week, oldest first."""
+    st.caption(data_age(as_of))
+    fig = chart(line_chart, build_leads_trend_frame(leads_weekly), x="Week Of", y="Count", color="Stage",
+                markers=True)
+    st.plotly_chart(fig, use_container_width=True, key="leads_trend")
 
-def render_retention(rr3: ResidentRetentionSummaryForCurrentMonth):
+
+def render_retention(retention: pd.DataFrame, as_of: Optional[float] = None):
+    rr = retention.iloc[0]
     st.markdown('<div class="kpi-grid"></div>', unsafe_allow_html=True)
     a,b = st.columns(2, gap="large")
-    with a: kpi_card("Expiring Leases", k(rr3.expiring_leases))
-    with b: kpi_card("Renewals", k(rr3.renewals))
+    with a: kpi_card("Expiring Leases", k(rr["expiring_leases"]), as_of)
+    with b: kpi_card("Renewals", k(rr["renewals"]), as_of)
+
+
+# =========================
+# DEBUG PANEL (?debug=1)
+# =========================
+def build_trace_frame(trace: tracing.Trace) -> pd.DataFrame:
+    spans = sorted(trace.spans, key=lambda s: s.start_ms)
+    return pd.DataFrame([{
+        "Span": f"{i:02d} {s.name}",
+        "Stage": s.stage,
+        "Start (ms)": round(s.start_ms, 2),
+        "Duration (ms)": round(s.duration_ms, 2),
+        "Thread": s.thread,
+        "Details": ", ".join(f"{key}={value}" for key, value in s.attrs.items()),
+    } for i, s in enumerate(spans, start=1)])
+
+def render_debug_panel(trace: tracing.Trace):
+    df = build_trace_frame(trace)
+    if df.empty:
+        return
+    with st.expander(f"⏱️ Timings for this rerun ({len(df)} spans)", expanded=True):
+        fig = px.bar(df, x="Duration (ms)", y="Span", base="Start (ms)", color="Stage", orientation="h",
+                     hover_data=["Thread", "Details"], title="Rerun waterfall")
+        fig.update_yaxes(autorange="reversed", title=None)
+        fig.update_xaxes(title="ms since rerun start")
+        st.plotly_chart(cardify(fig), use_container_width=True, key="debug_waterfall")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        st.download_button("Download spans (JSON lines)", trace.to_jsonl(),
+                           file_name=f"trace-{trace.trace_id}.jsonl", mime="application/jsonl")
+
+        stats = single_flight.get_group().stats()
+        total = stats.pop("total")
+        st.caption(f"Since this server started: {total['calls']} upstream report calls, "
+                   f"{total['coalesced']} identical concurrent requests coalesced into them"
+                   + "".join(f" · {label}: {counts['calls']}/{counts['coalesced']}"
+                             for label, counts in sorted(stats.items())))
+        figures = figure_cache.get_cache().stats()
+        st.caption(f"Figure cache: {figures['hits']} hits, {figures['misses']} builds, "
+                   f"{figures['figures']} figures ({figures['bytes'] / 1024:,.0f} KiB)")
 
 
 # =========================
@@ -307,19 +462,55 @@ def render_retention(rr3: ResidentRetentionSummaryForCurrentMonth):
 def main():
     setup_page()
     inject_css()
-
-    # Replace the following line with your real dataclass instances
-    ps, us, resident_retent3, rent3, dq3, leads3 = create_demo_models()
-
-    st.title("🏢 Dashboard for X Property")
-
-    t1, t2, t3 = st.tabs(["Overview", "Operations", "Resident Retention"])
-    with t1:
-        render_overview(ps, rent3, dq3)
-    with t2:
-        render_operations(us, leads3)
-    with t3:
-        render_retention(resident_retent3)
+    trace = tracing.start_trace("dashboard")
+
+    property_id = constants.PROPERTY_IDS[0]
+    if len(constants.PROPERTY_IDS) > 1:
+        property_id = st.sidebar.selectbox("Property", constants.PROPERTY_IDS)
+
+    def view(table):
+        return summary_tables.to_pandas(table, property_id)
+
+    st.title(f"🏢 Dashboard for Property {property_id}")
+
+    # clicking the selected option deselects it (None); stay on the last tab then
+    tab = st.segmented_control("Section", list(TABS), default=list(TABS)[0], key="tab",
+                               label_visibility="collapsed") or st.session_state.get("last_tab", list(TABS)[0])
+    st.session_state["last_tab"] = tab
+    tables, as_of = load_tables(property_id, TABS[tab])
+    shown = list(TABS[tab])
+    if tab == "Overview":
+        with tracing.span("render_overview", "render"):
+            render_overview(view(tables["property_summary"]), view(tables["rent"]), view(tables["delinquency"]),
+                            as_of)
+        if st.toggle(f"Rent trend ({constants.RENT_TREND_MONTHS} months)", key="show_rent_trend"):
+            trend, trend_as_of = load_tables(property_id, ("rent_trend",))
+            shown.append("rent_trend")
+            with tracing.span("render_rent_trend", "render"):
+                render_rent_trend(view(trend["rent_trend"]), trend_as_of["rent_trend"])
+    elif tab == "Operations":
+        with tracing.span("render_operations", "render"):
+            render_operations(view(tables["units_summary"]), view(tables["leads"]), as_of)
+        cold_cost = None if constants.SNAPSHOT_STORE_URL else (
+            f"Without a snapshot store, the first load sends {7 * constants.LEADS_TREND_WEEKS} "
+            "box score requests (one per day).")
+        if st.toggle(f"Leads trend ({constants.LEADS_TREND_WEEKS} weeks)", key="show_leads_trend", help=cold_cost):
+            leads_weekly, leads_as_of = load_tables(property_id, ("leads_weekly",))
+            shown.append("leads_weekly")
+            with tracing.span("render_leads_trend", "render"):
+                render_leads_trend(view(leads_weekly["leads_weekly"]), leads_as_of["leads_weekly"])
+    else:
+        with tracing.span("render_retention", "render"):
+            render_retention(view(tables["retention"]), as_of["retention"])
+
+    if constants.PREFETCH_ADJACENT_TABS:
+        prefetch_adjacent_tabs(property_id, tab)
+    if background_refresh.refreshing(property_id, shown):
+        swap_in_when_refreshed(property_id, shown)
+
+    tracing.export_jsonl(trace)
+    if st.query_params.get(constants.DEBUG_QUERY_PARAM) == "1":
+        render_debug_panel(trace)
 
 if __name__ == "__main__":
     main()
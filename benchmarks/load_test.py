@@ -0,0 +1,305 @@
+"""
+Drives N concurrent headless sessions of app.py through Streamlit's AppTest
+and reports per-rerun latency percentiles, CPU and RSS as JSON:
+
+    python -m benchmarks.load_test --sessions 20 --reruns 30 --output load.json
+    python -m benchmarks.load_test --sessions 20 --mock --mock-latency-ms 400 --compare load.json
+
+Each session loads the dashboard, then switches tabs (Overview -> Operations
+-> Resident Retention -> ...) with a think time between reruns. AppTest swaps
+streamlit's global Runtime instance on every run, so concurrent sessions in
+one process break each other; each session is its own process instead, which
+makes CPU and RSS per session exact. --cpus pins every session to that many
+cores, so they compete for the CPU budget of one replica. Unlike a replica,
+sessions do not share the response cache or last_good tables: every session
+fetches its first tabs itself, which the first-run percentiles show. Nor do
+they share a server's threads, GIL and memory, so the figures do not state a
+replica's capacity; the report says so (config.mode: "isolated_processes").
+
+Data comes from the get_fake_* payloads, or with --mock from an in-process
+tools.mock_entrata server (latency and fault injection as its flags).
+"""
+import argparse
+import contextlib
+import dataclasses
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import random
+import resource
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+from config import constants
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+TABS = ("Overview", "Operations", "Resident Retention")
+PERCENTILES = (50, 95, 99)
+MODE = "isolated_processes"
+CAVEAT = ("each session is its own AppTest process: no shared caches, server threads or GIL, "
+          "so these are not the capacity of one streamlit server")
+
+
+@dataclass(slots=True)
+class SessionResult:
+    session: int
+    first_run_ms: float = float("nan")
+    rerun_ms: list[float] = field(default_factory=list)
+    rerun_tabs: list[str] = field(default_factory=list)
+    cpu_seconds: float = 0.0
+    rss_start_mb: float = 0.0  # after imports, before the first run
+    rss_peak_mb: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    values = np.percentile(samples, PERCENTILES)
+    return {"count": len(samples), **{f"p{p}_ms": float(v) for p, v in zip(PERCENTILES, values)},
+            "mean_ms": float(np.mean(samples)), "max_ms": float(np.max(samples))}
+
+
+def _errors(at: AppTest) -> list[str]:
+    return [e.message for e in at.exception]
+
+
+def run_session(index: int, reruns: int, think_seconds: float, timeout: float) -> SessionResult:
+    result = SessionResult(index)
+    rng = random.Random(index)
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        started = time.perf_counter()
+        at.run()
+        result.first_run_ms = (time.perf_counter() - started) * 1000.0
+        result.errors += _errors(at)
+        for step in range(reruns):
+            time.sleep(think_seconds * rng.uniform(0.5, 1.5))
+            tab = TABS[(step + 1) % len(TABS)]
+            started = time.perf_counter()
+            at.button_group[0].set_value([tab]).run()
+            result.rerun_ms.append((time.perf_counter() - started) * 1000.0)
+            result.rerun_tabs.append(tab)
+            result.errors += _errors(at)
+    except Exception as e:  # a timed-out or crashed session still reports what it measured
+        result.errors.append(f"{type(e).__name__}: {e}")
+    return result
+
+
+def _session_process(index: int, reruns: int, think_seconds: float, timeout: float, delay: float,
+                     cpus: Optional[list], report_endpoint: Optional[str], verbose: bool, barrier, queue) -> None:
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    if report_endpoint:
+        # app.py reads these at run time
+        constants.REPORT_ENDPOINT = report_endpoint
+        constants.USE_FAKE_DATA = False
+        os.environ.setdefault("ENTRATA_API_KEY", "load-test")
+    rss_start = _rss_mb()
+    try:
+        barrier.wait()  # every session has imported streamlit and the app's modules
+    except threading.BrokenBarrierError:
+        pass  # a session died during startup and the parent gave up waiting; run unsynchronized
+    time.sleep(delay)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(None if verbose else devnull):  # the summarize_* "Calculated ..." lines
+        result = run_session(index, reruns, think_seconds, timeout)
+    finished = resource.getrusage(resource.RUSAGE_SELF)
+    result.cpu_seconds = finished.ru_utime + finished.ru_stime - usage.ru_utime - usage.ru_stime
+    result.rss_start_mb = rss_start
+    result.rss_peak_mb = finished.ru_maxrss / 1024
+    queue.put(dataclasses.asdict(result))
+
+
+def _start_mock(args) -> "object":
+    from tools import mock_entrata
+
+    profile = mock_entrata.FaultProfile(latency_ms=args.mock_latency_ms, latency_sigma=args.mock_latency_sigma,
+                                        error_rate=args.mock_error_rate, throttle_rate=args.mock_throttle_rate,
+                                        retry_after=0.5)
+    server = mock_entrata.make_server(profile)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _collect(processes: list, queue, poll_seconds: float = 1.0) -> list[SessionResult]:
+    """
+    Every session's result; a session process that exited without reporting one
+    (a crash, an import error) becomes a result with only that error.
+    """
+    results: dict[int, SessionResult] = {}
+    while len(results) < len(processes):
+        try:
+            result = SessionResult(**queue.get(timeout=poll_seconds))
+            results[result.session] = result
+            continue
+        except queue_module.Empty:
+            pass
+        for index, process in enumerate(processes):
+            if index not in results and process.exitcode is not None:
+                try:  # a result it put just before exiting may still be on its way
+                    result = SessionResult(**queue.get(timeout=poll_seconds))
+                    results[result.session] = result
+                except queue_module.Empty:
+                    results[index] = SessionResult(
+                        index, errors=[f"session process exited with code {process.exitcode} without a result"])
+                break
+    return [results[index] for index in sorted(results)]
+
+
+def run(sessions: int, reruns: int, think_seconds: float, ramp_up_seconds: float, timeout: float,
+        cpus: Optional[int] = None, report_endpoint: Optional[str] = None, verbose: bool = False) -> dict:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(sessions + 1)
+    queue = context.Queue()
+    pinned = sorted(os.sched_getaffinity(0))[:cpus] if cpus else None
+    processes = [context.Process(target=_session_process, name=f"session-{i}",
+                                 args=(i, reruns, think_seconds, timeout, ramp_up_seconds * i / sessions,
+                                       pinned, report_endpoint, verbose, barrier, queue))
+                 for i in range(sessions)]
+    for process in processes:
+        process.start()
+    try:
+        barrier.wait(timeout=timeout)  # startup (imports) gets one run's timeout
+    except threading.BrokenBarrierError:
+        pass  # a session died before the barrier; _collect reports it
+    began = time.perf_counter()
+    results = _collect(processes, queue)
+    wall = time.perf_counter() - began
+    for process in processes:
+        process.join()
+
+    from benchmarks.run_benchmarks import _git_commit  # imports app.py; the sessions don't need it
+
+    all_reruns = [ms for r in results for ms in r.rerun_ms]
+    cpu = sum(r.cpu_seconds for r in results)
+    by_tab = {tab: _percentiles([ms for r in results for t, ms in zip(r.rerun_tabs, r.rerun_ms) if t == tab])
+              for tab in TABS}
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "config": {"mode": MODE, "caveat": CAVEAT,
+                   "sessions": sessions, "reruns": reruns, "think_seconds": think_seconds,
+                   "ramp_up_seconds": ramp_up_seconds, "cpus": len(pinned) if pinned else None,
+                   "data": "mock" if report_endpoint else "fake"},
+        "first_run": _percentiles([r.first_run_ms for r in results if not np.isnan(r.first_run_ms)]),
+        "rerun": _percentiles(all_reruns),
+        "rerun_by_tab": by_tab,
+        "process": {
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "cpu_utilization": cpu / wall if wall else float("nan"),  # 1.0 = one core busy
+            "cpu_ms_per_run": cpu * 1000.0 / (len(all_reruns) + len(results)),
+            "rss_per_session_mb": float(np.mean([r.rss_peak_mb for r in results])),
+            "rss_growth_per_session_mb": float(np.mean([r.rss_peak_mb - r.rss_start_mb for r in results])),
+            "reruns_per_second": len(all_reruns) / wall if wall else float("nan"),
+        },
+        "errors": sum(len(r.errors) for r in results),
+        "sessions": [{
+            "session": r.session,
+            "first_run_ms": r.first_run_ms,
+            **{k: v for k, v in _percentiles(r.rerun_ms).items() if k != "count"},
+            "reruns": len(r.rerun_ms),
+            "cpu_seconds": r.cpu_seconds,
+            "rss_start_mb": r.rss_start_mb,
+            "rss_peak_mb": r.rss_peak_mb,
+            "errors": r.errors[:5],
+        } for r in results],
+    }
+
+
+def _summary_line(name: str, stats: dict) -> str:
+    if not stats.get("count"):
+        return f"{name:28s} no samples"
+    return (f"{name:28s} n={stats['count']:5d}  " +
+            "  ".join(f"p{p} {stats[f'p{p}_ms']:9.1f} ms" for p in PERCENTILES) + f"  max {stats['max_ms']:9.1f} ms")
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['config'].get('mode', MODE)}: {report['config'].get('caveat', CAVEAT)}")
+    print(_summary_line("first run", report["first_run"]))
+    print(_summary_line("rerun", report["rerun"]))
+    for tab, stats in report["rerun_by_tab"].items():
+        print(_summary_line(f"  {tab}", stats))
+    p = report["process"]
+    print(f"wall {p['wall_seconds']:.1f} s, cpu {p['cpu_seconds']:.1f} s ({p['cpu_utilization']:.2f} cores, "
+          f"{p['cpu_ms_per_run']:.0f} ms/run), {p['reruns_per_second']:.1f} reruns/s, "
+          f"rss {p['rss_per_session_mb']:.0f} MB/session (+{p['rss_growth_per_session_mb']:.0f} MB running), "
+          f"errors {report['errors']}")
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """Prints current / baseline ratios of the latency percentiles, CPU and RSS."""
+    print(f"\nvs {baseline.get('git_commit')} ({baseline.get('created_at')}, {baseline['config']}):")
+    for section in ("first_run", "rerun"):
+        for p in PERCENTILES:
+            key = f"p{p}_ms"
+            old, new = baseline[section].get(key), current[section].get(key)
+            if old and new is not None:
+                print(f"{section + ' ' + key:28s} x{new / old:6.2f}")
+    for key in ("cpu_ms_per_run", "rss_per_session_mb", "rss_growth_per_session_mb", "reruns_per_second"):
+        old, new = baseline["process"].get(key), current["process"].get(key)
+        if old and new is not None:
+            print(f"{key:28s} x{new / old:6.2f}")
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--reruns", type=int, default=20, help="tab switches per session after the first run")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="mean pause between reruns")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="seconds over which sessions start")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-run AppTest timeout")
+    parser.add_argument("--cpus", type=int, help="pin all sessions to this many cores (one replica's budget)")
+    parser.add_argument("--mock", action="store_true", help="fetch from an in-process mock Entrata server")
+    parser.add_argument("--mock-latency-ms", type=float, default=300.0)
+    parser.add_argument("--mock-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--verbose", action="store_true", help="keep the app's output")
+    parser.add_argument("--output", help="write the report JSON here")
+    parser.add_argument("--compare", help="a previous report JSON to compare against")
+    args = parser.parse_args(argv)
+
+    server = _start_mock(args) if args.mock else None
+    try:
+        report = run(args.sessions, args.reruns, args.think_ms / 1000.0, args.ramp_up, args.timeout,
+                     args.cpus, f"{server.base_url}/reports" if server else None, args.verbose)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
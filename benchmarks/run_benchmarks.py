@@ -0,0 +1,246 @@
+"""
+Times every response parser and the dashboard frame builders against
+synthetic payloads at portfolio scale, and writes the results as JSON:
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --quick --compare bench.json
+
+With --fixtures DIR the parsers are also timed against the real responses
+recorded there (REPORT_FIXTURES=record, see api_response_processor.fixtures).
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+import app
+from api_response_processor import (delinquency_generator,
+                                    fixtures,
+                                    portfolio,
+                                    property_unit_lead_summary_generator,
+                                    rent_billed_collected_generator,
+                                    resident_retention_generator,
+                                    summary_tables)
+from tools import synthetic_payloads
+
+PROPERTY_SCALES = (1, 10, 100, 1000)
+LEASE_ROW_SCALES = (100, 1_000, 10_000, 100_000)
+QUICK_PROPERTY_SCALES = (1, 100)
+QUICK_LEASE_ROW_SCALES = (1_000, 10_000)
+
+Case = tuple[str, dict[str, Any], Callable[[], Any]]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "max_ms": max(samples),
+    }
+
+
+def _summaries(property_count: int):
+    """Per-property parsed models for the frame builders, built once outside the timings."""
+    ids = synthetic_payloads.property_ids(property_count)
+    week_dates = {"today": "2025-11-05", "last_saturday": "2025-11-01", "last_friday": "2025-10-31",
+                  "saturday_before_last_friday": "2025-10-25", "last_to_last_friday": "2025-10-24",
+                  "saturday_before_last_to_last_friday": "2025-10-18"}
+    weeks = property_unit_lead_summary_generator.get_week_ranges(week_dates)
+    box_scores = [portfolio.split_by_property(synthetic_payloads.box_score_response(ids, period=start), ids)
+                  for start, _ in weeks]
+    months = {"current": "11/2025", "last": "10/2025", "last_to_last": "09/2025"}
+    rent = [portfolio.split_by_property(
+        synthetic_payloads.comparative_delinquency_response(ids, month=months[m]), ids) for m in months]
+    retention = portfolio.split_by_property(synthetic_payloads.resident_retention_response(ids), ids)
+    delinquency = portfolio.split_delinquency_by_property(synthetic_payloads.aged_receivables_response(ids, 500), ids)
+
+    models = {}
+    with contextlib.redirect_stdout(io.StringIO()):  # the summarize_* "Calculated ..." lines
+        for pid in ids:
+            ps, us, leads = property_unit_lead_summary_generator.summarize_box_scores(
+                pid, week_dates, [week[pid] for week in box_scores])
+            rent_summary = rent_billed_collected_generator.summarize_rent_billed_collected(
+                pid, months, [month[pid] for month in rent])
+            models[pid] = (ps, us, resident_retention_generator.get_expiring_and_renewals(retention[pid]),
+                           rent_summary, delinquency[pid], leads)
+    return models
+
+
+def parser_cases(property_scales, lease_row_scales) -> list[Case]:
+    cases: list[Case] = []
+    for count in property_scales:
+        ids = synthetic_payloads.property_ids(count)
+        box_score = synthetic_payloads.box_score_response(ids)
+        delinquency = synthetic_payloads.comparative_delinquency_response(ids)
+        retention = synthetic_payloads.resident_retention_response(ids)
+        split_box = portfolio.split_by_property(box_score, ids)
+        split_rent = portfolio.split_by_property(delinquency, ids)
+        split_retention = portfolio.split_by_property(retention, ids)
+        split_trend = portfolio.split_by_property(
+            synthetic_payloads.comparative_delinquency_response(ids, periods=24), ids)
+        params = {"properties": count}
+
+        cases += [
+            ("portfolio.split_by_property[box_score]", params,
+             lambda b=box_score, i=ids: portfolio.split_by_property(b, i)),
+            ("build_property_summary", params,
+             lambda s=split_box: [property_unit_lead_summary_generator.build_property_summary(r) for r in s.values()]),
+            ("build_unit_summary", params,
+             lambda s=split_box: [property_unit_lead_summary_generator.build_unit_summary(r) for r in s.values()]),
+            ("_extract_lead_metrics", params,
+             lambda s=split_box: [property_unit_lead_summary_generator._extract_lead_metrics(r) for r in s.values()]),
+            ("parse_box_score", params,
+             lambda s=split_box: [property_unit_lead_summary_generator.parse_box_score(r) for r in s.values()]),
+            ("BOX_SCORE.by_property", params,
+             lambda b=box_score, i=ids: property_unit_lead_summary_generator.BOX_SCORE.by_property(b, i)),
+            ("build_leads_summary", params,
+             lambda s=split_box: [property_unit_lead_summary_generator.build_leads_summary(r, r, r, {})
+                                  for r in s.values()]),
+            ("_extract_rent_metrics", params,
+             lambda s=split_rent: [rent_billed_collected_generator._extract_rent_metrics(r) for r in s.values()]),
+            ("_extract_rent_series[24 months]", params,
+             lambda s=split_trend: [rent_billed_collected_generator._extract_rent_series(r, 24) for r in s.values()]),
+            ("get_expiring_and_renewals", params,
+             lambda s=split_retention: [resident_retention_generator.get_expiring_and_renewals(r)
+                                        for r in s.values()]),
+        ]
+
+    for rows in lease_row_scales:
+        ids = synthetic_payloads.property_ids(max(1, min(1000, rows // 100)))
+        receivables = synthetic_payloads.aged_receivables_response(ids, rows)
+        params = {"lease_rows": rows, "properties": len(ids)}
+        cases += [
+            ("sum_delinquency_buckets", params,
+             lambda r=receivables: delinquency_generator.sum_delinquency_buckets(r)),
+            ("aggregate_delinquency_buckets", params,
+             lambda r=receivables: delinquency_generator.aggregate_delinquency_buckets(r)),
+            ("portfolio.split_delinquency_by_property", params,
+             lambda r=receivables, i=ids: portfolio.split_delinquency_by_property(r, i)),
+        ]
+    return cases
+
+
+# The parser timed against each recorded report (by reportName).
+_FIXTURE_PARSERS = {
+    "box_score": property_unit_lead_summary_generator.parse_box_score,
+    "comparative_delinquency": rent_billed_collected_generator._extract_rent_metrics,
+    "resident_aged_receivables": delinquency_generator.aggregate_delinquency_buckets,
+    "resident_retention": resident_retention_generator.get_expiring_and_renewals,
+}
+
+
+def fixture_cases(directory: str) -> list[Case]:
+    """One case per recorded response whose report has a parser; params name the fixture."""
+    cases: list[Case] = []
+    for document in fixtures.iter_fixtures(directory):
+        parse = _FIXTURE_PARSERS.get(document.get("report"))
+        if parse is None:
+            continue
+        params = {"fixture": fixtures.fixture_name(document["report"], document["key"]), "recorded_ms": document.get("elapsed_ms")}
+        cases.append((f"fixture:{parse.__name__}", params, lambda p=document["payload"], f=parse: f(p)))
+    return cases
+
+
+def frame_cases(property_scales) -> list[Case]:
+    """Summary table construction, and the chart frames render_overview / render_operations build."""
+    cases: list[Case] = []
+    for count in property_scales:
+        models = _summaries(count)
+        tables = summary_tables.from_models(models)
+        params = {"properties": count}
+
+        cases += [
+            ("summary_tables.from_models", params, lambda m=models: summary_tables.from_models(m)),
+            ("render_overview.frames", params,
+             lambda t=tables: (app.build_rent_frame(summary_tables.to_pandas(t.rent)),
+                               app.build_delinquency_frame(summary_tables.to_pandas(t.delinquency)))),
+            ("render_operations.frames", params,
+             lambda t=tables: app.build_leads_frame(summary_tables.to_pandas(t.leads))),
+        ]
+    return cases
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(property_scales, lease_row_scales, repeat: int, only: Optional[str] = None,
+        fixtures_dir: Optional[str] = None) -> dict:
+    results = []
+    cases = parser_cases(property_scales, lease_row_scales) + frame_cases(property_scales)
+    if fixtures_dir:
+        cases += fixture_cases(fixtures_dir)
+    for name, params, fn in cases:
+        if only and only not in name:
+            continue
+        timing = _time(fn, repeat)
+        results.append({"name": name, "params": params, "repeat": repeat, **timing})
+        print(f"{name:45s} {json.dumps(params):40s} median {timing['median_ms']:10.3f} ms")
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """Prints median ratios (current / baseline) for every case present in both runs."""
+    def key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    before = {key(r): r for r in baseline["results"]}
+    print(f"\nvs {baseline.get('git_commit')} ({baseline.get('created_at')}):")
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old:
+            ratio = result["median_ms"] / old["median_ms"] if old["median_ms"] else float("nan")
+            print(f"{result['name']:45s} {json.dumps(result['params']):40s} x{ratio:6.2f}")
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--compare", help="a previous results JSON to compare against")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="small scales only")
+    parser.add_argument("--only", help="run cases whose name contains this")
+    parser.add_argument("--fixtures", help="also time the parsers on the responses recorded in this directory")
+    args = parser.parse_args(argv)
+
+    results = run(QUICK_PROPERTY_SCALES if args.quick else PROPERTY_SCALES,
+                  QUICK_LEASE_ROW_SCALES if args.quick else LEASE_ROW_SCALES,
+                  args.repeat, args.only, args.fixtures)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import threading
+
+from api_response_processor import background_refresh, last_good, response_cache
+
+
+def test_revalidate_refreshes_each_report_once_and_stores_complete_tables(mocker, monkeypatch):
+    monkeypatch.setattr(last_good, "_store", last_good.LastGoodStore(directory=None))
+    monkeypatch.setattr(background_refresh, "_refreshed_at", {})
+    release = threading.Event()
+
+    def fetch(property_id, reports, incomplete):
+        release.wait(5)
+        incomplete.add("resident_aged_receivables")
+        return {report: {report: f"{report} tables"} for report in reports}
+
+    fetch_report_tables = mocker.patch.object(background_refresh.fetch_engine, "fetch_report_tables",
+                                              side_effect=fetch)
+    reports = ("resident_retention", "resident_aged_receivables")
+    background_refresh.revalidate(7, reports)
+    background_refresh.revalidate(7, reports)  # in flight: not started again
+    assert background_refresh.refreshing(7, reports)
+    future = background_refresh._refreshing[("7", "resident_retention")]
+    release.set()
+    future.result(5)
+
+    assert fetch_report_tables.call_count == 1
+    assert last_good.get_store().get(7, "resident_retention").tables == {"resident_retention": "resident_retention tables"}
+    assert last_good.get_store().get(7, "resident_aged_receivables") is None
+    background_refresh.revalidate(7, reports)  # refreshed moments ago: skipped
+    assert fetch_report_tables.call_count == 1
+
+def test_refresh_refetches_open_periods_instead_of_reading_the_cache(mocker, monkeypatch):
+    monkeypatch.setattr(last_good, "_store", last_good.LastGoodStore(directory=None))
+    cache = response_cache.ResponseCache(cache_dir=None)
+    cache.set("box_score this week", {"v": 1}, ttl_seconds=15 * 60)
+    seen = []
+
+    def fetch(property_id, reports, incomplete):
+        seen.append(cache.get("box_score this week"))
+        return {report: {report: "tables"} for report in reports}
+
+    mocker.patch.object(background_refresh.fetch_engine, "fetch_report_tables", side_effect=fetch)
+    assert background_refresh.refresh(7, ("box_score",)) == set()
+    assert seen == [None]
+    assert cache.get("box_score this week") == {"v": 1}  # other readers still get it
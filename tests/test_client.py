@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from api_response_processor import client, rate_limiter, response_cache
+from config import constants
+
+
+def _response(status_code, payload=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = b"{}" if payload is None else json.dumps(payload).encode()
+    return response
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch, mocker):
+    monkeypatch.setattr(constants, "HTTP_BACKOFF_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(constants, "HTTP_BACKOFF_MAX_SECONDS", 0.01)
+    mocker.patch.object(client.helpers, "get_headers", return_value={})
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+
+BODY = constants.GET_RESIDENT_RETENTION
+
+def test_post_report_retries_transient_5xx(mocker):
+    post = mocker.patch.object(client.get_session(), "post",
+                               side_effect=[_response(503), _response(502), _response(200, {"ok": 1})])
+    assert client.post_report(BODY, "resident retention") == {"ok": 1}
+    assert post.call_count == 3
+    assert client.last_failure() is None
+
+def test_post_report_gives_up_after_max_attempts(mocker, monkeypatch):
+    monkeypatch.setattr(constants, "HTTP_MAX_ATTEMPTS", 2)
+    post = mocker.patch.object(client.get_session(), "post", return_value=_response(500))
+    assert client.post_report(BODY, "resident retention") is None
+    assert post.call_count == 2
+    assert client.last_failure() == 500
+
+def test_post_report_does_not_retry_client_errors(mocker):
+    post = mocker.patch.object(client.get_session(), "post", return_value=_response(400))
+    assert client.post_report(BODY, "resident retention") is None
+    assert post.call_count == 1
+    assert client.last_failure() == 400
+
+def test_wait_honours_retry_after():
+    error = client.RetryableResponseError(_response(429, headers={"Retry-After": "0.005"}))
+    state = SimpleNamespace(outcome=SimpleNamespace(exception=lambda: error), attempt_number=1)
+    assert client._wait_for_retry(state) == 0.005
+
+def test_parse_retry_after_http_date_in_past():
+    assert client._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert client._parse_retry_after("garbage") is None
+
+def test_post_report_serves_repeat_calls_from_cache(mocker):
+    post = mocker.patch.object(client.get_session(), "post", return_value=_response(200, {"ok": 1}))
+    assert client.post_report(BODY, "resident retention") == {"ok": 1}
+    assert client.post_report(BODY, "resident retention") == {"ok": 1}
+    assert post.call_count == 1
+
+def test_post_report_429_pauses_background_requests(mocker, monkeypatch):
+    limiter = rate_limiter.RateLimiter(rate=1000, burst=5)
+    monkeypatch.setattr(rate_limiter, "_limiter", limiter)
+    throttled = mocker.spy(limiter, "throttled")
+    mocker.patch.object(client.get_session(), "post",
+                        side_effect=[_response(429, headers={"Retry-After": "0.005"}), _response(200, {"ok": 1})])
+    assert client.post_report(BODY, "resident retention") == {"ok": 1}
+    throttled.assert_called_once_with(0.005)
+
+def test_interactive_caller_coalesced_behind_a_paused_background_request_raises_it(mocker, monkeypatch):
+    limiter = rate_limiter.RateLimiter(rate=1000, burst=5)
+    monkeypatch.setattr(rate_limiter, "_limiter", limiter)
+    limiter.throttled(retry_after=5)
+    post = mocker.patch.object(client.get_session(), "post", return_value=_response(200, {"ok": 1}))
+
+    def prefetch():
+        with rate_limiter.priority(rate_limiter.BACKGROUND):
+            client.post_report(BODY, "resident retention")
+
+    background = threading.Thread(target=prefetch)
+    background.start()
+    time.sleep(0.05)  # the background request is queued behind the pause
+    started = time.monotonic()
+    assert client.post_report(BODY, "resident retention") == {"ok": 1}
+    assert time.monotonic() - started < 1
+    background.join()
+    assert post.call_count == 1
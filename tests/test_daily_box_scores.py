@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+
+import numpy as np
+from freezegun import freeze_time
+
+from api_response_processor import (daily_box_scores,
+                                    fetch_engine,
+                                    formatting,
+                                    property_unit_lead_summary_generator,
+                                    snapshot_store)
+
+
+def test_week_windows_end_with_the_current_partial_week():
+    windows = daily_box_scores.week_windows(date(2025, 11, 5), 3)  # a Wednesday
+    assert windows == [(date(2025, 10, 18), date(2025, 10, 24)),
+                       (date(2025, 10, 25), date(2025, 10, 31)),
+                       (date(2025, 11, 1), date(2025, 11, 5))]
+
+def test_prefix_sum_totals_match_summing_the_days():
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 20, size=(90, len(daily_box_scores.DAILY_COUNTS))).astype(float)
+    counts[10, 2] = np.nan
+    first = date(2025, 8, 1)
+    daily = daily_box_scores.DailyBoxScores(first, counts)
+
+    windows = [(first + timedelta(days=s), first + timedelta(days=e)) for s, e in ((0, 6), (5, 40), (89, 89))]
+    expected = [np.nansum(counts[s:e + 1], axis=0) for s, e in ((0, 6), (5, 40), (89, 89))]
+    assert np.array_equal(daily.totals(windows), np.array(expected))
+    # windows reaching outside the data only count the days that are there
+    assert daily.total(first - timedelta(days=3), first)["new_leads"] == counts[0, 0]
+
+@freeze_time("2025-11-05 12:00:00")
+def test_only_days_missing_from_the_store_are_fetched(monkeypatch, mocker):
+    store = snapshot_store.open_snapshot_store("sqlite:///:memory:")
+    monkeypatch.setattr(snapshot_store, "_store", store)
+    fetch = mocker.spy(property_unit_lead_summary_generator, "fetch_box_score")
+
+    first = fetch_engine.fetch_daily_box_scores(100082999, date(2025, 10, 1))
+    assert fetch.call_count == 36
+    second = fetch_engine.fetch_daily_box_scores(100082999, date(2025, 10, 1))
+    assert fetch.call_count == 37 and fetch.call_args.args[1] == "2025-11-05"  # only today again
+    assert second.total(date(2025, 10, 1), date(2025, 10, 7))["new_leads"] == 7 * 42
+    assert first.total(date(2025, 10, 1), date(2025, 11, 5)) == second.total(date(2025, 10, 1), date(2025, 11, 5))
+    store.close()
+
+def test_weekly_tours_are_labelled_as_summed_daily_visits():
+    first = date(2025, 10, 25)
+    counts = np.zeros((14, len(daily_box_scores.DAILY_COUNTS)))
+    counts[:, daily_box_scores.DAILY_COUNTS.index("unique_visits_tours")] = 1.0
+    windows = [(first, first + timedelta(days=6)), (first + timedelta(days=7), first + timedelta(days=13))]
+    weekly = daily_box_scores.weekly_lead_counts(daily_box_scores.DailyBoxScores(first, counts), windows)
+    assert weekly.tour_visits == [7.0, 7.0]
+    assert formatting.LEADS_TREND_STAGES["tour_visits"] == "Tour Visits (daily, summed)"
@@ -0,0 +1,38 @@
+from api_response_processor import delinquency_generator
+
+
+def _response(rows):
+    return {"response": {"result": [{"reportData": rows}]}}
+
+def test_sum_delinquency_buckets_matches_fake_payload():
+    summary = delinquency_generator.sum_delinquency_buckets(
+        delinquency_generator.get_fake_delinquency_buckets_response())
+    assert summary.current_month_delinquency == 1550.5
+    assert summary.last_month_delinquency == 1000.75
+    assert summary.month_before_last_delinquency == 499.75
+
+def test_aggregate_coerces_non_numeric_values_to_zero():
+    totals, _ = delinquency_generator.aggregate_delinquency_buckets(_response([
+        {"thirty_days": "12.5", "sixty_days": "n/a", "current": None},
+        {"thirty_days": 1, "ninety_plus_days": "", "ninety_days": float("inf")},
+    ]))
+    assert totals.thirty_days == 13.5
+    assert totals.sixty_days == 0
+    assert totals.ninety_days == 0
+    assert totals.ninety_plus_days == 0
+
+def test_aggregate_returns_per_property_subtotals():
+    totals, by_property = delinquency_generator.aggregate_delinquency_buckets(_response([
+        {"property_id": 1, "current": 10, "thirty_days": 1},
+        {"property_id": "1", "current": 5},
+        {"property_id": 2, "ninety_plus_days": 7},
+        {"thirty_days": 2},
+    ]))
+    assert totals.current == 15 and totals.thirty_days == 3
+    assert sorted(by_property) == ["1", "2"]
+    assert by_property["1"].current == 15
+    assert by_property["2"].ninety_plus_days == 7
+
+def test_aggregate_empty_response():
+    totals, by_property = delinquency_generator.aggregate_delinquency_buckets({})
+    assert totals.thirty_days == 0 and by_property == {}
@@ -0,0 +1,85 @@
+import math
+
+import pyarrow as pa
+
+from freezegun import freeze_time
+
+import app
+from api_response_processor import data_classes, deltas, snapshot_store, summary_tables
+
+
+def _view(rows: dict):
+    return summary_tables.to_pandas(pa.table(rows))
+
+def test_deltas_per_property_against_previous_period_and_baseline():
+    view = _view({"property_id": ["1", "1", "1", "2", "2"], "period": ["c", "l", "w", "c", "l"],
+                  "units": [3.0, 2.0, None, 1.0, 0.0], "occupied_percentage": [0.9, 0.8, 0.7, 0.5, None]})
+    result = deltas.deltas(view, ["units", "occupied_percentage"], baseline_periods=2)
+
+    assert list(result.columns) == list(deltas.DELTA_COLUMNS)
+    rows = {(r.property_id, r.kpi): r for r in result.itertuples()}
+    assert (rows["1", "units"].change, rows["1", "units"].pct_change, rows["1", "units"].baseline) == (1.0, 0.5, 2.0)
+    assert math.isclose(rows["1", "occupied_percentage"].baseline, 0.75)
+    assert math.isclose(rows["1", "occupied_percentage"].baseline_change, 0.15)
+    assert rows["2", "units"].change == 1.0 and math.isnan(rows["2", "units"].pct_change)  # from 0
+    assert math.isnan(rows["2", "occupied_percentage"].change)  # nothing to compare against
+
+    oldest_first = deltas.deltas(view.iloc[::-1], ["units", "occupied_percentage"], newest_first=False,
+                                 baseline_periods=2)
+    assert oldest_first.sort_values(["property_id", "kpi"]).reset_index(drop=True).equals(
+        result.sort_values(["property_id", "kpi"]).reset_index(drop=True))
+
+@freeze_time("2025-11-05 12:00:00")
+def test_baseline_reaches_into_stored_weeks_and_months():
+    week_dates = {"saturday_before_last_to_last_friday": "2025-10-18"}
+    assert deltas.earlier_weeks(week_dates, 2) == ["2025-10-11-2025-10-17", "2025-10-04-2025-10-10"]
+    assert deltas.earlier_months(2) == ["08/2025", "07/2025"]
+
+    store = snapshot_store.SQLiteSnapshotStore(":memory:")
+    store.put("1", "units_summary", "2025-10-11-2025-10-17", data_classes.UnitsSummary(*[10.0] * 8))
+    store.put("1", "rent_billed_collected", "08/2025", {"billed": 40.0, "collected": 20.0})
+    us = _view({"property_id": ["1"] * 3, "period": ["c", "l", "w"], "count_of_vacant_units": [16.0, 14.0, 12.0]})
+    rent = _view({"property_id": ["1"] * 3, "period": ["11/2025", "10/2025", "09/2025"],
+                  "billed": [10.0, 20.0, 30.0], "collected": [5.0, 5.0, 5.0]})
+
+    [vacant] = deltas.week_deltas(us, "units_summary", ["count_of_vacant_units"],
+                                  {**week_dates, "today": "2025-11-05"}, store).itertuples()
+    assert (vacant.previous, vacant.baseline) == (14.0, 12.0)  # mean of 14, 12 and the stored 10
+    # the month to date is left out: 10/2025 against 09/2025, the baseline with the stored 08/2025
+    billed, collected = deltas.month_deltas(rent, ["billed", "collected"], store).itertuples()
+    assert (billed.value, billed.previous, billed.baseline, collected.baseline) == (20.0, 30.0, 35.0, 12.5)
+
+@freeze_time("2025-11-01 09:00:00")  # a Saturday: both the week and the month just rolled over
+def test_flows_just_after_a_rollover_compare_closed_periods():
+    week_dates = {"saturday_before_last_to_last_friday": "2025-10-18"}
+    us = _view({"property_id": ["1"] * 3, "period": ["2025-11-01-2025-11-01", "2025-10-25-2025-10-31", "w"],
+                "count_of_vacant_units": [15.0, 16.0, 12.0], "count_of_total_move_ins": [0.0, 9.0, 8.0]})
+    [vacant] = deltas.week_deltas(us, "units_summary", ["count_of_vacant_units"], week_dates).itertuples()
+    [move_ins] = deltas.week_deltas(us, "units_summary", ["count_of_total_move_ins"], week_dates,
+                                    closed_only=True).itertuples()
+    assert (vacant.value, vacant.change) == (15.0, -1.0)  # point in time: today against last week
+    assert (move_ins.value, move_ins.previous, move_ins.change) == (9.0, 8.0, 1.0)  # not 0 against 9
+
+    rent = _view({"property_id": ["1"] * 3, "period": ["11/2025", "10/2025", "09/2025"],
+                  "billed": [0.0, 100.0, 90.0], "collected": [0.0, 95.0, 80.0]})
+    billed, collected = deltas.month_deltas(rent, ["billed", "collected"]).itertuples()
+    assert (billed.value, billed.change, collected.change) == (100.0, 10.0, 15.0)
+
+def test_delta_badge_arrows_and_tone():
+    view = _view({"property_id": ["1", "1"], "period": ["c", "l"], "count_of_vacant_units": [12.0, 10.0],
+                  "occupied_units_percentage": [0.95, 0.9], "total_units": [5.0, None]})
+    wow = deltas.for_property(deltas.deltas(view, ["count_of_vacant_units", "occupied_units_percentage",
+                                                   "total_units"]))
+
+    assert 'class="kpi-delta bad"' in app.delta_badge(wow["count_of_vacant_units"], "vs last week")
+    assert "▲ 20.0 % vs last week" in app.delta_badge(wow["count_of_vacant_units"], "vs last week")
+    badge = app.delta_badge(wow["occupied_units_percentage"], "vs last week")
+    assert 'class="kpi-delta good"' in badge and "▲ 5.00 pts vs last week" in badge
+    assert app.delta_badge(wow["total_units"], "vs last week") == ""
+
+def test_kpi_card_without_delta_or_age_stays_one_html_block():
+    badge = '<div class="kpi-delta">x</div>'
+    for delta, as_of in (("", None), (app.delta_badge(None, "vs last week"), 0.0), (badge, None)):
+        lines = app.kpi_card_html("Renewals", "9", as_of, delta).splitlines()
+        assert all(line and line == line.lstrip() for line in lines)
+
@@ -0,0 +1,50 @@
+import os
+
+from api_response_processor import (delinquency_generator, property_unit_lead_summary_generator,
+                                    rent_billed_collected_generator, resident_retention_generator, summary_tables)
+from tools import export_pdfs
+
+
+def test_export_writes_pdfs_and_resumes(tmp_path):
+    output_dir = str(tmp_path)
+    done = export_pdfs.pdf_path(output_dir, 100082999)
+    with open(done, "wb") as f:
+        f.write(b"%PDF- rendered before the crash")
+
+    results = export_pdfs.export([100082999, 100083000], output_dir, processes=1)
+
+    assert results == {100082999: done, 100083000: export_pdfs.pdf_path(output_dir, 100083000)}
+    with open(done, "rb") as f:
+        assert f.read() == b"%PDF- rendered before the crash"  # skipped, not re-rendered
+    with open(results[100083000], "rb") as f:
+        assert f.read(5) == b"%PDF-"
+    assert sorted(os.listdir(output_dir)) == ["100082999.pdf", "100083000.pdf"]  # no .tmp left behind
+
+def test_export_skips_properties_with_failed_reports(tmp_path, monkeypatch):
+    fetch_models = export_pdfs.portfolio.fetch_models
+
+    def failing(property_ids, batch_size=None, incomplete=None):
+        incomplete.add(100083000)
+        return fetch_models(property_ids, batch_size)
+
+    monkeypatch.setattr(export_pdfs.portfolio, "fetch_models", failing)
+    results = export_pdfs.export([100082999, 100083000], str(tmp_path), processes=1)
+
+    assert results[100083000] is None and os.listdir(tmp_path) == ["100082999.pdf"]  # retried on the next run
+
+def test_formatting_matches_the_dashboard():
+    assert export_pdfs.k(float("nan")) == "-"
+    assert export_pdfs.k(125000.0, currency=True) == "$125.00 K"
+    assert export_pdfs.pct(0.7826) == "78.26 %"
+
+def test_pdf_renders_missing_values():
+    week_dates = {"today": "2025-11-05", "last_saturday": "2025-11-01", "last_friday": "2025-10-31",
+                  "saturday_before_last_friday": "2025-10-25", "last_to_last_friday": "2025-10-24",
+                  "saturday_before_last_to_last_friday": "2025-10-18"}
+    ps, us, leads = property_unit_lead_summary_generator.summarize_box_scores(1, week_dates, [{}, {}, {}])
+    models = (ps, us, resident_retention_generator.get_expiring_and_renewals({}),
+              rent_billed_collected_generator.summarize_rent_billed_collected(
+                  1, {"current": "11/2025", "last": "10/2025", "last_to_last": "09/2025"}, [{}, {}, {}]),
+              delinquency_generator.sum_delinquency_buckets({}), leads)
+    pdf = export_pdfs.build_pdf(1, summary_tables.from_models({1: models}), "now")
+    assert bytes(pdf.output())[:5] == b"%PDF-"
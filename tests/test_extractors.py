@@ -0,0 +1,51 @@
+import math
+
+from api_response_processor import portfolio
+from api_response_processor.extractors import Extractor, Field
+
+
+def _response(report_data):
+    return {"response": {"result": [{"reportData": report_data}]}}
+
+SPEC = Extractor("test", {
+    "units": Field("total_units", ("availability",)),
+    "move_ins": Field("move_ins", ("property_pulse", "pulse")),
+    "skips": Field("skips", ("property_pulse", "pulse"), default=0),
+    "name": Field("name", ("availability",), coerce=str),
+})
+
+def test_fields_use_section_fallbacks_defaults_and_coercion():
+    values = SPEC(_response({"availability": [{"total_units": "95", "name": 7}, {"total_units": 1}],
+                             "property_pulse": [], "pulse": [{"move_ins": 3}]}))
+    assert values == {"units": 95.0, "move_ins": 3.0, "skips": 0, "name": "7"}
+
+def test_default_replaces_only_missing_values():
+    spec = Extractor("defaults", {"skips": Field("skips", default=5), "open": Field("open", coerce=bool, default=True)})
+    assert spec(_response([{"skips": 0, "open": False}])) == {"skips": 0.0, "open": False}
+    assert spec(_response([{"skips": 0.0}])) == {"skips": 0.0, "open": True}
+    assert spec(_response([{"skips": None, "open": ""}])) == {"skips": 5.0, "open": True}
+
+def test_missing_sections_and_bad_values_do_not_raise():
+    for response in ({}, _response([]), _response({"availability": ["not a row"]}), {"response": {"result": []}}):
+        values = SPEC(response)
+        assert math.isnan(values["units"]) and values["skips"] == 0
+    assert [v["units"] for v in SPEC.many([_response({"availability": [{"total_units": n}]}) for n in (1, 2)])] \
+        == [1.0, 2.0]
+
+def test_rows_report_reads_first_row_of_a_list_or_first_non_empty_section():
+    rent = Extractor("rent", {"billed": Field("amount_due_0")})
+    assert rent(_response([{"amount_due_0": 5}, {"amount_due_0": 6}])) == {"billed": 5.0}
+    assert rent(_response({"empty": [], "rows": [{"amount_due_0": 8}]})) == {"billed": 8.0}
+
+def test_by_property_matches_split_then_extract():
+    response = _response({
+        "availability": [{"property_id": 1, "total_units": 10}, {"property_id": "2", "total_units": 20},
+                         {"property_id": 9, "total_units": 90}],
+        "pulse": [{"property_id": 2, "move_ins": 3, "skips": 1}],
+    })
+    by_property = SPEC.by_property(response, [1, 2, 3])
+    split = portfolio.split_by_property(response, [1, 2, 3])
+    assert list(by_property) == [1, 2, 3]
+    for pid in (1, 2, 3):
+        assert str(by_property[pid]) == str(SPEC(split[pid]))  # NaN != NaN, compare reprs
+    assert by_property[2]["move_ins"] == 3 and by_property[1]["skips"] == 0
@@ -0,0 +1,52 @@
+import time
+
+from api_response_processor import fetch_engine, data_classes
+
+
+def _slow(value):
+    time.sleep(0.2)
+    return value
+
+def _boom():
+    raise RuntimeError("upstream down")
+
+def test_fetch_all_runs_tasks_concurrently():
+    tasks = {i: (_slow, (i,)) for i in range(8)}
+    started = time.perf_counter()
+    results = fetch_engine.fetch_all(tasks, max_workers=8)
+    assert time.perf_counter() - started < 0.2 * 4
+    assert list(results) == list(range(8))
+    assert list(results.values()) == list(range(8))
+
+def test_fetch_all_failed_task_yields_none():
+    results = fetch_engine.fetch_all({"ok": (_slow, ("x",)), "bad": (_boom, ())})
+    assert results == {"ok": "x", "bad": None}
+
+def test_fetch_property_models_returns_dashboard_models():
+    ps, us, rr, rent, dq, leads = fetch_engine.fetch_property_models(100082999)
+    assert len(ps) == 3 and len(us) == 3
+    assert isinstance(next(iter(ps.values())), data_classes.PropertySummary)
+    assert isinstance(rr, data_classes.ResidentRetentionSummaryForCurrentMonth)
+    assert rent.current_month_total_rent_billed == 125000
+    assert dq.current_month_delinquency == 1550.5
+    assert isinstance(leads, data_classes.LeadsSummaryForThreeWeeks)
+
+def test_fetch_report_models_only_fetches_the_requested_reports(mocker):
+    box_score = mocker.spy(fetch_engine.property_unit_lead_summary_generator, "fetch_box_score")
+    retention = mocker.spy(fetch_engine.resident_retention_generator, "fetch_resident_retention")
+    models = fetch_engine.fetch_report_models(100082999, ("resident_retention",))
+    assert list(models) == ["resident_retention"]
+    assert box_score.call_count == 0 and retention.call_count == 1
+
+def test_fetch_report_tables_groups_tables_by_report():
+    tables = fetch_engine.fetch_report_tables(100082999, ("box_score", "resident_retention"))
+    assert {report: sorted(t) for report, t in tables.items()} == {
+        "box_score": ["leads", "property_summary", "units_summary"], "resident_retention": ["retention"]}
+
+def test_fetch_report_models_reports_incomplete_reports(mocker):
+    mocker.patch.object(fetch_engine.resident_retention_generator, "fetch_resident_retention", return_value=None)
+    incomplete = set()
+    models = fetch_engine.fetch_report_models(100082999, ("resident_retention", "resident_aged_receivables"),
+                                              incomplete=incomplete)
+    assert incomplete == {"resident_retention"}
+    assert sorted(models) == ["resident_aged_receivables", "resident_retention"]
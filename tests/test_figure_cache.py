@@ -0,0 +1,28 @@
+import pandas as pd
+import plotly.express as px
+
+from api_response_processor import figure_cache
+
+
+def _bar(df, **options):
+    return px.bar(df, **options)
+
+
+def test_unchanged_inputs_reuse_the_figure():
+    cache = figure_cache.FigureCache(max_bytes=1024 * 1024)
+    df = pd.DataFrame({"Period": ["09/2025", "10/2025"], "Amount": [1.0, 2.0]})
+    first = cache.figure(_bar, df, x="Period", y="Amount")
+    assert cache.figure(_bar, df.copy(), x="Period", y="Amount") is first
+    assert cache.figure(_bar, df, x="Period", y="Amount", text_auto=".0f") is not first
+    assert cache.figure(_bar, df.assign(Amount=[1.0, 3.0]), x="Period", y="Amount") is not first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_eviction_is_bounded_by_serialized_size():
+    df = pd.DataFrame({"x": list(range(50)), "y": [float(i) for i in range(50)]})
+    size = len(_bar(df, x="x", y="y").to_json())
+    cache = figure_cache.FigureCache(max_bytes=int(size * 2.5))
+    for n in range(4):
+        cache.figure(_bar, df.assign(y=df["y"] + n), x="x", y="y")
+    stats = cache.stats()
+    assert stats["figures"] == 2 and stats["bytes"] <= size * 2.5
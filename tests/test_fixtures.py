@@ -0,0 +1,77 @@
+import copy
+import gzip
+import json
+from datetime import date
+
+import requests
+from freezegun import freeze_time
+
+from api_response_processor import client, fixtures, helpers, response_cache
+from config import constants
+
+BODY = constants.GET_RESIDENT_RETENTION
+PAYLOAD = {"response": {"result": [{"reportData": [{"expiring_leases": 3, "renewals": 2, "echo": "secret-key"}]}]}}
+
+
+def _response(payload):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def test_record_strips_credentials_and_round_trips(tmp_path):
+    path = fixtures.record(BODY, PAYLOAD, 0.25, secrets=["secret-key"], directory=str(tmp_path))
+    with gzip.open(path, "rt") as f:
+        text = f.read()
+    assert "auth" not in json.loads(text) and "password" not in text and "secret-key" not in text
+    document = fixtures.load(BODY, str(tmp_path))
+    assert document["elapsed_ms"] == 250.0 and document["report"] == "resident_retention"
+    assert fixtures.replay(BODY, latency_scale=0, directory=str(tmp_path))["response"]["result"][0][
+        "reportData"][0]["echo"] == fixtures.REDACTED
+    assert fixtures.replay(constants.GET_BOX_SCORE_DATA, latency_scale=0, directory=str(tmp_path)) is None
+
+
+def test_post_report_records_then_replays_without_upstream(tmp_path, mocker, monkeypatch):
+    monkeypatch.setattr(constants, "REPORT_FIXTURES_DIR", str(tmp_path))
+    monkeypatch.setattr(constants, "REPORT_FIXTURES_LATENCY_SCALE", 0)
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+    mocker.patch.object(client.helpers, "get_headers", return_value={"X-Api-Key": "secret-key"})
+    post = mocker.patch.object(client.get_session(), "post", return_value=_response(PAYLOAD))
+
+    monkeypatch.setattr(constants, "REPORT_FIXTURES", fixtures.RECORD)
+    assert client.post_report(BODY, "resident retention") == PAYLOAD
+    assert len(list(tmp_path.glob("resident_retention-*.json.gz"))) == 1
+
+    monkeypatch.setattr(constants, "REPORT_FIXTURES", fixtures.REPLAY)
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+    replayed = client.post_report(BODY, "resident retention")
+    assert replayed["response"]["result"][0]["reportData"][0]["expiring_leases"] == 3
+    assert post.call_count == 1
+
+
+def _todays_box_score():
+    body = copy.deepcopy(constants.GET_BOX_SCORE_DATA)
+    period = body["method"]["params"]["filters"]["period"]
+    period["daterange-start"] = period["daterange-end"] = helpers.get_today().isoformat()
+    return body
+
+def test_replay_on_a_later_day_uses_the_day_of_the_recording(tmp_path, mocker, monkeypatch):
+    monkeypatch.setattr(constants, "REPORT_FIXTURES_DIR", str(tmp_path))
+    monkeypatch.setattr(constants, "REPORT_FIXTURES_LATENCY_SCALE", 0)
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+    mocker.patch.object(client.helpers, "get_headers", return_value={})
+    post = mocker.patch.object(client.get_session(), "post", return_value=_response(PAYLOAD))
+
+    monkeypatch.setattr(constants, "REPORT_FIXTURES", fixtures.RECORD)
+    with freeze_time("2025-11-05 12:00:00"):
+        assert client.post_report(_todays_box_score(), "box score") == PAYLOAD
+
+    monkeypatch.setattr(constants, "REPORT_FIXTURES", fixtures.REPLAY)
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+    with freeze_time("2025-11-19 12:00:00"):
+        assert helpers.get_today() == date(2025, 11, 5)
+        assert client.post_report(_todays_box_score(), "box score")["response"]["result"][0]["reportData"]
+        monkeypatch.setattr(constants, "REPORT_FIXTURES_TODAY", "2025-11-12")
+        assert helpers.get_today() == date(2025, 11, 12)
+    assert post.call_count == 1
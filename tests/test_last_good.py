@@ -0,0 +1,20 @@
+import pyarrow as pa
+
+from api_response_processor import last_good
+
+
+def _tables(value):
+    return {"retention": pa.table({"property_id": ["1"], "renewals": [value]})}
+
+def test_entries_survive_a_restart_through_the_directory(tmp_path):
+    last_good.LastGoodStore(str(tmp_path)).put(1, "resident_retention", _tables(9.0), fetched_at=1000.5)
+    entry = last_good.LastGoodStore(str(tmp_path)).get("1", "resident_retention")
+    assert entry.fetched_at == 1000.5
+    assert entry.tables["retention"].column("renewals").to_pylist() == [9.0]
+    assert last_good.LastGoodStore(str(tmp_path)).get(1, "box_score") is None
+
+def test_an_older_fetch_does_not_replace_a_newer_one():
+    store = last_good.LastGoodStore(directory=None)
+    store.put(1, "resident_retention", _tables(9.0), fetched_at=2000)
+    store.put(1, "resident_retention", _tables(5.0), fetched_at=1000)
+    assert store.get(1, "resident_retention").tables["retention"].column("renewals").to_pylist() == [9.0]
@@ -0,0 +1,40 @@
+import dataclasses
+import multiprocessing
+import os
+
+from benchmarks import load_test
+
+
+def test_session_switches_tabs_without_errors():
+    result = load_test.run_session(0, reruns=3, think_seconds=0, timeout=60)
+    assert result.errors == []
+    assert result.rerun_tabs == ["Operations", "Resident Retention", "Overview"]
+    assert result.first_run_ms > 0 and len(result.rerun_ms) == 3
+
+def test_percentiles():
+    stats = load_test._percentiles([float(ms) for ms in range(1, 101)])
+    assert stats["count"] == 100 and stats["p50_ms"] == 50.5 and stats["max_ms"] == 100.0
+    assert load_test._percentiles([]) == {"count": 0}
+
+def test_crashed_session_is_reported_not_waited_for():
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    reported = dataclasses.asdict(load_test.SessionResult(1, first_run_ms=5.0))
+    processes = [context.Process(target=os._exit, args=(3,)),  # dies before reporting, like an import error
+                 context.Process(target=queue.put, args=(reported,))]
+    for process in processes:
+        process.start()
+
+    crashed, ok = load_test._collect(processes, queue, poll_seconds=0.2)
+
+    assert crashed.session == 0 and crashed.errors == ["session process exited with code 3 without a result"]
+    assert ok.first_run_ms == 5.0 and ok.errors == []
+
+def test_report_states_the_sessions_ran_as_isolated_processes(capsys):
+    stats = load_test._percentiles([10.0, 20.0])
+    report = {"config": {"mode": load_test.MODE, "caveat": load_test.CAVEAT}, "first_run": stats, "rerun": stats,
+              "rerun_by_tab": {}, "errors": 0,
+              "process": {"wall_seconds": 1.0, "cpu_seconds": 0.5, "cpu_utilization": 0.5, "cpu_ms_per_run": 250.0,
+                          "reruns_per_second": 2.0, "rss_per_session_mb": 200.0, "rss_growth_per_session_mb": 5.0}}
+    load_test.print_report(report)
+    assert capsys.readouterr().out.startswith("isolated_processes: each session is its own AppTest process")
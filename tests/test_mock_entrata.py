@@ -0,0 +1,66 @@
+import copy
+import threading
+
+import pytest
+import requests
+
+from api_response_processor import client, property_unit_lead_summary_generator, response_cache
+from config import constants
+from tools import mock_entrata
+
+
+@pytest.fixture
+def serve(monkeypatch, mocker):
+    """Starts a mock server with the given FaultProfile and points client at it."""
+    servers = []
+    mocker.patch.object(client.helpers, "get_headers", return_value={"X-Api-Key": "dev"})
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+    monkeypatch.setattr(constants, "HTTP_BACKOFF_BASE_SECONDS", 0.001)
+
+    def start(profile):
+        server = mock_entrata.make_server(profile)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setattr(constants, "REPORT_ENDPOINT", f"{server.base_url}/reports")
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _box_score_body(property_ids):
+    body = copy.deepcopy(constants.GET_BOX_SCORE_DATA)
+    body["method"]["params"]["filters"]["property_group_ids"] = property_ids
+    return body
+
+
+def test_post_report_parses_mock_box_score(serve):
+    serve(mock_entrata.FaultProfile(api_key="dev"))
+    response = client.post_report(_box_score_body([100082999]), "box score")
+    ps, _, _ = property_unit_lead_summary_generator.parse_box_score(response)
+    assert ps.total_units > 0
+    # deterministic: the same request against a fresh server answers the same data
+    again = mock_entrata.report_response(_box_score_body([100082999]), mock_entrata.FaultProfile())
+    assert again["response"]["result"] == response["response"]["result"]
+
+
+def test_injected_429s_and_errors(serve):
+    server = serve(mock_entrata.FaultProfile(throttle_rate=1.0, retry_after=7))
+    response = requests.post(f"{server.base_url}/reports", json=_box_score_body([1]))
+    assert response.status_code == 429 and response.headers["Retry-After"] == "7"
+
+    server.profile = mock_entrata.FaultProfile(error_rate=1.0)
+    assert requests.post(f"{server.base_url}/reports", json=_box_score_body([1])).status_code in (500, 502, 503)
+    body = _box_score_body([1])
+    body["method"]["params"]["reportName"] = "unknown"
+    server.profile = mock_entrata.FaultProfile()
+    assert requests.post(f"{server.base_url}/reports", json=body).status_code == 400
+    assert server.counts[429] == 1 and server.counts[400] == 1
+
+
+def test_slow_drip_body_arrives_complete(serve):
+    server = serve(mock_entrata.FaultProfile(drip_rate=1.0, drip_bytes_per_second=1_000_000))
+    response = requests.post(f"{server.base_url}/reports", json=_box_score_body(list(range(1, 40))))
+    assert response.status_code == 200 and len(response.json()["response"]["result"][0]["reportData"]["availability"]) == 39
@@ -0,0 +1,70 @@
+from api_response_processor import client, portfolio, property_unit_lead_summary_generator
+
+
+def _response(report_data):
+    return {"response": {"result": [{"reportData": report_data}]}}
+
+def test_split_by_property_handles_sectioned_and_row_reports():
+    box_score = _response({
+        "availability": [{"property_id": 1, "total_units": 10}, {"property_id": 2, "total_units": 20}],
+        "property_pulse": [{"property_id": "2", "move_ins": 3}],
+    })
+    split = portfolio.split_by_property(box_score, [1, 2])
+    assert property_unit_lead_summary_generator.build_property_summary(split[1]).total_units == 10
+    assert split[1]["response"]["result"][0]["reportData"]["property_pulse"] == []
+    assert property_unit_lead_summary_generator.build_unit_summary(split[2]).count_of_total_move_ins == 3
+
+    rows = _response([{"property_id": 1, "thirty_days": 5}, {"property_id": 1, "thirty_days": 6},
+                      {"property_id": 3, "thirty_days": 7}])
+    split = portfolio.split_by_property(rows, [1, 3])
+    assert len(split[1]["response"]["result"][0]["reportData"]) == 2
+    assert len(split[3]["response"]["result"][0]["reportData"]) == 1
+
+def test_fetch_split_halves_batches_that_fail(monkeypatch):
+    monkeypatch.setattr(client, "last_failure", lambda: client.TIMEOUT)
+    calls = []
+
+    def fetch_batch(ids):
+        calls.append(list(ids))
+        if len(ids) > 2:
+            return None
+        return _response([{"property_id": p, "v": p} for p in ids])
+
+    split = portfolio.fetch_split(fetch_batch, [1, 2, 3, 4, 5])
+    assert sorted(split) == [1, 2, 3, 4, 5]
+    assert split[5]["response"]["result"][0]["reportData"] == [{"property_id": 5, "v": 5}]
+    assert calls[0] == [1, 2, 3, 4, 5]
+
+def test_fetch_split_reports_properties_that_still_failed(monkeypatch):
+    monkeypatch.setattr(client, "last_failure", lambda: 504)
+    failed = set()
+    split = portfolio.fetch_split(lambda ids: None if 3 in ids else _response([]), [1, 2, 3, 4], failed=failed)
+    assert sorted(split) == [1, 2, 3, 4] and failed == {3}
+
+def test_fetch_split_does_not_halve_failures_unrelated_to_size(monkeypatch):
+    monkeypatch.setattr(client, "last_failure", lambda: 401)
+    calls, failed = [], set()
+    split = portfolio.fetch_split(lambda ids: calls.append(ids), [1, 2, 3, 4], failed=failed)
+    assert calls == [[1, 2, 3, 4]]
+    assert sorted(split) == [1, 2, 3, 4] and failed == {1, 2, 3, 4}
+
+def test_chunk_property_ids():
+    assert portfolio.chunk_property_ids([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+
+def test_fetch_portfolio_models_returns_models_per_property():
+    models = portfolio.fetch_portfolio_models([11, 12, 13], batch_size=2)
+    assert list(models) == [11, 12, 13]
+    ps, us, rr, rent, dq, leads = models[12]
+    assert next(iter(ps.values())).total_units == 95
+    assert rr.renewals == 9
+    assert rent.last_month_total_rent_collected == 118500
+    assert dq.current_month_delinquency == 1550.5
+    assert leads.current_week_new_leads_count == 42
+
+def test_split_delinquency_by_property_uses_subtotals():
+    rows = _response([{"property_id": 1, "thirty_days": 5}, {"property_id": "1", "thirty_days": 6},
+                      {"property_id": 3, "sixty_days": 7}])
+    split = portfolio.split_delinquency_by_property(rows, [1, 2, 3])
+    assert split[1].current_month_delinquency == 11
+    assert split[2].current_month_delinquency == 0
+    assert split[3].last_month_delinquency == 7
@@ -0,0 +1,45 @@
+import math
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+from api_response_processor import fetch_engine, helpers, last_good, response_cache
+from config import constants
+from tools import prefetch_scheduler
+
+TZ = helpers.REPORT_TIMEZONE
+WARM_AT, UNTIL, INTERVAL = time(7, 0), time(19, 0), timedelta(minutes=30)
+
+
+def _at(day, hour, minute=0):
+    return datetime(2025, 11, day, hour, minute, tzinfo=TZ)
+
+def test_next_run_at_warms_before_business_hours_then_every_interval():
+    assert prefetch_scheduler.next_run_at(_at(5, 3), WARM_AT, UNTIL, INTERVAL, None) == _at(5, 7)
+    assert prefetch_scheduler.next_run_at(_at(5, 9), WARM_AT, UNTIL, INTERVAL, _at(4, 18, 45)) == _at(5, 9)
+    assert prefetch_scheduler.next_run_at(_at(5, 7, 10), WARM_AT, UNTIL, INTERVAL, _at(5, 7)) == _at(5, 7, 30)
+    assert prefetch_scheduler.next_run_at(_at(5, 18, 50), WARM_AT, UNTIL, INTERVAL, _at(5, 18, 45)) == _at(6, 7)
+
+def test_warm_fills_the_shared_last_good_store_with_every_report(monkeypatch, tmp_path):
+    monkeypatch.setattr(constants, "LAST_GOOD_DIR", str(tmp_path))
+    monkeypatch.setattr(last_good, "_store", last_good.LastGoodStore(str(tmp_path)))
+    assert prefetch_scheduler.warm([1, 2, 3], max_properties=2) == {1: True, 2: True, 3: True}
+    reader = last_good.LastGoodStore(str(tmp_path))
+    assert all(reader.get(pid, report) is not None for pid in (1, 2, 3) for report in fetch_engine.REPORTS)
+
+def test_refresh_open_periods_only_misses_open_entries_inside_the_block():
+    cache = response_cache.ResponseCache(max_bytes=10_000, cache_dir=None)
+    cache.set("open", {"v": 1}, ttl_seconds=60)
+    cache.set("closed", {"v": 2}, ttl_seconds=math.inf)
+    with response_cache.refresh_open_periods():
+        assert cache.get("open") is None
+        assert cache.get("closed") == {"v": 2}
+        # another thread (a dashboard session) still reads the open entry
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(cache.get, "open").result() == {"v": 1}
+    assert cache.get("open") == {"v": 1}
+
+def test_scheduler_does_not_import_streamlit():
+    code = "import sys, tools.prefetch_scheduler; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
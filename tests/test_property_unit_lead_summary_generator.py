@@ -0,0 +1,23 @@
+import math
+
+from api_response_processor import property_unit_lead_summary_generator as generator
+
+
+def test_property_summary_keeps_percentages_as_fractions():
+    ps = generator.build_property_summary(generator.get_fake_box_api_response())
+    assert ps.occupied_units_percentage == 0.7826
+    assert ps.total_units == 95 and ps.evictions_and_skips_occurred == 3
+
+def test_missing_and_non_numeric_values_become_nan():
+    response = {"response": {"result": [{"reportData": {
+        "availability": [{"total_units": "", "occupied_units": "n/a", "percent_leased": None}],
+    }}]}}
+    ps = generator.build_property_summary(response)
+    us = generator.build_unit_summary(response)
+    assert math.isnan(ps.total_units) and math.isnan(ps.leased_units_percentage)
+    assert math.isnan(us.count_of_occupied_units) and math.isnan(us.count_of_total_move_ins)
+    assert ps.evictions_and_skips_occurred == 0
+
+def test_summaries_are_slotted():
+    ps = generator.build_property_summary(generator.get_fake_box_api_response())
+    assert not hasattr(ps, "__dict__")
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from api_response_processor import rate_limiter
+from api_response_processor.rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter
+
+
+def test_burst_is_immediate_then_requests_are_paced():
+    limiter = RateLimiter(rate=50, burst=2)
+    assert limiter.acquire() < 0.005 and limiter.acquire() < 0.005
+    assert 0.01 < limiter.acquire() < 0.1
+
+def test_interactive_caller_takes_the_next_token_ahead_of_queued_background():
+    limiter = RateLimiter(rate=10, burst=1)
+    limiter.acquire()
+    order = []
+
+    def take(level, name):
+        limiter.acquire(level)
+        order.append(name)
+
+    threads = [threading.Thread(target=take, args=(BACKGROUND, f"prefetch-{i}")) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.03)
+    threads.append(threading.Thread(target=take, args=(INTERACTIVE, "dashboard")))
+    threads[-1].start()
+    for thread in threads:
+        thread.join()
+    assert order == ["dashboard", "prefetch-0", "prefetch-1"]
+
+def test_429_pauses_background_callers_but_not_interactive_ones():
+    limiter = RateLimiter(rate=1000, burst=5)
+    assert limiter.throttled(retry_after=0.2) == 0.2
+    assert limiter.acquire(INTERACTIVE) < 0.05
+    with rate_limiter.priority(BACKGROUND):
+        assert limiter.acquire() >= 0.15
+
+def test_backoff_doubles_while_429s_keep_coming(monkeypatch):
+    monkeypatch.setattr(rate_limiter.constants, "HTTP_BACKOFF_BASE_SECONDS", 0.5)
+    limiter = RateLimiter(rate=1000, burst=5)
+    assert [limiter.throttled() for _ in range(3)] == [0.5, 1.0, 2.0]
+    limiter.accepted()
+    assert limiter.throttled() == 0.5
+
+def test_raised_request_is_no_longer_held_by_the_background_pause():
+    limiter = RateLimiter(rate=1000, burst=5)
+    limiter.throttled(retry_after=5)
+    request = rate_limiter.RequestPriority(BACKGROUND)
+    waited = []
+    thread = threading.Thread(target=lambda: waited.append(limiter.acquire(request=request)))
+    thread.start()
+    time.sleep(0.03)
+    assert not waited  # paused with the other background callers
+    limiter.raise_priority(request, INTERACTIVE)
+    thread.join(timeout=1)
+    assert waited and waited[0] < 1
@@ -1,3 +1,5 @@
+import math
+
 from freezegun import freeze_time
 from api_response_processor import rent_billed_collected_generator
 
@@ -13,4 +15,35 @@ def test_get_three_months_mm_yyyy():
     date_dict = rent_billed_collected_generator.get_three_months_mm_yyyy()
     assert date_dict["current"] == "12/2025"
     assert date_dict["last"] == "11/2025"
-    assert date_dict["last_to_last"] == "10/2025"
\ No newline at end of file
+    assert date_dict["last_to_last"] == "10/2025"
+
+@freeze_time("2026-02-10 12:00:00")
+def test_get_trailing_months_mm_yyyy_spans_years_oldest_first():
+    assert rent_billed_collected_generator.get_trailing_months_mm_yyyy(4) == \
+        ["11/2025", "12/2025", "01/2026", "02/2026"]
+
+@freeze_time("2026-02-01 03:00:00")  # still January 31st in Chicago
+def test_three_months_and_trend_agree_on_the_current_month():
+    assert rent_billed_collected_generator.get_three_months_mm_yyyy()["current"] == "01/2026"
+    assert rent_billed_collected_generator.get_trailing_months_mm_yyyy(1) == ["01/2026"]
+
+def test_extract_rent_series_reads_every_trailing_column():
+    row = {"amount_due_0": 300, "total_allocations_0": "290.5", "amount_due_2": 100,
+           "total_allocations_2": None, "amount_due_5": 1, "property_id": 7}
+    billed, collected = rent_billed_collected_generator._extract_rent_series(
+        {"response": {"result": [{"reportData": [row]}]}}, 3)
+    assert billed[0] == 300 and billed[2] == 100 and math.isnan(billed[1])
+    assert collected[0] == 290.5 and math.isnan(collected[2])
+
+@freeze_time("2026-02-10 12:00:00")
+def test_rent_trend_is_one_trailing_periods_request(mocker, monkeypatch):
+    monkeypatch.setattr(rent_billed_collected_generator.constants, "USE_FAKE_DATA", False)
+    post = mocker.patch.object(rent_billed_collected_generator.client, "post_report",
+                               return_value=rent_billed_collected_generator.get_fake_comparative_delinquency_trend(24))
+    trend = rent_billed_collected_generator.generate_rent_trend(100082999, 24)
+
+    filters = post.call_args.args[0]["method"]["params"]["filters"]
+    assert post.call_count == 1
+    assert filters["compare_against_trailing_periods"] == "23" and filters["period"]["pm"] == "02/2026"
+    assert len(trend.periods) == len(trend.total_rent_billed) == 24
+    assert trend.periods[-1] == "02/2026" and trend.total_rent_billed[-1] == 125000
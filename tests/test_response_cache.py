@@ -0,0 +1,69 @@
+import copy
+import math
+from datetime import date
+
+from api_response_processor import response_cache
+from config import constants
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _box_score_body(property_ids, end="2025-10-30"):
+    body = copy.deepcopy(constants.GET_BOX_SCORE_DATA)
+    body["method"]["params"]["filters"]["property_group_ids"] = property_ids
+    body["method"]["params"]["filters"]["period"]["daterange-end"] = end
+    return body
+
+def test_cache_key_normalizes_property_ids_and_ignores_auth():
+    a = _box_score_body([2, 1])
+    b = _box_score_body(["1", "2"])
+    b["auth"] = {"type": "basic", "password": "other"}
+    assert response_cache.cache_key(a) == response_cache.cache_key(b)
+    assert response_cache.cache_key(a) != response_cache.cache_key(_box_score_body([1]))
+
+def test_ttl_per_report_and_closed_periods_forever():
+    today = date(2025, 11, 3)
+    open_week = _box_score_body([1], end="2025-11-03")["method"]["params"]
+    closed_week = _box_score_body([1], end="2025-11-01")["method"]["params"]
+    assert response_cache.ttl_for(open_week, today) == constants.RESPONSE_CACHE_TTL_SECONDS["box_score"]
+    assert response_cache.ttl_for(closed_week, today) == math.inf
+
+    delinquency = copy.deepcopy(constants.GET_COMPARATIVE_DELINQUENCY_DATA)["method"]["params"]
+    delinquency["filters"]["period"]["pm"] = "10/2025"
+    assert response_cache.ttl_for(delinquency, today) == math.inf
+    delinquency["filters"]["period"]["pm"] = "11/2025"
+    assert response_cache.ttl_for(delinquency, today) == constants.RESPONSE_CACHE_TTL_SECONDS["comparative_delinquency"]
+
+    retention = constants.GET_RESIDENT_RETENTION["method"]["params"]
+    assert not response_cache.is_closed_period(retention, today)
+
+def test_entries_expire_after_ttl():
+    timer = FakeTimer()
+    cache = response_cache.ResponseCache(max_bytes=10_000, cache_dir=None, timer=timer)
+    cache.set("k", {"v": 1}, ttl_seconds=60)
+    assert cache.get("k") == {"v": 1}
+    timer.now += 61
+    assert cache.get("k") is None
+
+def test_lru_eviction_respects_memory_cap():
+    cache = response_cache.ResponseCache(max_bytes=40, cache_dir=None)
+    cache.set("a", {"v": "x" * 10}, ttl_seconds=60)
+    cache.set("b", {"v": "y" * 10}, ttl_seconds=60)
+    cache.get("a")
+    cache.set("c", {"v": "z" * 10}, ttl_seconds=60)
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+def test_disk_layer_survives_restart(tmp_path):
+    cache = response_cache.ResponseCache(max_bytes=10_000, cache_dir=str(tmp_path))
+    cache.set("closed", {"v": 1}, ttl_seconds=math.inf)
+    cache.set("expired", {"v": 2}, ttl_seconds=0.000001)
+
+    restarted = response_cache.ResponseCache(max_bytes=10_000, cache_dir=str(tmp_path))
+    assert restarted.get("closed") == {"v": 1}
+    assert restarted.get("expired") is None
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import requests
+
+from api_response_processor import client, response_cache, single_flight
+from config import constants
+
+
+def _run_together(count, target):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target())) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_identical_calls_share_one_run():
+    group = single_flight.SingleFlight()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        time.sleep(0.2)
+        return {"ok": 1}
+
+    results = _run_together(10, lambda: group.do("box_score:1", slow, label="box_score"))
+    assert len(runs) == 1
+    assert all(result == {"ok": 1} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * 9
+    assert group.stats()["box_score"] == {"calls": 1, "coalesced": 9}
+
+    group.do("box_score:1", slow, label="box_score")  # not in flight any more: runs again
+    assert len(runs) == 2
+
+def test_waiters_receive_the_leaders_exception():
+    group = single_flight.SingleFlight()
+
+    def boom():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    def call():
+        try:
+            group.do("k", boom)
+        except RuntimeError as e:
+            return str(e)
+
+    assert _run_together(4, call) == ["upstream down"] * 4
+
+def test_post_report_coalesces_concurrent_sessions(mocker, monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+    monkeypatch.setattr(single_flight, "_group", single_flight.SingleFlight())
+    mocker.patch.object(client.helpers, "get_headers", return_value={})
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"response": {"result": [{"reportData": []}]}}'
+
+    def slow_post(*args, **kwargs):
+        time.sleep(0.2)
+        return response
+
+    post = mocker.patch.object(client.get_session(), "post", side_effect=slow_post)
+    results = _run_together(8, lambda: client.post_report(constants.GET_RESIDENT_RETENTION, "resident retention"))
+    assert post.call_count == 1
+    assert all(result == {"response": {"result": [{"reportData": []}]}} for result in results)
+    assert single_flight.get_group().stats()["total"] == {"calls": 1, "coalesced": 7}
@@ -0,0 +1,46 @@
+import pytest
+from freezegun import freeze_time
+
+from api_response_processor import (data_classes,
+                                    fetch_engine,
+                                    property_unit_lead_summary_generator,
+                                    rent_billed_collected_generator,
+                                    snapshot_store)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = snapshot_store.open_snapshot_store("sqlite:///:memory:")
+    monkeypatch.setattr(snapshot_store, "_store", store)
+    yield store
+    store.close()
+
+def test_round_trips_dataclasses_and_dicts(store):
+    summary = data_classes.ResidentRetentionSummaryForCurrentMonth(expiring_leases=12, renewals=9)
+    store.put(100082999, "resident_retention", "10/2025", summary)
+    store.put(100082999, "rent_billed_collected", "09/2025", {"billed": 1, "collected": 2})
+    store.put(100082999, "rent_billed_collected", "09/2025", {"billed": 3, "collected": 4})
+
+    assert store.get("100082999", "resident_retention", "10/2025") == summary
+    assert store.get_many(100082999, "rent_billed_collected", ["09/2025", "08/2025"]) == {
+        "09/2025": {"billed": 3, "collected": 4}}
+    assert store.get(1, "resident_retention", "10/2025") is None
+
+def test_open_snapshot_store_rejects_unknown_urls():
+    with pytest.raises(ValueError):
+        snapshot_store.open_snapshot_store("mysql://nope")
+
+@freeze_time("2025-11-05 12:00:00")
+def test_closed_periods_are_fetched_once(store, mocker):
+    box_score = mocker.spy(property_unit_lead_summary_generator, "fetch_box_score")
+    delinquency = mocker.spy(rent_billed_collected_generator, "fetch_comparative_delinquency")
+
+    first = fetch_engine.fetch_property_models(100082999)
+    assert box_score.call_count == 3 and delinquency.call_count == 3
+
+    second = fetch_engine.fetch_property_models(100082999)
+    assert box_score.call_count == 4 and delinquency.call_count == 4
+    # only the open week (ending today) and the current month went upstream again
+    assert box_score.call_args.args[2] == "2025-11-05"
+    assert delinquency.call_args.args[1] == "11/2025"
+    assert second == first
@@ -0,0 +1,39 @@
+import math
+
+import pandas as pd
+
+import app
+from api_response_processor import fetch_engine, summary_tables
+
+
+def _tables(*property_ids):
+    models = {pid: fetch_engine.fetch_property_models(pid) for pid in property_ids}
+    return models, summary_tables.from_models(models)
+
+def test_one_row_per_property_and_period():
+    models, tables = _tables(1, 2)
+    assert tables.property_summary.num_rows == 6 and tables.retention.num_rows == 2
+    rent = tables.rent.to_pydict()
+    assert rent["property_id"] == ["1", "1", "1", "2", "2", "2"]
+    assert rent["period"][:3] == [models[1][3].current_month_date, models[1][3].last_month_date,
+                                  models[1][3].month_before_last_date]
+    assert tables.delinquency.to_pydict()["delinquency"][:3] == [1550.5, 1000.75, 499.75]
+    assert tables.leads.to_pydict()["period"][:3] == list(summary_tables.WEEKS)
+
+def test_nan_becomes_null_and_views_are_arrow_backed():
+    models, _ = _tables(1)
+    models[1][2].renewals = math.nan
+    tables = summary_tables.from_models(models)
+    assert tables.retention["renewals"].null_count == 1
+
+    view = summary_tables.to_pandas(tables.retention, 1)
+    assert isinstance(view["renewals"].dtype, pd.ArrowDtype)
+    assert app.k(view.iloc[0]["renewals"]) == "—"
+    assert summary_tables.to_pandas(tables.retention, 2).empty
+
+def test_frames_reshape_every_property_at_once():
+    _, tables = _tables(1, 2)
+    leads = app.build_leads_frame(summary_tables.to_pandas(tables.leads))
+    assert len(leads) == 2 * 3 * len(app.LEADS_STAGES)
+    rent = app.build_rent_frame(summary_tables.to_pandas(tables.rent, 2))
+    assert set(rent["property_id"]) == {"2"} and set(rent["Type"]) == {"Billed", "Collected"}
@@ -0,0 +1,19 @@
+from api_response_processor import delinquency_generator, portfolio, property_unit_lead_summary_generator
+from tools import synthetic_payloads
+
+
+def test_payloads_are_deterministic():
+    ids = synthetic_payloads.property_ids(5)
+    assert synthetic_payloads.box_score_response(ids, seed=3) == synthetic_payloads.box_score_response(ids, seed=3)
+    assert synthetic_payloads.box_score_response(ids, seed=3) != synthetic_payloads.box_score_response(ids, seed=4)
+
+def test_payloads_parse_per_property():
+    ids = synthetic_payloads.property_ids(3)
+    split = portfolio.split_by_property(synthetic_payloads.box_score_response(ids), ids)
+    summary = property_unit_lead_summary_generator.build_property_summary(split[ids[1]])
+    assert summary.total_units >= summary.total_rentable_units
+
+    receivables = synthetic_payloads.aged_receivables_response(ids, lease_rows=300)
+    assert len(receivables["response"]["result"][0]["reportData"]) == 300
+    _, by_property = delinquency_generator.aggregate_delinquency_buckets(receivables)
+    assert sorted(by_property) == [str(pid) for pid in ids]
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+import requests
+
+from api_response_processor import client, fetch_engine, response_cache, tracing
+from config import constants
+
+
+@pytest.fixture
+def trace():
+    token = tracing._current.set(None)
+    yield tracing.start_trace("test")
+    tracing._current.reset(token)
+
+@tracing.traced("parse")
+def _parse(value):
+    return value * 2
+
+def test_span_is_a_noop_without_a_trace():
+    with tracing.span("anything", "fetch") as attrs:
+        attrs["rows"] = 1
+    assert _parse(2) == 4
+    assert tracing.current_trace() is None
+
+def test_spans_from_fetch_all_workers_join_the_callers_trace(trace):
+    fetch_engine.fetch_all({i: (_parse, (i,)) for i in range(4)}, max_workers=4)
+    assert [s.name for s in trace.spans] == ["_parse"] * 4
+    assert all(s.stage == "parse" and s.thread.startswith("report-fetch") for s in trace.spans)
+
+def test_to_jsonl_writes_one_ordered_record_per_span(trace, tmp_path):
+    with tracing.span("outer", "render"):
+        with tracing.span("inner", "parse", rows=3):
+            pass
+    path = tmp_path / "trace.jsonl"
+    tracing.export_jsonl(trace, str(path))
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["name"] for r in records] == ["outer", "inner"]
+    assert records[1]["attrs"] == {"rows": 3}
+    assert {r["trace_id"] for r in records} == {trace.trace_id}
+
+def test_post_report_span_records_cache_hit_and_miss(trace, mocker, monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(cache_dir=None))
+    mocker.patch.object(client.helpers, "get_headers", return_value={})
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps({"response": {"result": [{"reportData": [{"a": 1}]}]}}).encode()
+    mocker.patch.object(client.get_session(), "post", return_value=response)
+
+    client.post_report(constants.GET_RESIDENT_RETENTION, "resident retention")
+    client.post_report(constants.GET_RESIDENT_RETENTION, "resident retention")
+    miss, hit = trace.spans
+    assert (miss.stage, miss.attrs["cache"], miss.attrs["rows"], miss.attrs["status"]) == ("http", "miss", 1, 200)
+    assert (hit.attrs["cache"], hit.attrs["rows"]) == ("hit", 1)
@@ -0,0 +1,75 @@
+import math
+
+from api_response_processor import helpers, snapshot_store
+from tools import weekly_digest
+
+WEEK_DATES = helpers.get_week_boundaries_fridays()  # the fake models are keyed by this week's dates
+
+
+def _models(occupied: float, leads: float) -> tuple:
+    from api_response_processor import fetch_engine
+
+    models = fetch_engine.fetch_property_models(100082999)
+    week = WEEK_DATES["saturday_before_last_friday"] + "-" + WEEK_DATES["last_friday"]
+    models[0][week].occupied_units_percentage = occupied
+    models[5].last_week_new_leads_count = leads
+    return models
+
+
+def test_changed_kpis_thresholds():
+    previous = {"occupied_units_percentage": 0.90, "new_leads": 20.0, "tours": 0.0, "lease_approved": float("nan")}
+    unchanged = {"occupied_units_percentage": 0.904, "new_leads": 20.9, "tours": 0.0, "lease_approved": 3.0}
+    assert weekly_digest.changed_kpis(previous, unchanged) == []
+
+    changed = {"occupied_units_percentage": 0.895, "new_leads": 21.0, "tours": 2.0, "lease_approved": 3.0}
+    assert [c.kpi for c in weekly_digest.changed_kpis(previous, changed)] == [
+        "occupied_units_percentage", "new_leads", "tours"]
+
+
+def test_digest_sends_only_changes_once(monkeypatch, tmp_path):
+    store = snapshot_store.SQLiteSnapshotStore(":memory:")
+    recipients = {"a@example.com": [1, 2], "b@example.com": [2]}
+    models = {1: _models(0.90, 20.0), 2: _models(0.90, 20.0)}
+    monkeypatch.setattr(weekly_digest.portfolio, "fetch_models", lambda ids, batch_size=None, incomplete=None: models)
+
+    transport = weekly_digest.StubTransport()
+    first = weekly_digest.run_digest(recipients, store, transport, WEEK_DATES)
+    assert (first.baselines, first.changed, transport.sent) == (2, 0, [])  # nothing to diff against yet
+
+    # a week later, property 1 lost occupancy and property 2 did not change
+    previous_week = WEEK_DATES["last_to_last_friday"]
+    store.put(1, weekly_digest.SNAPSHOT_REPORT, previous_week, weekly_digest.week_kpis(_models(0.95, 20.0), WEEK_DATES))
+    store.put(2, weekly_digest.SNAPSHOT_REPORT, previous_week, weekly_digest.week_kpis(models[2], WEEK_DATES))
+    transport = weekly_digest.StubTransport(outbox=str(tmp_path))
+    second = weekly_digest.run_digest(recipients, store, transport, WEEK_DATES)
+
+    assert (second.changed, second.sent) == (1, ["a@example.com"])
+    [message] = transport.sent
+    assert message.property_ids == [1]
+    assert "95.00 % -> 90.00 % (▼ 5.00 pts)" in message.text
+    assert len(list(tmp_path.iterdir())) == 1
+
+    rerun = weekly_digest.run_digest(recipients, store, weekly_digest.StubTransport(), WEEK_DATES)
+    assert (rerun.sent, rerun.already_sent) == ([], ["a@example.com"])
+    stored = store.get(1, weekly_digest.SNAPSHOT_REPORT, WEEK_DATES["last_friday"])
+    assert math.isclose(stored["occupied_units_percentage"], 0.90)
+
+
+def test_current_month_figures_and_failed_fetches_send_nothing(monkeypatch):
+    store = snapshot_store.SQLiteSnapshotStore(":memory:")
+    last_week = _models(0.90, 20.0)
+    store.put(1, weekly_digest.SNAPSHOT_REPORT, WEEK_DATES["last_to_last_friday"],
+              weekly_digest.week_kpis(last_week, WEEK_DATES))
+    last_week[3].current_month_total_rent_collected *= 2  # collections keep growing through the month
+    last_week[4].current_month_delinquency /= 2
+    last_week[2].renewals += 10  # so do the current month's renewals
+
+    def fetch_models(ids, batch_size=None, incomplete=None):
+        incomplete.add(2)
+        return {1: last_week, 2: _models(float("nan"), float("nan"))}
+
+    monkeypatch.setattr(weekly_digest.portfolio, "fetch_models", fetch_models)
+    result = weekly_digest.run_digest({"a@example.com": [1, 2]}, store, weekly_digest.StubTransport(), WEEK_DATES)
+
+    assert (result.changed, result.sent, result.incomplete) == (0, [], [2])
+    assert store.get(2, weekly_digest.SNAPSHOT_REPORT, WEEK_DATES["last_friday"]) is None
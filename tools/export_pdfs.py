@@ -0,0 +1,250 @@
+"""
+Weekly PDF report per property for the whole portfolio, without Streamlit:
+
+    USE_FAKE_DATA=0 python -m tools.export_pdfs
+    python -m tools.export_pdfs --properties 100082999,100083000 --processes 4 --output-dir /tmp/week
+
+Models come from the generator modules, one portfolio batch
+(PORTFOLIO_BATCH_SIZE properties) at a time. Each property's PDF (KPIs, rent
+billed vs collected, delinquency, leads and retention) is drawn by a process
+pool while the next batch is fetched; its charts are drawn once, as vector
+graphics, straight into the PDF.
+
+A PDF is written to a temporary file and renamed when complete, into a
+directory per report week (PDF_EXPORT_DIR/<last Friday>). Rerunning after a
+crash skips the properties whose PDF exists; with RESPONSE_CACHE_DIR set the
+batches fetched before the crash come from the cache.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Callable, Hashable, Optional
+
+from fpdf import FPDF
+
+from api_response_processor import formatting, helpers, portfolio, summary_tables
+from api_response_processor.formatting import DELINQUENCY_LABELS, LEADS_STAGES, LEADS_WEEK_LABELS, is_missing
+from config import constants
+
+ACCENT = (15, 152, 143)  # teal, as the dashboard
+PALETTE = (ACCENT, (71, 85, 105), (217, 119, 6), (190, 18, 60))
+CARD = (223, 238, 234)
+MUTED = (75, 85, 99)
+
+
+# =========================
+# FORMATTING (the dashboard's, but the core PDF fonts have no em dash)
+# =========================
+def k(value, currency=False) -> str:
+    return formatting.k(value, currency, missing="-")
+
+def pct(value) -> str:
+    return formatting.pct(value, missing="-")
+
+
+# =========================
+# DRAWING
+# =========================
+def _kpi_row(pdf: FPDF, cards: list[tuple[str, str]], y: float) -> float:
+    """One row of KPI cards across the page; returns the y below it."""
+    gap, height = 3.0, 17.0
+    width = (pdf.epw - gap * (len(cards) - 1)) / len(cards)
+    for i, (label, value) in enumerate(cards):
+        x = pdf.l_margin + i * (width + gap)
+        pdf.set_fill_color(*CARD)
+        pdf.rect(x, y, width, height, style="F", round_corners=True, corner_radius=2.5)
+        pdf.set_xy(x + 2, y + 2)
+        pdf.set_font("helvetica", size=7)
+        pdf.set_text_color(*MUTED)
+        pdf.cell(width - 4, 4, label)
+        pdf.set_xy(x + 2, y + 7.5)
+        pdf.set_font("helvetica", "B", 12)
+        pdf.set_text_color(0, 0, 0)
+        pdf.cell(width - 4, 7, value)
+    return y + height + 5
+
+
+def _bar_chart(pdf: FPDF, x: float, y: float, w: float, h: float, title: str,
+               categories: list[str], series: dict[str, list[float]], label: Callable[[float], str]) -> None:
+    """Grouped bar chart: one group per category, one bar per series, a value label on each bar."""
+    pdf.set_font("helvetica", "B", 10)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_xy(x, y)
+    pdf.cell(w, 5, title)
+    legend_y, axis_y = y + 7, y + h - 6
+    top = legend_y + 8
+    values = [v for vs in series.values() for v in vs if not is_missing(v)]
+    scale = (axis_y - top) / max(max(values, default=0), 1e-9)
+
+    pdf.set_font("helvetica", size=6.5)
+    legend_x = x
+    for (name, _), color in zip(series.items(), PALETTE):
+        pdf.set_fill_color(*color)
+        pdf.rect(legend_x, legend_y + 0.8, 2.5, 2.5, style="F")
+        pdf.set_xy(legend_x + 3.5, legend_y)
+        pdf.set_text_color(*MUTED)
+        pdf.cell(pdf.get_string_width(name) + 1, 4, name)
+        legend_x += pdf.get_string_width(name) + 8
+
+    group_w = w / max(1, len(categories))
+    bar_w = group_w * 0.8 / max(1, len(series))
+    for c, category in enumerate(categories):
+        group_x = x + c * group_w + group_w * 0.1
+        for s, ((_, vs), color) in enumerate(zip(series.items(), PALETTE)):
+            value = vs[c]
+            bar_x = group_x + s * bar_w
+            if not is_missing(value) and value > 0:
+                bar_h = value * scale
+                pdf.set_fill_color(*color)
+                pdf.rect(bar_x + 0.4, axis_y - bar_h, bar_w - 0.8, bar_h, style="F")
+            pdf.set_xy(bar_x, axis_y - (0 if is_missing(value) else max(value, 0) * scale) - 4)
+            pdf.set_text_color(0, 0, 0)
+            pdf.cell(bar_w, 4, label(value), align="C")
+        pdf.set_xy(x + c * group_w, axis_y + 1)
+        pdf.set_text_color(*MUTED)
+        pdf.cell(group_w, 4, category, align="C")
+    pdf.set_draw_color(180, 180, 180)
+    pdf.line(x, axis_y, x + w, axis_y)
+
+
+def build_pdf(property_id: Hashable, tables: summary_tables.SummaryTables, generated_at: str) -> FPDF:
+    """The weekly report of one property from its summary tables."""
+    ps = summary_tables.to_pandas(tables.property_summary)
+    us = summary_tables.to_pandas(tables.units_summary)
+    leads = summary_tables.to_pandas(tables.leads)
+    rent = summary_tables.to_pandas(tables.rent).iloc[::-1]  # oldest month first
+    delinquency = summary_tables.to_pandas(tables.delinquency)
+    retention = summary_tables.to_pandas(tables.retention)
+    latest_ps, latest_us = ps.iloc[0], us.iloc[0]
+    rr = retention.iloc[0]
+
+    pdf = FPDF(format="A4")
+    pdf.set_auto_page_break(False)
+    pdf.set_title(f"Property {property_id} weekly report")
+    pdf.add_page()
+    pdf.set_font("helvetica", "B", 16)
+    pdf.cell(pdf.epw, 9, f"Property {property_id} - weekly report", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("helvetica", size=8)
+    pdf.set_text_color(*MUTED)
+    week = f"Week {leads['start_date'].iloc[0]} to {leads['end_date'].iloc[0]}"
+    pdf.cell(pdf.epw, 5, f"{week} - generated {generated_at}", new_x="LMARGIN", new_y="NEXT")
+
+    y = _kpi_row(pdf, [
+        ("Total Units", k(latest_ps["total_units"])),
+        ("Rentable Units", k(latest_ps["total_rentable_units"])),
+        ("Excluded Units", k(latest_ps["excluded_units"])),
+        ("Occupied %", pct(latest_ps["occupied_units_percentage"])),
+        ("Leased %", pct(latest_ps["leased_units_percentage"])),
+        ("Trend %", pct(latest_ps["trend_percentage"])),
+        ("Evictions/Skips", k(latest_ps["evictions_and_skips_occurred"])),
+    ], pdf.get_y() + 4)
+    y = _kpi_row(pdf, [
+        ("Occupied Units", k(latest_us["count_of_occupied_units"])),
+        ("Vacant Units", k(latest_us["count_of_vacant_units"])),
+        ("Move-ins", k(latest_us["count_of_total_move_ins"])),
+        ("Move-outs", k(latest_us["count_of_total_move_out"])),
+        ("Expiring Leases", k(rr["expiring_leases"])),
+        ("Renewals", k(rr["renewals"])),
+    ], y)
+
+    half = (pdf.epw - 8) / 2
+    _bar_chart(pdf, pdf.l_margin, y, half, 70, "Rent billed vs collected",
+               [str(p) for p in rent["period"]],
+               {"Billed": list(rent["billed"]), "Collected": list(rent["collected"])},
+               lambda v: k(v, currency=True))
+    _bar_chart(pdf, pdf.l_margin + half + 8, y, half, 70, "Delinquency",
+               [DELINQUENCY_LABELS.get(p, p) for p in delinquency["period"]],
+               {"Delinquency": list(delinquency["delinquency"])},
+               lambda v: k(v, currency=True))
+    _bar_chart(pdf, pdf.l_margin, y + 80, pdf.epw, 80, "Leads & Applications (3 weeks)",
+               [f"{LEADS_WEEK_LABELS.get(p, p)} ({s} to {e})"
+                for p, s, e in zip(leads["period"], leads["start_date"], leads["end_date"])],
+               {label: list(leads[column]) for column, label in LEADS_STAGES.items()},
+               k)
+    return pdf
+
+
+def render_property_pdf(property_id: Hashable, models: tuple, path: str, generated_at: str) -> str:
+    """Process pool task: writes the property's PDF to path (via a temporary file) and returns path."""
+    tables = summary_tables.from_models({property_id: models})
+    build_pdf(property_id, tables, generated_at).output(path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# =========================
+# EXPORT
+# =========================
+def pdf_path(output_dir: str, property_id: Hashable) -> str:
+    return os.path.join(output_dir, f"{property_id}.pdf")
+
+
+def export(property_ids: list, output_dir: str, processes: Optional[int] = None,
+           batch_size: Optional[int] = None, force: bool = False) -> dict[Hashable, Optional[str]]:
+    """
+    Writes a PDF per property into output_dir and returns {property_id: path},
+    None for the properties whose PDF failed. A property with a failed report
+    request gets no PDF (and None), so the next run fetches it again instead of
+    skipping a PDF of missing values. Properties with a PDF already there are
+    skipped (and returned) unless force.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    done = {pid: pdf_path(output_dir, pid) for pid in property_ids
+            if not force and os.path.exists(pdf_path(output_dir, pid))}
+    pending = [pid for pid in dict.fromkeys(property_ids) if pid not in done]
+    if done:
+        print(f"Resuming: {len(done)} PDFs already in {output_dir}, {len(pending)} to go")
+    generated_at = datetime.now(helpers.REPORT_TIMEZONE).strftime("%Y-%m-%d %H:%M %Z")
+
+    results: dict[Hashable, Optional[str]] = dict(done)
+    # spawn: the fetch threads (and their locks) of this process must not be forked into the workers
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), mp_context=get_context("spawn")) as pool:
+        futures = {}
+        for chunk in portfolio.chunk_property_ids(pending, batch_size):
+            incomplete: set = set()
+            models = portfolio.fetch_models(chunk, incomplete=incomplete)
+            for pid in chunk:
+                if pid in incomplete:
+                    print(f'Error fetching the reports of {pid}: not rendering its PDF')
+                    results[pid] = None
+                    continue
+                futures[pool.submit(render_property_pdf, pid, models[pid], pdf_path(output_dir, pid),
+                                    generated_at)] = pid
+        for future in as_completed(futures):
+            pid = futures[future]
+            try:
+                results[pid] = future.result()
+            except Exception as e:
+                print(f'Error rendering the PDF of {pid}:', e)
+                results[pid] = None
+    return results
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--properties", default=",".join(str(p) for p in constants.PROPERTY_IDS),
+                        help="comma separated property ids (default: PROPERTY_IDS)")
+    parser.add_argument("--output-dir", help="default: PDF_EXPORT_DIR/<last Friday>")
+    parser.add_argument("--processes", type=int, help="PDF rendering processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=constants.PORTFOLIO_BATCH_SIZE,
+                        help="properties fetched per portfolio request")
+    parser.add_argument("--force", action="store_true", help="re-render PDFs that already exist")
+    args = parser.parse_args(argv)
+
+    output_dir = args.output_dir or os.path.join(constants.PDF_EXPORT_DIR,
+                                                 helpers.get_week_boundaries_fridays()["last_friday"])
+    if not constants.USE_FAKE_DATA and not constants.RESPONSE_CACHE_DIR:
+        print("RESPONSE_CACHE_DIR is not set: a resumed export fetches its remaining batches again.")
+    started = time.monotonic()
+    results = export([int(p) for p in args.properties.split(",") if p.strip()], output_dir,
+                     args.processes, args.batch_size, args.force)
+    failed = [pid for pid, path in results.items() if path is None]
+    print(f"Exported {len(results) - len(failed)}/{len(results)} PDFs to {output_dir} "
+          f"in {time.monotonic() - started:.1f}s" + (f", failed: {failed}" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Local stand-in for the Entrata reports endpoint, for load testing the fetch
+layer without the real API. Answers getReportData for box_score,
+comparative_delinquency, resident_aged_receivables and resident_retention
+with tools.synthetic_payloads data, deterministic per (report, property ids,
+period), and injects latency, 5xx errors, 429s and slow-drip bodies:
+
+    python -m tools.mock_entrata --port 8765 --latency-ms 300 --latency-sigma 0.6 \\
+        --error-rate 0.02 --throttle-rate 0.05 --drip-rate 0.1
+    BASE_URL=http://127.0.0.1:8765 USE_FAKE_DATA=0 ENTRATA_API_KEY=dev streamlit run app.py
+"""
+import argparse
+import json
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+from tools import synthetic_payloads
+
+DRIP_CHUNK_BYTES = 1024
+
+
+@dataclass(slots=True)
+class FaultProfile:
+    latency_ms: float = 0.0       # median response latency
+    latency_sigma: float = 0.0    # lognormal shape of the latency; 0 = always latency_ms
+    error_rate: float = 0.0       # fraction answered 500/502/503
+    throttle_rate: float = 0.0    # fraction answered 429
+    retry_after: Optional[float] = 1.0  # Retry-After of the 429s; None sends none
+    drip_rate: float = 0.0        # fraction of 200 bodies sent slowly
+    drip_bytes_per_second: float = 16384.0
+    lease_rows_per_property: int = 40  # resident_aged_receivables rows per property
+    seed: int = 0                 # data and fault sequence seed
+    api_key: Optional[str] = None  # required X-Api-Key; None accepts any
+
+
+def _filters(body: dict) -> dict:
+    return body["method"]["params"].get("filters") or {}
+
+
+def _period_label(filters: dict) -> str:
+    """The requested period as a string: a date range, a post month, or the period type."""
+    period = filters.get("period") or {}
+    if period.get("period_type") == "daterange":
+        return f"{period.get('daterange-start')}..{period.get('daterange-end')}"
+    return str(period.get("pm") or period.get("period_type") or "")
+
+
+def _property_ids(filters: dict) -> list:
+    return list(filters.get("property_group_ids") or [])
+
+
+def _box_score(filters: dict, profile: FaultProfile) -> dict:
+    return synthetic_payloads.box_score_response(_property_ids(filters), profile.seed, _period_label(filters))
+
+
+def _comparative_delinquency(filters: dict, profile: FaultProfile) -> dict:
+    periods = int(filters.get("compare_against_trailing_periods") or 0) + 1
+    return synthetic_payloads.comparative_delinquency_response(_property_ids(filters), periods, profile.seed,
+                                                              _period_label(filters))
+
+
+def _aged_receivables(filters: dict, profile: FaultProfile) -> dict:
+    ids = _property_ids(filters)
+    return synthetic_payloads.aged_receivables_response(ids, len(ids) * profile.lease_rows_per_property,
+                                                        profile.seed)
+
+
+def _resident_retention(filters: dict, profile: FaultProfile) -> dict:
+    return synthetic_payloads.resident_retention_response(_property_ids(filters), profile.seed,
+                                                          _period_label(filters))
+
+
+REPORTS: dict[str, Callable[[dict, FaultProfile], dict]] = {
+    "box_score": _box_score,
+    "comparative_delinquency": _comparative_delinquency,
+    "resident_aged_receivables": _aged_receivables,
+    "resident_retention": _resident_retention,
+}
+
+
+def report_response(body: dict, profile: FaultProfile) -> Optional[dict]:
+    """The response to a getReportData body, or None for a report the mock does not know."""
+    build = REPORTS.get(body["method"]["params"].get("reportName"))
+    if build is None:
+        return None
+    response = build(_filters(body), profile)
+    response["response"]["requestId"] = body.get("requestId")
+    response["response"]["code"] = 200
+    return response
+
+
+def _error(code: int, message: str) -> dict:
+    return {"response": {"code": code, "error": {"code": code, "message": message}}}
+
+
+class MockEntrataServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], profile: FaultProfile, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.profile = profile
+        self.verbose = verbose
+        self._rng = random.Random(f"faults:{profile.seed}")
+        self._lock = threading.Lock()
+        self.counts: dict[int, int] = {}  # responses sent per status code
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> tuple[float, Optional[int], bool]:
+        """(latency seconds, injected status or None, drip) for the next request."""
+        p = self.profile
+        with self._lock:
+            latency = p.latency_ms / 1000.0
+            if p.latency_sigma > 0:
+                latency *= self._rng.lognormvariate(0.0, p.latency_sigma)
+            roll = self._rng.random()
+            status = None
+            if roll < p.throttle_rate:
+                status = 429
+            elif roll < p.throttle_rate + p.error_rate:
+                status = self._rng.choice((500, 502, 503))
+            drip = self._rng.random() < p.drip_rate
+        return latency, status, drip
+
+    def count(self, status: int) -> None:
+        with self._lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockEntrataServer
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, payload: dict, headers: Optional[dict] = None, drip: bool = False) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if drip:
+            delay = DRIP_CHUNK_BYTES / self.server.profile.drip_bytes_per_second
+            for start in range(0, len(data), DRIP_CHUNK_BYTES):
+                self.wfile.write(data[start:start + DRIP_CHUNK_BYTES])
+                self.wfile.flush()
+                time.sleep(delay)
+        else:
+            self.wfile.write(data)
+        self.server.count(status)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/reports"):
+            return self._send(404, _error(404, f"Unknown path {self.path}"))
+        profile = self.server.profile
+        if profile.api_key is not None and self.headers.get("X-Api-Key") != profile.api_key:
+            return self._send(401, _error(401, "Invalid API key"))
+
+        latency, status, drip = self.server.draw()
+        time.sleep(latency)
+        if status == 429:
+            headers = {} if profile.retry_after is None else {"Retry-After": f"{profile.retry_after:g}"}
+            return self._send(429, _error(429, "Too many requests"), headers)
+        if status is not None:
+            return self._send(status, _error(status, "Injected server error"))
+
+        try:
+            request = json.loads(body)
+            if request["method"]["name"] != "getReportData":
+                return self._send(400, _error(400, f"Unsupported method {request['method']['name']}"))
+            response = report_response(request, profile)
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send(400, _error(400, f"Malformed request: {e}"))
+        if response is None:
+            return self._send(400, _error(400, f"Unsupported report {request['method']['params'].get('reportName')}"))
+        self._send(200, response, drip=drip)
+
+
+def make_server(profile: Optional[FaultProfile] = None, host: str = "127.0.0.1", port: int = 0,
+                verbose: bool = False) -> MockEntrataServer:
+    """A bound server (port 0 picks a free port, see base_url); call serve_forever() to run it."""
+    return MockEntrataServer((host, port), profile or FaultProfile(), verbose)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="lognormal spread of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of the 429s (<0: none)")
+    parser.add_argument("--drip-rate", type=float, default=0.0, help="fraction of bodies sent slowly")
+    parser.add_argument("--drip-bytes-per-second", type=float, default=16384.0)
+    parser.add_argument("--lease-rows-per-property", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--api-key", help="require this X-Api-Key")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    profile = FaultProfile(latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+                           error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                           retry_after=None if args.retry_after < 0 else args.retry_after,
+                           drip_rate=args.drip_rate, drip_bytes_per_second=args.drip_bytes_per_second,
+                           lease_rows_per_property=args.lease_rows_per_property, seed=args.seed,
+                           api_key=args.api_key)
+    server = make_server(profile, args.host, args.port, args.verbose)
+    print(f"Mock Entrata reports at {server.base_url}/reports (BASE_URL={server.base_url})", flush=True)
+
+    def stop(*_):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)  # background jobs ignore SIGINT
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Responses by status:", dict(sorted(server.counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Warms the dashboard's report cache ahead of business hours, then re-warms the
+current (open) period on an interval. Every report the dashboard renders
+(fetch_engine.REPORTS) is warmed; with LAST_GOOD_DIR set, the complete tables
+are also written to the last_good store the dashboard renders from. Runs
+headless, without Streamlit:
+
+    RESPONSE_CACHE_DIR=/var/cache/property-dashboard USE_FAKE_DATA=0 \\
+        python -m tools.prefetch_scheduler
+    python -m tools.prefetch_scheduler --once --properties 100082999,100083000
+"""
+import argparse
+import time as time_module
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from api_response_processor import fetch_engine, helpers, last_good, rate_limiter, response_cache
+from config import constants
+
+
+def _parse_clock(value: str) -> time:
+    hours, minutes = value.split(":")
+    return time(int(hours), int(minutes))
+
+
+def next_run_at(now: datetime,
+                warm_at: time,
+                until: time,
+                interval: timedelta,
+                last_run: Optional[datetime]) -> datetime:
+    """
+    The first run of a day happens at warm_at, then every interval until the
+    `until` time; after that, the next run is warm_at tomorrow. All datetimes
+    are timezone-aware in helpers.REPORT_TIMEZONE.
+    """
+    day_start = datetime.combine(now.date(), warm_at, tzinfo=now.tzinfo)
+    day_end = datetime.combine(now.date(), until, tzinfo=now.tzinfo)
+    if now < day_start:
+        return day_start
+    if last_run is None or last_run < day_start:
+        return now
+    candidate = last_run + interval
+    if candidate <= day_end:
+        return max(candidate, now)
+    return day_start + timedelta(days=1)
+
+
+def warm_property(property_id) -> bool:
+    """
+    Fetches every report of one property; the complete ones go to the last_good
+    store when it is shared (LAST_GOOD_DIR). True when no report failed.
+    """
+    incomplete = set()
+    tables = fetch_engine.fetch_report_tables(property_id, fetch_engine.REPORTS, incomplete=incomplete)
+    if constants.LAST_GOOD_DIR:
+        store = last_good.get_store()
+        for report, report_tables in tables.items():
+            if report not in incomplete:
+                store.put(property_id, report, report_tables)
+    return not incomplete
+
+
+def warm(property_ids: list, max_properties: int = constants.PREFETCH_MAX_PROPERTIES) -> dict:
+    """
+    Runs warm_property for every property, at most max_properties at a time.
+    Open-period cache entries are refetched and overwritten (only for these
+    requests: dashboard sessions reading the same cache meanwhile still get
+    them); closed periods come from the cache or snapshot store. Requests run
+    at background priority, behind any interactive loads sharing the rate
+    limiter. Returns {property_id: ok}.
+    """
+    tasks = {pid: (warm_property, (pid,)) for pid in property_ids}
+    with response_cache.refresh_open_periods(), rate_limiter.priority(rate_limiter.BACKGROUND):
+        results = fetch_engine.fetch_all(tasks, max_workers=max_properties)
+    return {pid: bool(ok) for pid, ok in results.items()}
+
+
+def run(property_ids: list,
+        warm_at: time,
+        until: time,
+        interval: timedelta,
+        max_properties: int,
+        once: bool = False) -> None:
+    if constants.USE_FAKE_DATA:
+        print("USE_FAKE_DATA is set: the fake payloads bypass the cache, nothing will be warmed.")
+    if not constants.RESPONSE_CACHE_DIR:
+        print("RESPONSE_CACHE_DIR is not set: warmed responses stay in this process, "
+              "the dashboard will not see them.")
+
+    last_run = None
+    while True:
+        now = datetime.now(helpers.REPORT_TIMEZONE)
+        run_at = now if once else next_run_at(now, warm_at, until, interval, last_run)
+        if run_at > now:
+            print(f"Next warm-up at {run_at.isoformat(timespec='minutes')}")
+            time_module.sleep((run_at - now).total_seconds())
+
+        started = time_module.monotonic()
+        last_run = datetime.now(helpers.REPORT_TIMEZONE)
+        outcome = warm(property_ids, max_properties)
+        failed = [pid for pid, ok in outcome.items() if not ok]
+        print(f"Warmed {len(outcome) - len(failed)}/{len(outcome)} properties "
+              f"in {time_module.monotonic() - started:.1f}s" + (f", failed: {failed}" if failed else ""))
+        if once:
+            return
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--properties", default=",".join(str(p) for p in constants.PROPERTY_IDS),
+                        help="comma separated property ids (default: PROPERTY_IDS)")
+    parser.add_argument("--warm-at", default=constants.PREFETCH_WARM_AT, help="HH:MM, America/Chicago")
+    parser.add_argument("--until", default=constants.PREFETCH_UNTIL, help="HH:MM, last re-warm of the day")
+    parser.add_argument("--interval-minutes", type=int, default=constants.PREFETCH_INTERVAL_MINUTES)
+    parser.add_argument("--max-properties", type=int, default=constants.PREFETCH_MAX_PROPERTIES,
+                        help="properties warmed at the same time")
+    parser.add_argument("--once", action="store_true", help="warm every property now and exit")
+    args = parser.parse_args(argv)
+
+    run(property_ids=[int(p) for p in args.properties.split(",") if p.strip()],
+        warm_at=_parse_clock(args.warm_at),
+        until=_parse_clock(args.until),
+        interval=timedelta(minutes=args.interval_minutes),
+        max_properties=args.max_properties,
+        once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Deterministic, production-sized Entrata getReportData responses for
+benchmarks and local load tests. Every row carries its property_id, the shape
+a multi-property (summarize_by: property) request returns; with a single
+property id they are also valid single-property responses.
+"""
+import random
+
+
+def _response(report_data) -> dict:
+    return {"response": {"result": [{"reportData": report_data}]}}
+
+
+def _rng(seed: int, *parts) -> random.Random:
+    # str seeds are hashed with sha512, so the same inputs give the same data in every process
+    return random.Random(":".join(map(str, (seed, *parts))))
+
+
+def property_ids(count: int, first_id: int = 100000000) -> list[int]:
+    return [first_id + i for i in range(count)]
+
+
+def box_score_response(property_ids: list, seed: int = 0, period: str = "") -> dict:
+    availability, pulse, lead_activity, lead_conversions = [], [], [], []
+    for pid in property_ids:
+        rng = _rng(seed, "box_score", pid, period)
+        total = rng.randint(60, 600)
+        excluded = rng.randint(0, 3)
+        rentable = total - excluded
+        occupied = rng.randint(int(rentable * 0.75), rentable)
+        notice_rented = rng.randint(0, max(1, occupied // 20))
+        notice_unrented = rng.randint(0, max(1, occupied // 20))
+        vacant = rentable - occupied
+        vacant_rented = rng.randint(0, vacant)
+        leased = occupied - notice_unrented + vacant_rented
+        availability.append({
+            "property_id": pid,
+            "total_units": total,
+            "total_rentable_units": rentable,
+            "excluded_units": excluded,
+            "percent_occupied": round(occupied / rentable, 4),
+            "percent_leased": round(leased / rentable, 4),
+            "avg_not_exposed_leased_units": round(rng.uniform(0.6, 1.0), 4),
+            "occupied_units": occupied,
+            "notice_rented_units": notice_rented,
+            "notice_unrented_units": notice_unrented,
+            "vacant_units": vacant,
+            "vacant_rented_units": vacant_rented,
+            "vacant_unrented_units": vacant - vacant_rented,
+        })
+        pulse.append({
+            "property_id": pid,
+            "skips": rng.randint(0, 2),
+            "evictions_completed": rng.randint(0, 3),
+            "move_ins": rng.randint(0, total // 15),
+            "move_outs": rng.randint(0, total // 15),
+        })
+        new_leads = rng.randint(5, total // 2)
+        tours = rng.randint(0, new_leads)
+        completed = rng.randint(0, tours)
+        lead_activity.append({"property_id": pid, "new_leads": new_leads, "unique_visits_tours": tours})
+        lead_conversions.append({"property_id": pid, "completed": completed,
+                                 "approved": rng.randint(0, completed)})
+    return _response({
+        "availability": availability,
+        "property_pulse": pulse,
+        "lead_activity": lead_activity,
+        "lead_conversions": lead_conversions,
+    })
+
+
+def comparative_delinquency_response(property_ids: list, periods: int = 1, seed: int = 0,
+                                     month: str = "") -> dict:
+    """One row per property with amount_due_N / total_allocations_N for N in range(periods)."""
+    rows = []
+    for pid in property_ids:
+        rng = _rng(seed, "comparative_delinquency", pid, month)
+        row = {"property_id": pid}
+        base = rng.randint(60, 600) * rng.randint(900, 2200)
+        for n in range(periods):
+            billed = round(base * rng.uniform(0.95, 1.05), 2)
+            row[f"amount_due_{n}"] = billed
+            row[f"total_allocations_{n}"] = round(billed * rng.uniform(0.85, 1.0), 2)
+        rows.append(row)
+    return _response(rows)
+
+
+def aged_receivables_response(property_ids: list, lease_rows: int, seed: int = 0,
+                              dirty_fraction: float = 0.01) -> dict:
+    """
+    lease_rows lease-level rows spread over the properties. dirty_fraction of
+    the bucket values are the empty strings / None Entrata sends for no balance.
+    """
+    rng = _rng(seed, "aged_receivables", len(property_ids), lease_rows)
+    buckets = ("current", "thirty_days", "sixty_days", "ninety_days", "ninety_plus_days")
+    dirty = ("", None, "0.00")
+    rows = []
+    for i in range(lease_rows):
+        row = {"property_id": property_ids[i % len(property_ids)], "lease_id": 5000000 + i,
+               "unit_number": f"{rng.randint(1, 40)}{rng.randint(1, 30):02d}"}
+        for bucket in buckets:
+            row[bucket] = rng.choice(dirty) if rng.random() < dirty_fraction \
+                else round(rng.expovariate(1 / 400), 2)
+        rows.append(row)
+    return _response(rows)
+
+
+def resident_retention_response(property_ids: list, seed: int = 0, month: str = "") -> dict:
+    rows = []
+    for pid in property_ids:
+        rng = _rng(seed, "resident_retention", pid, month)
+        expiring = rng.randint(5, 80)
+        rows.append({"property_id": pid, "expiring_leases": expiring, "renewals": rng.randint(0, expiring)})
+    return _response(rows)
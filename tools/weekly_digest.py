@@ -0,0 +1,331 @@
+"""
+Weekly KPI digest for property managers. Computes every property's numbers for
+the last closed Friday-boundary week (helpers.get_week_boundaries_fridays) in
+bulk, diffs them against the previous week's digest snapshot, and emails each
+manager the properties whose KPIs changed meaningfully; managers with no
+changes get nothing.
+
+    DIGEST_RECIPIENTS_FILE=managers.csv SNAPSHOT_STORE_URL=sqlite:///snapshots.sqlite3 \\
+        python -m tools.weekly_digest --outbox /tmp/outbox
+    DIGEST_TRANSPORT=sendgrid SENDGRID_API_KEY=... DIGEST_FROM_EMAIL=reports@example.com \\
+        USE_FAKE_DATA=0 python -m tools.weekly_digest
+
+managers.csv has a property_id,email header and one row per (property,
+manager). A week's KPIs are stored in the snapshot store (report
+"weekly_digest", period = the week's Friday); a property without last week's
+snapshot only records its baseline. Recipients that were sent this week's
+digest are recorded too ("weekly_digest_sent", keyed by email), so rerunning
+after a failure only sends what is still missing.
+
+The stub transport (the default) sends nothing: it keeps the messages and,
+with --outbox, writes each one as HTML. The SendGrid transport sends one
+request per message, or with DIGEST_SENDGRID_TEMPLATE_ID one request per batch
+of up to DIGEST_BATCH_SIZE messages (a dynamic template rendering {{{html}}}
+with {{subject}} as its subject), either way at most
+DIGEST_SEND_REQUESTS_PER_SECOND requests per second.
+"""
+import argparse
+import csv
+import html
+import math
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Hashable, Optional
+
+from api_response_processor import helpers, portfolio, rate_limiter, snapshot_store
+from api_response_processor.formatting import k, pct
+from config import constants
+
+SNAPSHOT_REPORT = "weekly_digest"
+SENT_REPORT = "weekly_digest_sent"
+
+# name: (label, kind); pct changes are compared in points, counts relatively. Rent billed/collected,
+# delinquency and the retention counts (expiring leases, renewals) are current-month figures: they
+# grow every week and reset at each month rollover, so they are not compared week over week.
+KPIS: dict[str, tuple[str, str]] = {
+    "occupied_units_percentage": ("Occupied %", "pct"),
+    "leased_units_percentage": ("Leased %", "pct"),
+    "trend_percentage": ("Trend %", "pct"),
+    "evictions_and_skips_occurred": ("Evictions/Skips", "count"),
+    "count_of_occupied_units": ("Occupied Units", "count"),
+    "count_of_vacant_units": ("Vacant Units", "count"),
+    "count_of_total_move_ins": ("Move-ins", "count"),
+    "count_of_total_move_out": ("Move-outs", "count"),
+    "new_leads": ("New Leads", "count"),
+    "tours": ("Tours", "count"),
+    "applications_completed": ("Applications Completed", "count"),
+    "lease_approved": ("Leases Approved", "count"),
+}
+
+
+@dataclass(slots=True)
+class Change:
+    kpi: str
+    previous: float
+    current: float
+
+
+@dataclass(slots=True)
+class Message:
+    to: str
+    subject: str
+    html: str
+    text: str
+    property_ids: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class DigestResult:
+    week: str
+    properties: int = 0
+    baselines: int = 0        # properties without last week's snapshot
+    changed: int = 0          # properties with a meaningful change
+    incomplete: list = field(default_factory=list)  # a report request failed: neither diffed nor stored
+    sent: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    already_sent: list[str] = field(default_factory=list)
+
+
+# =========================
+# KPIS AND CHANGES
+# =========================
+def week_kpis(models: tuple, week_dates: dict) -> dict[str, float]:
+    """The KPIS of the last closed week (Saturday to last Friday) from fetch_property_models' models."""
+    property_summary_dict, unit_summary_dict, _, _, _, leads = models
+    week_key = week_dates["saturday_before_last_friday"] + "-" + week_dates["last_friday"]
+    ps, us = property_summary_dict[week_key], unit_summary_dict[week_key]
+    return {
+        "occupied_units_percentage": ps.occupied_units_percentage,
+        "leased_units_percentage": ps.leased_units_percentage,
+        "trend_percentage": ps.trend_percentage,
+        "evictions_and_skips_occurred": ps.evictions_and_skips_occurred,
+        "count_of_occupied_units": us.count_of_occupied_units,
+        "count_of_vacant_units": us.count_of_vacant_units,
+        "count_of_total_move_ins": us.count_of_total_move_ins,
+        "count_of_total_move_out": us.count_of_total_move_out,
+        "new_leads": leads.last_week_new_leads_count,
+        "tours": leads.last_week_tours_count,
+        "applications_completed": leads.last_week_applications_completed_count,
+        "lease_approved": leads.last_week_lease_approved_count,
+    }
+
+
+def _meaningful(kind: str, previous: float, current: float, min_points: float, min_relative: float) -> bool:
+    if math.isnan(previous) or math.isnan(current):
+        return False  # a value the report did not send is not a change
+    if kind == "pct":
+        return abs(current - previous) >= min_points
+    if previous == 0:
+        return current != 0
+    return abs(current - previous) / abs(previous) >= min_relative
+
+
+def changed_kpis(previous: dict[str, float], current: dict[str, float],
+                 min_points: float = constants.DIGEST_MIN_POINT_CHANGE,
+                 min_relative: float = constants.DIGEST_MIN_RELATIVE_CHANGE) -> list[Change]:
+    """KPIs that moved by at least min_points (fractions) or min_relative (counts), in KPIS order."""
+    return [Change(name, previous[name], current[name]) for name, (_, kind) in KPIS.items()
+            if name in previous and name in current
+            and _meaningful(kind, previous[name], current[name], min_points, min_relative)]
+
+
+# =========================
+# MESSAGES
+# =========================
+def _format(kpi: str, value: float) -> str:
+    return pct(value) if KPIS[kpi][1] == "pct" else k(value)
+
+
+def _delta(change: Change) -> str:
+    difference = change.current - change.previous
+    arrow = "▲" if difference > 0 else "▼"
+    if KPIS[change.kpi][1] == "pct":
+        return f"{arrow} {abs(difference) * 100:,.2f} pts"
+    return f"{arrow} {_format(change.kpi, abs(difference))}"
+
+
+def build_message(to: str, week_dates: dict, changes_by_property: dict[Hashable, list[Change]]) -> Message:
+    week = f"{week_dates['saturday_before_last_friday']} to {week_dates['last_friday']}"
+    subject = (f"Weekly digest, week {week}: "
+               f"{len(changes_by_property)} {'property' if len(changes_by_property) == 1 else 'properties'} changed")
+    sections, lines = [], [subject, ""]
+    for pid, changes in changes_by_property.items():
+        rows = "".join(f"<tr><td>{html.escape(KPIS[c.kpi][0])}</td><td>{_format(c.kpi, c.previous)}</td>"
+                       f"<td><b>{_format(c.kpi, c.current)}</b></td><td>{_delta(c)}</td></tr>" for c in changes)
+        sections.append(f"<h3>Property {html.escape(str(pid))}</h3>"
+                        "<table cellpadding='4'><tr><th align='left'>KPI</th><th>Last week</th>"
+                        f"<th>This week</th><th>Change</th></tr>{rows}</table>")
+        lines.append(f"Property {pid}")
+        lines += [f"  {KPIS[c.kpi][0]}: {_format(c.kpi, c.previous)} -> {_format(c.kpi, c.current)} ({_delta(c)})"
+                  for c in changes]
+        lines.append("")
+    body = f"<p>KPIs that changed in the week {week}:</p>" + "".join(sections)
+    return Message(to, subject, body, "\n".join(lines), list(changes_by_property))
+
+
+# =========================
+# TRANSPORTS
+# =========================
+class StubTransport:
+    """Sends nothing: keeps every message in .sent, and writes it as HTML into outbox when given."""
+
+    def __init__(self, outbox: Optional[str] = None):
+        self.outbox = outbox
+        self.sent: list[Message] = []
+        self.requests = 0
+
+    def send(self, messages: list[Message]) -> list[bool]:
+        self.requests += 1
+        for message in messages:
+            self.sent.append(message)
+            if self.outbox:
+                os.makedirs(self.outbox, exist_ok=True)
+                name = re.sub(r"[^\w.@-]", "_", message.to)
+                with open(os.path.join(self.outbox, f"{len(self.sent):05d}-{name}.html"), "w") as f:
+                    f.write(f"<!-- To: {message.to} | Subject: {html.escape(message.subject)} -->\n{message.html}")
+        return [True] * len(messages)
+
+
+class SendGridTransport:
+    """SendGrid v3 mail/send, one request per message or, with template_id, per batch."""
+
+    def __init__(self, api_key: str, from_email: str, template_id: Optional[str] = None,
+                 limiter: Optional[rate_limiter.RateLimiter] = None):
+        from sendgrid import SendGridAPIClient  # only needed when mail is really sent
+
+        self._client = SendGridAPIClient(api_key)
+        self.from_email = from_email
+        self.template_id = template_id
+        self._limiter = limiter or rate_limiter.RateLimiter(rate=constants.DIGEST_SEND_REQUESTS_PER_SECOND,
+                                                            burst=1)
+
+    def _post(self, mail) -> bool:
+        self._limiter.acquire()
+        try:
+            response = self._client.send(mail)
+        except Exception as e:  # python_http_client raises an HTTPError per status
+            print('Error sending the weekly digest:', getattr(e, "status_code", ""), e)
+            return False
+        return 200 <= response.status_code < 300
+
+    def send(self, messages: list[Message]) -> list[bool]:
+        from sendgrid.helpers.mail import Mail, Personalization, To
+
+        if not self.template_id:
+            return [self._post(Mail(from_email=self.from_email, to_emails=m.to, subject=m.subject,
+                                    plain_text_content=m.text, html_content=m.html)) for m in messages]
+        mail = Mail(from_email=self.from_email)
+        mail.template_id = self.template_id
+        for m in messages:
+            personalization = Personalization()
+            personalization.add_to(To(m.to))
+            personalization.dynamic_template_data = {"subject": m.subject, "html": m.html, "text": m.text}
+            mail.add_personalization(personalization)
+        return [self._post(mail)] * len(messages)
+
+
+def make_transport(name: str = constants.DIGEST_TRANSPORT, outbox: Optional[str] = None):
+    if name == "sendgrid":
+        return SendGridTransport(os.environ["SENDGRID_API_KEY"], constants.DIGEST_FROM_EMAIL,
+                                 constants.DIGEST_SENDGRID_TEMPLATE_ID or None)
+    if name == "stub":
+        return StubTransport(outbox)
+    raise ValueError(f"Unknown digest transport: {name}")
+
+
+# =========================
+# PIPELINE
+# =========================
+def load_recipients(path: str) -> dict[str, list[int]]:
+    """{email: [property_id, ...]} from a property_id,email CSV."""
+    recipients: dict[str, list[int]] = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            email, pid = row["email"].strip(), row["property_id"].strip()
+            if email and pid:
+                recipients.setdefault(email, []).append(int(pid))
+    return recipients
+
+
+def run_digest(recipients: dict[str, list], store: snapshot_store.SnapshotStore, transport,
+               week_dates: Optional[dict] = None, batch_size: int = constants.DIGEST_BATCH_SIZE,
+               dry_run: bool = False) -> DigestResult:
+    week_dates = week_dates or helpers.get_week_boundaries_fridays()
+    week, previous_week = week_dates["last_friday"], week_dates["last_to_last_friday"]
+    property_ids = list(dict.fromkeys(pid for pids in recipients.values() for pid in pids))
+    result = DigestResult(week, properties=len(property_ids))
+
+    incomplete: set = set()
+    models = portfolio.fetch_models(property_ids, incomplete=incomplete)
+    changes: dict[Hashable, list[Change]] = {}
+    for pid in property_ids:
+        if pid in incomplete:
+            result.incomplete.append(pid)
+            continue
+        current = week_kpis(models[pid], week_dates)
+        previous = store.get(pid, SNAPSHOT_REPORT, previous_week)
+        if previous is None:
+            result.baselines += 1
+        elif changed := changed_kpis(previous, current):
+            changes[pid] = changed
+        if not dry_run:
+            store.put(pid, SNAPSHOT_REPORT, week, current)
+    result.changed = len(changes)
+
+    messages = []
+    for email, pids in recipients.items():
+        mine = {pid: changes[pid] for pid in pids if pid in changes}
+        if not mine:
+            continue
+        if store.get(email, SENT_REPORT, week) is not None:
+            result.already_sent.append(email)
+            continue
+        messages.append(build_message(email, week_dates, mine))
+    if dry_run:
+        result.sent = [m.to for m in messages]
+        return result
+
+    for start in range(0, len(messages), batch_size):
+        batch = messages[start:start + batch_size]
+        for message, ok in zip(batch, transport.send(batch)):
+            if ok:
+                store.put(message.to, SENT_REPORT, week, {"sent_at": time.time(), "property_ids": message.property_ids})
+                result.sent.append(message.to)
+            else:
+                result.failed.append(message.to)
+    return result
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipients", default=constants.DIGEST_RECIPIENTS_FILE,
+                        help="property_id,email CSV (default: DIGEST_RECIPIENTS_FILE)")
+    parser.add_argument("--transport", default=constants.DIGEST_TRANSPORT, choices=("stub", "sendgrid"))
+    parser.add_argument("--outbox", default=constants.DIGEST_OUTBOX_DIR or None,
+                        help="stub transport: write the messages here as HTML")
+    parser.add_argument("--batch-size", type=int, default=constants.DIGEST_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="compute and diff only; store and send nothing")
+    args = parser.parse_args(argv)
+
+    store = snapshot_store.get_snapshot_store()
+    if store is None:
+        raise SystemExit("SNAPSHOT_STORE_URL is not set: the digest needs last week's snapshot to diff against.")
+    if not args.recipients:
+        raise SystemExit("No recipients: pass --recipients or set DIGEST_RECIPIENTS_FILE.")
+
+    started = time.monotonic()
+    result = run_digest(load_recipients(args.recipients), store, make_transport(args.transport, args.outbox),
+                        batch_size=args.batch_size, dry_run=args.dry_run)
+    print(f"Weekly digest for the week ending {result.week}: {result.properties} properties, "
+          f"{result.changed} changed, {result.baselines} baselines recorded; "
+          f"{'would send' if args.dry_run else 'sent'} {len(result.sent)} emails"
+          + (f", {len(result.already_sent)} already sent" if result.already_sent else "")
+          + (f", reports failed for {result.incomplete}" if result.incomplete else "")
+          + (f", failed: {result.failed}" if result.failed else "")
+          + f" in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()